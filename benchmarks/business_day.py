@@ -0,0 +1,79 @@
+"""営業日計算のベンチマーク
+
+    python -m benchmarks.business_day
+
+Almanac.day_of_week で一日ずつ数える方法と BusinessCalendar を,
+数十年にわたる期間で比較する。
+"""
+
+import random
+import timeit
+from datetime import date, timedelta
+
+from planner.almanac import Almanac
+from planner.business_day import BusinessCalendar
+
+SPANS = (1, 10, 30, 50)
+QUERIES = 1000
+
+
+def walk_count(holidays, start, end):
+    count = 0
+    day = start
+    while day < end:
+        day_of_week = Almanac.day_of_week(day.strftime("%Y%m%d"))
+        if (
+            day_of_week != Almanac.DayOfWeek.Saturday
+            and day_of_week != Almanac.DayOfWeek.Sunday
+            and day.strftime("%Y%m%d") not in holidays
+        ):
+            count += 1
+        day += timedelta(days=1)
+    return count
+
+
+def main():
+    holidays = Almanac.read_definitions(
+        "data/holiday-2023.txt", "data/holiday-2024.txt"
+    )
+    Almanac.add_holidays(holidays)
+    start = date(2000, 1, 1)
+
+    print("{:>6} {:>12} {:>12} {:>12}".format("years", "walk", "cold", "warm"))
+    for years in SPANS:
+        end = date(start.year + years, 1, 1)
+
+        walk = timeit.timeit(
+            lambda: walk_count(holidays, start, end), number=1
+        )
+        cold = timeit.timeit(
+            lambda: BusinessCalendar(holidays).count(start, end), number=1
+        )
+
+        calendar = BusinessCalendar(holidays)
+        calendar.count(start, end)
+        random.seed(years)
+        span = (end - start).days
+        periods = [
+            sorted(
+                (
+                    start + timedelta(days=random.randrange(span)),
+                    start + timedelta(days=random.randrange(span)),
+                )
+            )
+            for _ in range(QUERIES)
+        ]
+        warm = (
+            timeit.timeit(lambda: calendar.count_many(periods), number=1)
+            / QUERIES
+        )
+
+        print(
+            "{:>6} {:>10.3f}ms {:>10.3f}ms {:>10.3f}us".format(
+                years, walk * 1000, cold * 1000, warm * 1000000
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""フォーム (XObject) による罫線の描画のベンチマーク
+
+    python -m benchmarks.forms
+
+罫線などを各ページに直接描く場合とフォームとして参照する場合で,
+出力の大きさと時間を比較する。ページの圧縮の有無それぞれで測る。
+"""
+
+import os
+import tempfile
+import time
+
+from reportlab import rl_config
+
+from planner import planner
+from planner.almanac import Almanac
+
+YEAR = 2024
+REPEAT = 5
+
+DOCUMENTS = {
+    "yearly": lambda: planner.YearlyPlanner(YEAR),
+    "weekly": lambda: planner.WeeklyPlanner(YEAR),
+    "todo": planner.ToDoList,
+}
+
+
+def measure(create, filename):
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        create().print(filename)
+    return os.path.getsize(filename), (time.perf_counter() - start) / REPEAT
+
+
+def main():
+    Almanac.compute_rokuyo(YEAR)
+    Almanac.compute_national_holidays(YEAR)
+    compression = rl_config.pageCompression
+    use_forms = planner.Planner.USE_FORMS
+
+    print(
+        "{:<8} {:<11} {:>10} {:>10} {:>7} {:>9} {:>9} {:>7}".format(
+            "document",
+            "compression",
+            "inline",
+            "forms",
+            "size",
+            "inline",
+            "forms",
+            "time",
+        )
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "planner.pdf")
+        try:
+            for page_compression in (1, 0):
+                rl_config.pageCompression = page_compression
+                for name, create in DOCUMENTS.items():
+                    results = []
+                    for forms in (False, True):
+                        planner.Planner.USE_FORMS = forms
+                        results.append(measure(create, filename))
+                    (inline_size, inline_time), (size, elapsed) = results
+                    print(
+                        "{:<8} {:<11} {:>10} {:>10} {:>+6.1f}% "
+                        "{:>7.1f}ms {:>7.1f}ms {:>+6.1f}%".format(
+                            name,
+                            "on" if page_compression else "off",
+                            inline_size,
+                            size,
+                            (size / inline_size - 1) * 100,
+                            inline_time * 1000,
+                            elapsed * 1000,
+                            (elapsed / inline_time - 1) * 100,
+                        )
+                    )
+        finally:
+            rl_config.pageCompression = compression
+            planner.Planner.USE_FORMS = use_forms
+
+
+if __name__ == "__main__":
+    main()
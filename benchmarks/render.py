@@ -0,0 +1,86 @@
+"""予定表の描画のベンチマーク
+
+    python -m benchmarks.render
+
+予定表ごとに print() の時間と, 出力したコンテンツストリームの
+PDF オペレーターの数を測る。オペレーターはページを圧縮せずに出力して数える。
+"""
+
+import os
+import re
+import tempfile
+import time
+from collections import Counter
+
+from reportlab import rl_config
+
+from planner import planner
+from planner.almanac import Almanac
+
+YEAR = 2024
+REPEAT = 5
+
+DOCUMENTS = {
+    "yearly": lambda: planner.YearlyPlanner(YEAR),
+    "weekly": lambda: planner.WeeklyPlanner(YEAR),
+    "todo": planner.ToDoList,
+}
+
+_STREAM = re.compile(rb">>\s*stream\r?\n(.*?)endstream", re.DOTALL)
+_STRING = re.compile(rb"\((?:\\.|[^\\)])*\)", re.DOTALL)
+_OPERATOR = re.compile(rb"(?<![^\s\]>])([A-Za-z]{1,2}\*?|'|\")(?=\s|$)")
+
+
+def count_operators(data):
+    """コンテンツストリームのオペレーターの種類ごとの数"""
+    operators = Counter()
+    for stream in _STREAM.findall(data):
+        stream = _STRING.sub(b"", stream)
+        operators.update(
+            operator.decode() for operator in _OPERATOR.findall(stream)
+        )
+    return operators
+
+
+def main():
+    Almanac.compute_rokuyo(YEAR)
+    Almanac.compute_national_holidays(YEAR)
+    compression = rl_config.pageCompression
+
+    print(
+        "{:<8} {:>9} {:>10}  {}".format(
+            "document", "time", "operators", "most common"
+        )
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "planner.pdf")
+        try:
+            for name, create in DOCUMENTS.items():
+                rl_config.pageCompression = 1
+                start = time.perf_counter()
+                for _ in range(REPEAT):
+                    create().print(filename)
+                elapsed = (time.perf_counter() - start) / REPEAT
+
+                rl_config.pageCompression = 0
+                create().print(filename)
+                with open(filename, mode="rb") as f:
+                    operators = count_operators(f.read())
+
+                print(
+                    "{:<8} {:>7.1f}ms {:>10}  {}".format(
+                        name,
+                        elapsed * 1000,
+                        sum(operators.values()),
+                        " ".join(
+                            "{}={}".format(operator, count)
+                            for operator, count in operators.most_common(6)
+                        ),
+                    )
+                )
+        finally:
+            rl_config.pageCompression = compression
+
+
+if __name__ == "__main__":
+    main()
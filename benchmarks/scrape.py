@@ -0,0 +1,83 @@
+"""HTML 解析のベンチマーク
+
+    python -m benchmarks.scrape
+
+tests/data のページについて, 読み込み (I/O), 高速な抽出, BeautifulSoup による
+解析の処理量 (ページ/秒, MB/秒) を比較する。
+"""
+
+import timeit
+from importlib.resources import files
+
+import tests
+from planner import scrape
+
+"""(ファイル名, 種類, 年)"""
+PAGES = (
+    ("rokuyo_2023.html", "rokuyo", 2023),
+    ("rokuyo_2024.html", "rokuyo", 2024),
+    ("20220201-rekiyoko.html", "holiday", 2023),
+    ("20230201-rekiyoko.html", "holiday", 2024),
+)
+REPEAT = 50
+
+
+def read(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def main():
+    naoj = scrape.NationalHolidayNaojParser()
+    parsers = {
+        "rokuyo": (
+            lambda year, data: scrape.extract_rokuyo(data),
+            lambda year, data: scrape.parse_rokuyo_soup(data),
+        ),
+        "holiday": (scrape.extract_national_holidays, naoj.parse_soup),
+    }
+
+    print(
+        "{:<24} {:>8} {:>14} {:>14} {:>14}".format(
+            "page", "KiB", "read", "extract", "soup"
+        )
+    )
+    totals = [0.0, 0.0, 0.0]
+    size = 0
+    for name, kind, year in PAGES:
+        path = files(tests).joinpath("data", name)
+        data = read(path)
+        extract, soup = parsers[kind]
+        if extract(year, data) != soup(year, data):
+            raise AssertionError("{}: results differ".format(name))
+
+        times = [
+            timeit.timeit(lambda: read(path), number=REPEAT) / REPEAT,
+            timeit.timeit(lambda: extract(year, data), number=REPEAT) / REPEAT,
+            timeit.timeit(lambda: soup(year, data), number=REPEAT) / REPEAT,
+        ]
+        length = len(data.encode("utf-8"))
+        size += length
+        totals = [total + time for total, time in zip(totals, times)]
+        print(
+            "{:<24} {:>8.1f} {}".format(
+                name,
+                length / 1024,
+                " ".join("{:>11.0f}/s".format(1 / time) for time in times),
+            )
+        )
+
+    print(
+        "{:<24} {:>8.1f} {}".format(
+            "MB/s",
+            size / 1024,
+            " ".join(
+                "{:>12.1f}".format(size / total / 1e6) + "  "
+                for total in totals
+            ),
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,456 @@
+"""ベンチマークスイート
+
+    python -m benchmarks.suite run -o results.json
+    python -m benchmarks.suite compare benchmarks/baseline.json results.json
+
+描画・暦注・HTML 解析の主な処理と CLI の起動について, 所要時間と
+最大メモリー使用量 (tracemalloc) を測って JSON に保存する。
+CLI の起動は, インタープリターの起動を除いた所要時間が予算 (BUDGETS) を
+超えると終了コード 1 を返す。compare は基準の結果と比べ, しきい値 (%) を超えて遅く, または大きく
+なった項目があれば終了コード 1 を返す。
+
+benchmarks/baseline.json は基準の例。所要時間はマシンによって変わるため,
+依存ライブラリを更新する前後の結果を同じマシンで比べる。
+"""
+
+import argparse
+import csv
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import timeit
+import tracemalloc
+from importlib import metadata
+from importlib.resources import files
+
+import tests
+from planner import ics, planner, scrape, solar_terms, tasks
+from planner.almanac import Almanac
+
+YEAR = 2024
+
+"""既定のしきい値 (%)"""
+THRESHOLD = 10
+
+"""測定の回数. 一回の測定は 0.2 秒以上になるよう関数を繰り返し呼ぶ"""
+REPEAT = 5
+
+"""結果の形式. 互換性のない変更をした場合は値を変える"""
+FORMAT = 1
+
+
+def read(name, encoding="utf-8"):
+    with open(
+        files(tests).joinpath("data", name), encoding=encoding, newline=""
+    ) as f:
+        return f.read()
+
+
+def render(directory, create):
+    filename = os.path.join(directory, "planner.pdf")
+    Almanac.compute_rokuyo(YEAR)
+    Almanac.compute_national_holidays(YEAR)
+    return lambda: create().print(filename)
+
+
+def events_file(directory, count=5000):
+    """count 件の予定 (50 件に 1 件は繰り返し) の iCalendar ファイル"""
+    rules = (
+        "FREQ=WEEKLY;BYDAY=MO,WE,FR",
+        "FREQ=DAILY;INTERVAL=2",
+        "FREQ=MONTHLY;BYDAY=-1FR",
+        "FREQ=YEARLY;COUNT=20",
+    )
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0"]
+    for n in range(count):
+        # 2015 年から 2030 年までに散らばる
+        year = 2015 + n % 16
+        start = "{}{:02d}{:02d}T{:02d}0000".format(
+            year, n % 12 + 1, n % 28 + 1, 8 + n % 10
+        )
+        lines += [
+            "BEGIN:VEVENT",
+            "UID:{}@benchmark".format(n),
+            "DTSTART;TZID=Asia/Tokyo:" + start,
+            "DURATION:PT1H",
+            "SUMMARY:予定 {}".format(n),
+            "DESCRIPTION:" + "x" * 200,
+        ]
+        if n % 50 == 0:
+            lines.append("RRULE:" + rules[n // 50 % len(rules)])
+        lines.append("END:VEVENT")
+    lines.append("END:VCALENDAR")
+    filename = os.path.join(directory, "events.ics")
+    with open(filename, mode="w", encoding="utf-8", newline="") as f:
+        f.write("\r\n".join(lines) + "\r\n")
+    return filename
+
+
+def load_events(directory):
+    filename = events_file(directory)
+    return lambda: ics.load([filename], [YEAR])
+
+
+def render_events(directory):
+    events = ics.load([events_file(directory)], [YEAR])[YEAR]
+    return render(
+        directory, lambda: planner.WeeklyPlanner(YEAR, events=events)
+    )
+
+
+def tasks_file(directory, count=10000):
+    """count 件のタスク (3 件に 2 件は期限つき) の CSV ファイル"""
+    filename = os.path.join(directory, "tasks.csv")
+    with open(filename, mode="w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["title", "due", "priority"])
+        for n in range(count):
+            writer.writerow(
+                [
+                    "タスク {} の内容".format(n),
+                    (
+                        "{}-{:02d}-{:02d}".format(YEAR, n % 12 + 1, n % 28 + 1)
+                        if n % 3
+                        else ""
+                    ),
+                    n % 5 or "",
+                ]
+            )
+    return filename
+
+
+def render_tasks(directory):
+    filename = tasks_file(directory)
+    return render(
+        directory,
+        lambda: planner.ToDoList(tasks=tasks.read_tasks(filename)),
+    )
+
+
+def day_of_week(directory):
+    days = [
+        year * 10000 + month * 100 + day
+        for year in range(1600, 2400, 7)
+        for month in range(1, 12 + 1)
+        for day in (1, 15, 28)
+    ]
+
+    def run():
+        for day in days:
+            Almanac.day_of_week(day)
+
+    return run
+
+
+def seasons(directory):
+    def run():
+        # メモ化した結果を使わずに 100 年分を計算する
+        solar_terms._solar_terms_of_year.cache_clear()
+        solar_terms._zassetsu_of_year.cache_clear()
+        for year in range(YEAR - 50, YEAR + 50):
+            solar_terms.seasons_of_year(year)
+
+    return run
+
+
+def add_holidays(directory):
+    # 振替休日などの「休日」は add_holidays が導出する
+    rows = csv.reader(read("syukujitsu.csv", "cp932").splitlines())
+    next(rows)
+    definitions = {
+        "{:04d}{:02d}{:02d}".format(*map(int, day.split("/"))): name
+        for day, name in rows
+        if name != "休日"
+    }
+    return lambda: Almanac.add_holidays(dict(definitions))
+
+
+def parse_rokuyo(directory):
+    pages = [read("rokuyo_2023.html"), read("rokuyo_2024.html")]
+
+    def run():
+        for page in pages:
+            scrape.parse_rokuyo(page)
+
+    return run
+
+
+def parse_naoj(directory):
+    parser = scrape.NationalHolidayNaojParser()
+    pages = [
+        (2023, read("20220201-rekiyoko.html")),
+        (2024, read("20230201-rekiyoko.html")),
+    ]
+
+    def run():
+        for year, page in pages:
+            parser.parse(year, page)
+
+    return run
+
+
+def parse_cao(directory):
+    parser = scrape.NationalHolidayCaoParser()
+    lines = read("syukujitsu.csv", "cp932").splitlines()
+    return lambda: parser.parse(YEAR, lines)
+
+
+def command(*args):
+    command = [sys.executable, *args]
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return lambda: subprocess.run(
+        command, cwd=root, check=True, capture_output=True
+    )
+
+
+"""ベンチマーク: 名前 → 作業ディレクトリを受け取り, 準備をして測る関数を
+返す関数"""
+BENCHMARKS = {
+    "render.yearly": lambda directory: render(
+        directory, lambda: planner.YearlyPlanner(YEAR)
+    ),
+    "render.weekly": lambda directory: render(
+        directory, lambda: planner.WeeklyPlanner(YEAR)
+    ),
+    "render.todo": lambda directory: render(directory, planner.ToDoList),
+    "render.weekly_events": render_events,
+    "render.todo_tasks": render_tasks,
+    "almanac.day_of_week": day_of_week,
+    "almanac.add_holidays": add_holidays,
+    "almanac.seasons": seasons,
+    "ics.load": load_events,
+    "scrape.rokuyo": parse_rokuyo,
+    "scrape.naoj": parse_naoj,
+    "scrape.cao": parse_cao,
+    "python.startup": lambda directory: command("-c", "pass"),
+    "cli.cold_start": lambda directory: command("-m", "planner", "--version"),
+    "cli.help": lambda directory: command("-m", "planner", "--help"),
+}
+
+"""別プロセスで動かすため tracemalloc で測れないもの"""
+SUBPROCESS_BENCHMARKS = ("python.startup", "cli.cold_start", "cli.help")
+
+"""起動の予算: 名前 → インタープリターの起動 (python.startup) を除いた
+所要時間の上限 (秒)"""
+BUDGETS = {
+    "cli.cold_start": 0.05,
+    "cli.help": 0.05,
+}
+
+
+def measure(name, setup, repeat=REPEAT):
+    """一回あたりの所要時間 (秒) と最大メモリー使用量 (バイト)
+
+    出力などのファイルは一時ディレクトリに書き, 測り終えたら消す。
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        run = setup(directory)
+        timer = timeit.Timer(run)
+        number, _ = timer.autorange()
+        times = [elapsed / number for elapsed in timer.repeat(repeat, number)]
+
+        peak_memory = None
+        if name not in SUBPROCESS_BENCHMARKS:
+            tracemalloc.start()
+            try:
+                run()
+                peak_memory = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+    return {
+        "repeat": repeat,
+        "number": number,
+        "min": min(times),
+        "median": statistics.median(times),
+        "peak_memory": peak_memory,
+    }
+
+
+def environment():
+    versions = {}
+    for package in ("reportlab", "beautifulsoup4", "PyYAML"):
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "packages": versions,
+    }
+
+
+def run(names=None, file=sys.stdout):
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if names and not any(name.startswith(prefix) for prefix in names):
+            continue
+        results[name] = measure(name, setup)
+        print(format_result(name, results[name]), file=file)
+    return {"format": FORMAT, "environment": environment(), "results": results}
+
+
+def format_result(name, result):
+    peak_memory = result["peak_memory"]
+    return "{:<22} {:>10.3f}ms {:>10.3f}ms {:>10}".format(
+        name,
+        result["median"] * 1000,
+        result["min"] * 1000,
+        "-" if peak_memory is None else "{:.1f}KiB".format(peak_memory / 1024),
+    )
+
+
+def check_budgets(results, budgets=BUDGETS):
+    """起動の予算を超えたか
+
+    [(名前, 所要時間, 予算, 超えたか)] を返す。所要時間は最小値から
+    python.startup の最小値を引いたもの。
+    """
+    startup = results.get("python.startup")
+    if startup is None:
+        return []
+    rows = []
+    for name, budget in budgets.items():
+        result = results.get(name)
+        if result is None:
+            continue
+        elapsed = result["min"] - startup["min"]
+        rows.append((name, elapsed, budget, elapsed > budget))
+    return rows
+
+
+def compare(baseline, current, threshold=THRESHOLD):
+    """基準と比べた変化率 (%) と, しきい値を超えたかどうか
+
+    [(名前, 項目, 基準, 現在, 変化率, 悪化したか)] を返す。
+    所要時間は揺らぎの少ない最小値で比べる。
+    """
+    rows = []
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        for metric in ("min", "peak_memory"):
+            before, after = base.get(metric), result.get(metric)
+            if not before or after is None:
+                continue
+            change = (after / before - 1) * 100
+            rows.append(
+                (name, metric, before, after, change, change > threshold)
+            )
+    return rows
+
+
+def load(filename):
+    with open(filename, encoding="utf-8") as f:
+        results = json.load(f)
+    if results.get("format") != FORMAT:
+        raise ValueError("{}: unsupported format".format(filename))
+    return results
+
+
+def run_main(args):
+    print(
+        "{:<22} {:>12} {:>12} {:>10}".format(
+            "benchmark", "median", "min", "peak"
+        )
+    )
+    results = run(args.benchmark)
+    if args.output:
+        with open(args.output, mode="w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    status = report_budgets(results["results"])
+    if args.baseline:
+        status |= report(load(args.baseline), results, args.threshold)
+    return status
+
+
+def compare_main(args):
+    return report(load(args.baseline), load(args.results), args.threshold)
+
+
+def report_budgets(results):
+    rows = check_budgets(results)
+    for name, elapsed, budget, exceeded in rows:
+        print(
+            "{:<22} {:>10.3f}ms budget {:.0f}ms {}".format(
+                name,
+                elapsed * 1000,
+                budget * 1000,
+                "OVER BUDGET" if exceeded else "ok",
+            )
+        )
+    return 1 if any(row[3] for row in rows) else 0
+
+
+def report(baseline, current, threshold):
+    rows = compare(baseline, current, threshold)
+    print(
+        "{:<22} {:<12} {:>12} {:>12} {:>8}".format(
+            "benchmark", "metric", "baseline", "current", "change"
+        )
+    )
+    for name, metric, before, after, change, regressed in rows:
+        print(
+            "{:<22} {:<12} {:>12.6g} {:>12.6g} {:>+7.1f}% {}".format(
+                name,
+                metric,
+                before,
+                after,
+                change,
+                "REGRESSION" if regressed else "",
+            ).rstrip()
+        )
+    regressions = sum(1 for row in rows if row[5])
+    print("{} regressions (threshold {}%)".format(regressions, threshold))
+    return 1 if regressions else 0
+
+
+def create_parser():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="ベンチマークを実行する")
+    run_parser.add_argument(
+        "-k",
+        "--benchmark",
+        action="append",
+        help="実行するベンチマークの名前 (前方一致), 省略時はすべて",
+    )
+    run_parser.add_argument("-o", "--output", help="結果を保存する JSON")
+    run_parser.add_argument("-b", "--baseline", help="比較する基準の JSON")
+    run_parser.add_argument(
+        "-t",
+        "--threshold",
+        default=THRESHOLD,
+        type=float,
+        help="しきい値 (%%)",
+    )
+    run_parser.set_defaults(main=run_main)
+
+    compare_parser = commands.add_parser("compare", help="結果を比較する")
+    compare_parser.add_argument("baseline", help="基準の JSON")
+    compare_parser.add_argument("results", help="比較する JSON")
+    compare_parser.add_argument(
+        "-t",
+        "--threshold",
+        default=THRESHOLD,
+        type=float,
+        help="しきい値 (%%)",
+    )
+    compare_parser.set_defaults(main=compare_main)
+    return parser
+
+
+def main(argv=None):
+    args = create_parser().parse_args(argv)
+    return args.main(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,4 @@
+"""手帳"""
+
+"""バージョン. pyproject.toml の tool.poetry.version と同じ値にする"""
+__version__ = "0.1.0"
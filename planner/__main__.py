@@ -1,17 +1,52 @@
+"""コマンドライン
+
+--help や --version はすぐに返るよう, reportlab や bs4 などを読み込む
+モジュールは各コマンドの関数の中で必要になってから読み込む。
+"""
+
 import argparse
 import sys
-import tomllib
-from datetime import datetime
-from pathlib import Path
+import time
 
-from . import planner
+from . import __version__
+from .paper import PAPERS
 
 
 def version_template():
-    project_metadata = Path(__file__).parent.parent.joinpath("pyproject.toml")
-    with open(project_metadata, mode="rb") as metadata:
-        version_number = tomllib.load(metadata)["tool"]["poetry"]["version"]
-    return "%(prog)s {}".format(version_number)
+    return "%(prog)s {}".format(__version__)
+
+
+def years_type(value):
+    from . import years
+
+    try:
+        return years.parse_years(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            "年または年の範囲 (例: 2024, 2024-2035) を指定してください"
+        )
+
+
+def pages_type(value):
+    from . import page_plan
+
+    try:
+        return page_plan.parse_pages(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            "ページ番号または範囲 (例: 3, 10-12, 1,5-6) を指定してください"
+        )
+
+
+def date_type(value):
+    from datetime import date
+
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            "日付 (例: 2024-07-15) を指定してください"
+        )
 
 
 def create_parser():
@@ -25,44 +60,458 @@ def create_parser():
         version=version_template(),
     )
     parser.add_argument(
-        "year", nargs="?", default=(datetime.now().year + 1), type=int
+        "year",
+        nargs="?",
+        default=[time.localtime().tm_year + 1],
+        type=years_type,
+        help="年, または年の範囲 (例: 2024-2035)",
     )
     parser.add_argument("-y", "--yearly", action="store_true", help="年間予定表")
     parser.add_argument("-w", "--weekly", action="store_true", help="週間予定表")
     parser.add_argument("-t", "--todo", action="store_true", help="TODOリスト")
     parser.add_argument("-a", "--all", action="store_true", help="すべて")
-    parser.add_argument("-R", "--rokuyo", help="六曜定義ファイル, 予定表を出力する場合必須")
-    parser.add_argument("-H", "--holiday", help="国民の祝日定義ファイル, 予定表を出力する場合必須")
+    parser.add_argument(
+        "-T",
+        "--tasks",
+        metavar="FILE",
+        help="TODOリストに書くタスクの CSV または JSON Lines ファイル (-t を含む)",
+    )
+    parser.add_argument(
+        "-R",
+        "--rokuyo",
+        help="六曜定義ファイル, 省略時は旧暦から計算. {year} は年に置換",
+    )
+    parser.add_argument(
+        "-H",
+        "--holiday",
+        help="国民の祝日定義ファイル, 省略時は祝日法から計算. {year} は年に置換",
+    )
+    parser.add_argument(
+        "-A",
+        "--almanac",
+        help="コンパイル済みの暦注ファイル, 指定時は -R と -H より優先",
+    )
+    parser.add_argument(
+        "-e",
+        "--events",
+        action="append",
+        metavar="ICS",
+        help="予定を書き込む iCalendar ファイル (複数指定可)",
+    )
+    parser.add_argument(
+        "-j", "--jobs", default=1, type=int, help="並列に出力するプロセス数"
+    )
+    parser.add_argument(
+        "-J",
+        "--month-jobs",
+        default=1,
+        type=int,
+        help="一つの予定表の月を並列に描くプロセス数",
+    )
+    parser.add_argument(
+        "-i",
+        "--incremental",
+        action="store_true",
+        help="月ごとの描画結果をキャッシュし, 変更のあった月だけ描き直す",
+    )
+    parser.add_argument(
+        "-P",
+        "--paper",
+        default="A4",
+        choices=PAPERS,
+        help="用紙 (横向き)",
+    )
+    parser.add_argument(
+        "-o", "--output", default=".", help="出力先ディレクトリ"
+    )
+    parser.add_argument(
+        "--pages",
+        type=pages_type,
+        help="年間・週間予定表のうち出力するページ (例: 10-12)",
+    )
+    parser.add_argument(
+        "--from",
+        dest="start",
+        type=date_type,
+        help="この日付以降を含むページだけを出力する (例: 2024-07-15)",
+    )
+    parser.add_argument(
+        "--to",
+        dest="end",
+        type=date_type,
+        help="この日付以前を含むページだけを出力する",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="REPORT",
+        help="区間ごとの所要時間とカウンターを JSON に出力する (-j 1 で実行)",
+    )
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="--profile にメモリー使用量 (tracemalloc) を含める",
+    )
+    parser.add_argument(
+        "--profile-stats",
+        metavar="FILE",
+        help="--profile とともに cProfile の結果 (pstats) を出力する",
+    )
 
     return parser
 
 
-if __name__ == "__main__":
+def create_fetch_parser():
+    parser = argparse.ArgumentParser(
+        prog="planner fetch",
+        description="国民の祝日と六曜の定義ファイルを取得する",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        "year", type=years_type, help="年, または年の範囲 (例: 2020-2030)"
+    )
+    parser.add_argument(
+        "-k",
+        "--kind",
+        action="append",
+        choices=("holiday", "rokuyo"),
+        help="取得する定義, 省略時はすべて",
+    )
+    parser.add_argument(
+        "-o", "--output", default=".", help="出力先ディレクトリ"
+    )
+    parser.add_argument(
+        "--cache",
+        help="キャッシュディレクトリ, 省略時は ~/.cache/planner/fetch",
+    )
+    parser.add_argument(
+        "-c", "--concurrency", default=8, type=int, help="同時に送る要求の数"
+    )
+    parser.add_argument(
+        "--retries", default=3, type=int, help="失敗した要求の再試行回数"
+    )
+    parser.add_argument(
+        "--timeout", default=10, type=float, help="要求のタイムアウト (秒)"
+    )
+    return parser
+
+
+def fetch_main(argv):
+    args = create_fetch_parser().parse_args(argv)
+    import asyncio
+
+    from . import fetch
+
+    fetcher = fetch.Fetcher(
+        fetch.Cache(args.cache),
+        concurrency=args.concurrency,
+        timeout=args.timeout,
+        retries=args.retries,
+    )
+    results = asyncio.run(
+        fetch.fetch_years(fetcher, args.year, args.output, args.kind)
+    )
+
+    for result in results:
+        if result.error:
+            print(
+                "{}: {}".format(result.filename, result.error), file=sys.stderr
+            )
+    print(
+        " ".join(
+            "{}={}".format(key, value)
+            for key, value in fetcher.statistics.items()
+        ),
+        file=sys.stderr,
+    )
+    return 0 if not any(result.error for result in results) else 1
+
+
+def create_compile_almanac_parser():
+    parser = argparse.ArgumentParser(
+        prog="planner compile-almanac",
+        description="定義ファイルから暦注ファイルを作る",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        "directory",
+        nargs="?",
+        default="data",
+        help="rokuyo-{year}.txt と holiday-{year}.txt のあるディレクトリ",
+    )
+    parser.add_argument(
+        "-o", "--output", default="almanac.bin", help="出力する暦注ファイル"
+    )
+    return parser
+
+
+def compile_almanac_main(argv):
+    args = create_compile_almanac_parser().parse_args(argv)
+    from pathlib import Path
+
+    from . import almanac_store
+    from .almanac import Almanac
+
+    directory = Path(args.directory)
+    rokuyo_files = sorted(directory.glob("rokuyo-*.txt"))
+    holiday_files = sorted(directory.glob("holiday-*.txt"))
+    if not rokuyo_files and not holiday_files:
+        print("{}: no definition files".format(directory), file=sys.stderr)
+        return 1
+
+    rokuyo = Almanac.read_definitions(*rokuyo_files)
+    holidays = Almanac.read_definitions(*holiday_files)
+    Almanac.add_holidays(holidays)
+    try:
+        almanac_store.compile_almanac(args.output, rokuyo, holidays)
+    except ValueError as e:
+        print("{}: {}".format(directory, e), file=sys.stderr)
+        return 1
+    return 0
+
+
+def create_serve_parser():
+    parser = argparse.ArgumentParser(
+        prog="planner serve",
+        description="予定表を出力する HTTP サービスを起動する",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        "--host", default="127.0.0.1", help="待ち受けるアドレス"
+    )
+    parser.add_argument(
+        "-p", "--port", default=8000, type=int, help="待ち受けるポート"
+    )
+    parser.add_argument(
+        "-R",
+        "--rokuyo",
+        help="六曜定義ファイル, 省略時は旧暦から計算. {year} は年に置換",
+    )
+    parser.add_argument(
+        "-H",
+        "--holiday",
+        help="国民の祝日定義ファイル, 省略時は祝日法から計算. {year} は年に置換",
+    )
+    parser.add_argument(
+        "-A",
+        "--almanac",
+        help="コンパイル済みの暦注ファイル, 指定時は -R と -H より優先",
+    )
+    parser.add_argument(
+        "--preload", type=years_type, help="起動時に暦注を読み込む年の範囲"
+    )
+    parser.add_argument(
+        "--cache-size",
+        default=64,
+        type=int,
+        help="出力した PDF のキャッシュの上限 (MB)",
+    )
+    parser.add_argument(
+        "-i",
+        "--incremental",
+        action="store_true",
+        help="月ごとの描画結果をキャッシュし, 変更のあった月だけ描き直す",
+    )
+    parser.add_argument(
+        "-v", "--verbose", action="store_true", help="要求ごとにログを出力する"
+    )
+    return parser
+
+
+def serve_main(argv):
+    args = create_serve_parser().parse_args(argv)
+    from . import page_cache, server
+
+    service = server.RenderService(
+        args.rokuyo,
+        args.holiday,
+        args.almanac,
+        cache_bytes=args.cache_size * 1024 * 1024,
+        page_cache=page_cache.PageCache() if args.incremental else None,
+    )
+    for year in args.preload or []:
+        service.load_year(year)
+    server.serve(service, args.host, args.port, args.verbose)
+    return 0
+
+
+def create_analyze_parser():
+    parser = argparse.ArgumentParser(
+        prog="planner analyze",
+        description="PDF のページごとの大きさ, 命令, フォントを集計する",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("file", nargs="*", help="解析する PDF")
+    parser.add_argument(
+        "-m",
+        "--modes",
+        metavar="YEAR",
+        type=int,
+        help="圧縮とフォームの有無を変えて出力した予定表を比べる",
+    )
+    parser.add_argument(
+        "-k",
+        "--kind",
+        default="yearly",
+        choices=("yearly", "weekly", "todo"),
+        help="--modes で出力する予定表",
+    )
+    parser.add_argument(
+        "-P",
+        "--paper",
+        default="A4",
+        choices=PAPERS,
+        help="--modes で出力する用紙 (横向き)",
+    )
+    parser.add_argument(
+        "-A",
+        "--almanac",
+        help="--modes で使うコンパイル済みの暦注ファイル, 省略時は計算する",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="--modes で出力する先のディレクトリ, 省略時は一時ディレクトリ",
+    )
+    parser.add_argument(
+        "--json",
+        metavar="REPORT",
+        help="解析結果を JSON に出力する (- なら標準出力)",
+    )
+    return parser
+
+
+def modes_almanac(args):
+    """--modes で出力する予定表の暦注. ToDoリストなら None"""
+    if args.kind == "todo":
+        return None
+    from . import batch
+    from .almanac import Almanac
+
+    if args.almanac is not None:
+        return batch.load_almanac(args.almanac, [args.modes])
+    return Almanac.compute(args.modes)
+
+
+def analyze_main(argv):
+    parser = create_analyze_parser()
+    args = parser.parse_args(argv)
+    if not args.file and args.modes is None:
+        parser.error("PDF か --modes を指定してください")
+    import tempfile
+
+    from . import analyze
+
+    with tempfile.TemporaryDirectory() as directory:
+        filenames = list(args.file)
+        try:
+            if args.modes is not None:
+                filenames += analyze.render_modes(
+                    args.modes,
+                    args.kind,
+                    args.output or directory,
+                    modes_almanac(args),
+                    args.paper,
+                )
+            reports = [analyze.analyze(filename) for filename in filenames]
+        except (OSError, ValueError) as e:
+            print(e, file=sys.stderr)
+            return 1
+
+    if args.json == "-":
+        analyze.write_json(reports, sys.stdout)
+        return 0
+    if args.json:
+        with open(args.json, mode="w", encoding="utf-8") as f:
+            analyze.write_json(reports, f)
+    for report in reports:
+        analyze.format_report(report, sys.stdout)
+        print()
+    if len(reports) > 1:
+        analyze.format_comparison(reports, sys.stdout)
+    return 0
+
+
+"""サブコマンド"""
+COMMANDS = {
+    "fetch": fetch_main,
+    "compile-almanac": compile_almanac_main,
+    "serve": serve_main,
+    "analyze": analyze_main,
+}
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+
+    if argv and argv[0] in COMMANDS:
+        return COMMANDS[argv[0]](argv[1:])
+
     parser = create_parser()
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
-    if len(sys.argv) == 1:
+    if len(argv) == 0:
         parser.print_help()
-        sys.exit(0)
-
-    year = args.year
+        return 0
 
-    if args.all or args.yearly or args.weekly:
-        if args.rokuyo is None or args.holiday is None:
-            parser.print_help()
-            parser.error("六曜定義ファイル／国民の祝日定義ファイルを指定してください")
-        else:
-            planner.Almanac.load_rokuyo(args.rokuyo)
-            planner.Almanac.load_national_holidays(args.holiday)
+    from . import batch, instrument
 
+    kinds = []
     if args.all or args.yearly:
-        yearly_planner = planner.YearlyPlanner(year)
-        yearly_planner.print("{}.pdf".format(year))
-
+        kinds.append("yearly")
     if args.all or args.weekly:
-        weekly_planner = planner.WeeklyPlanner(year)
-        weekly_planner.print("{}-weekly.pdf".format(year))
+        kinds.append("weekly")
+    if args.all or args.todo or args.tasks:
+        kinds.append("todo")
+
+    jobs = batch.plan_jobs(
+        args.year,
+        kinds,
+        args.output,
+        args.paper,
+        args.month_jobs,
+        args.pages,
+        args.start,
+        args.end,
+        args.tasks,
+    )
+    if set(batch.ALMANAC_KINDS) & set(kinds) and not any(
+        job.kind in batch.ALMANAC_KINDS for job in jobs
+    ):
+        parser.error("--from/--to がどの年にも重なりません")
+    start = time.perf_counter()
+    if args.profile:
+        # 計測はこのプロセスの中でだけ行う
+        with instrument.Profiler(
+            args.profile_memory, args.profile_stats
+        ) as profiler:
+            results = batch.run(
+                jobs,
+                args.rokuyo,
+                args.holiday,
+                1,
+                args.almanac,
+                args.incremental,
+                args.events,
+            )
+        profiler.write(args.profile)
+    else:
+        results = batch.run(
+            jobs,
+            args.rokuyo,
+            args.holiday,
+            args.jobs,
+            args.almanac,
+            args.incremental,
+            args.events,
+        )
+    elapsed = time.perf_counter() - start
 
-    if args.all or args.todo:
-        todo_list = planner.ToDoList()
-        todo_list.print("todo.pdf")
+    if len(jobs) > 1 or not all(result.ok for result in results):
+        batch.report(results, elapsed, sys.stderr)
+
+    return 0 if all(result.ok for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
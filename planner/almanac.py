@@ -1,10 +1,11 @@
-from datetime import datetime, timedelta
+from collections.abc import Mapping
+from datetime import date
 from enum import Enum
-from importlib.resources import files
+from types import MappingProxyType
 
-import yaml
-
-import planner.data.conf
+from planner import holiday, lunisolar, solar_terms
+from planner.almanac_store import AlmanacStore
+from planner.data.conf.day_of_week import DAYS_OF_WEEK
 
 
 class BaseDayOfWeek(Enum):
@@ -35,7 +36,98 @@ def static_init(cls):
 
 @static_init
 class Almanac:
-    """暦注"""
+    """暦注
+
+    インスタンスは一年以上の六曜・祝日・二十四節気と雑節を持つ,
+    変更できない暦注。
+    create, compute, open で作り, 予定表に渡して使う。スレッド間で
+    共有でき, 年の異なる予定表を同時に出力できる。
+
+        almanac = Almanac.compute(2024, 2025)
+        YearlyPlanner(2024, almanac=almanac).print("2024.pdf")
+
+    load_rokuyo などのクラスメソッドは従来の API で, クラス属性の
+    rokuyo と holiday に読み込む。暦注を渡さない予定表はクラス属性を
+    使う (current)。
+    """
+
+    def __init__(self, rokuyo=None, holiday=None, years=None, store=None):
+        """rokuyo と holiday は YYYYMMDD 形式のキーの辞書
+
+        years を省略した場合は辞書に含まれる年を収録した年とする。
+        渡した辞書は以後変更しない。二十四節気と雑節 (season) は
+        収録した年の分を, 年ごとに初めて引いたときに計算する。
+        """
+        rokuyo = {} if rokuyo is None else rokuyo
+        holiday = {} if holiday is None else holiday
+        if years is None:
+            if store is not None:
+                years = range(store.first_year, store.last_year + 1)
+            else:
+                years = {int(key[0:4]) for key in (*rokuyo, *holiday)}
+        for name, value in (
+            ("rokuyo", _read_only(rokuyo)),
+            ("holiday", _read_only(holiday)),
+            ("season", SeasonMapping(years)),
+            ("years", frozenset(years)),
+            ("store", store),
+        ):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Almanac is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Almanac is immutable")
+
+    def __repr__(self):
+        return "Almanac(years={})".format(sorted(self.years))
+
+    @classmethod
+    def create(cls, years, rokuyo_files=None, holiday_files=None):
+        """years の暦注
+
+        六曜と祝日は定義ファイルから読み込む。定義ファイルを省略した
+        場合, 六曜は旧暦から, 祝日は祝日法から計算する。
+        """
+        if rokuyo_files is not None:
+            rokuyo = cls.read_definitions(*rokuyo_files)
+        else:
+            rokuyo = {}
+            for year in years:
+                rokuyo.update(lunisolar.rokuyo_of_year(year))
+        if holiday_files is not None:
+            holidays = cls.read_definitions(*holiday_files)
+            cls.add_holidays(holidays)
+        else:
+            holidays = {}
+            for year in years:
+                holidays.update(holiday.national_holidays(year))
+        return cls(rokuyo, holidays, years)
+
+    @classmethod
+    def compute(cls, *years):
+        """六曜を旧暦から, 祝日を祝日法から計算した暦注"""
+        return cls.create(years)
+
+    @classmethod
+    def open(cls, filename):
+        """コンパイル済みの暦注ファイルを開く"""
+        store = AlmanacStore(filename)
+        return cls(store.rokuyo, store.holiday, store=store)
+
+    @classmethod
+    def current(cls):
+        """クラス属性に読み込んだ暦注 (従来の API) のインスタンス"""
+        return cls(
+            getattr(cls, "rokuyo", None),
+            getattr(cls, "holiday", None),
+            store=getattr(cls, "store", None),
+        )
+
+    def covers(self, year):
+        """year の暦注を持っているか"""
+        return year in self.years
 
     @classmethod
     def static_init(cls):
@@ -43,61 +135,69 @@ class Almanac:
             "DayOfWeek",
             [
                 (day_of_week["name_en_long"], day_of_week)
-                for day_of_week in yaml.safe_load(
-                    open(
-                        files(planner.data.conf).joinpath("day_of_week.yml"),
-                        "r",
-                        encoding="utf-8",
-                    )
-                )
+                for day_of_week in DAYS_OF_WEEK
             ],
+            qualname="Almanac.DayOfWeek",
         )
         setattr(cls, "DayOfWeek", DayOfWeek)
 
+    @staticmethod
+    def read_definitions(*files):
+        definitions = {}
+        for file in files:
+            with open(file, mode="r", encoding="utf-8") as f:
+                definitions.update(
+                    {
+                        date: label
+                        for date, label in [line.split() for line in f]
+                    }
+                )
+        return definitions
+
+    @classmethod
+    def load_rokuyo(cls, *files):
+        rokuyo = cls.read_definitions(*files)
+        setattr(cls, "rokuyo", rokuyo)
+
     @classmethod
-    def load_rokuyo(cls, file):
-        with open(file, mode="r", encoding="utf-8") as f:
-            rokuyo = {
-                date: label for date, label in [line.split() for line in f]
-            }
+    def compute_rokuyo(cls, *years):
+        rokuyo = {}
+        for year in years:
+            rokuyo.update(lunisolar.rokuyo_of_year(year))
         setattr(cls, "rokuyo", rokuyo)
 
     @classmethod
-    def load_national_holidays(cls, file):
-        with open(file, mode="r", encoding="utf-8") as f:
-            holidays = {
-                date: label for date, label in [line.split() for line in f]
-            }
+    def load_national_holidays(cls, *files):
+        holidays = cls.read_definitions(*files)
         cls.add_holidays(holidays)
         setattr(cls, "holiday", holidays)
 
     @classmethod
-    def add_holidays(cls, national_holidays):
+    def compute_national_holidays(cls, *years):
         holidays = {}
+        for year in years:
+            holidays.update(holiday.national_holidays(year))
+        setattr(cls, "holiday", holidays)
 
-        # 国民の祝日に関する法律第3条2項
-        days = list(national_holidays)
-        for day in days:
-            day_of_week = Almanac.day_of_week(day)
-            if day_of_week == Almanac.DayOfWeek.Sunday:
-                next_day = (
-                    datetime.strptime(day, "%Y%m%d") + timedelta(days=1)
-                ).strftime("%Y%m%d")
-                if next_day not in days:
-                    holidays[next_day] = "振替休日"
-
-        # 国民の祝日に関する法律第3条3項
-        for index in range(0, len(days) - 1):
-            day1 = datetime.strptime(days[index], "%Y%m%d")
-            day3 = datetime.strptime(days[index + 1], "%Y%m%d")
-            if (day3 - day1).days == 2:
-                day2 = day1 + timedelta(days=1)
-                day2_as_str = day2.strftime("%Y%m%d")
-                if day2_as_str not in national_holidays:
-                    holidays[day2_as_str] = "国民の休日"
-
-        for day, name in holidays.items():
-            national_holidays[day] = name
+    @classmethod
+    def load_store(cls, filename):
+        """コンパイル済みの暦注ファイルから六曜と祝日を読み込む
+
+        ファイルは mmap で開き, 六曜と祝日は必要になった日の分だけ引く。
+        """
+        store = AlmanacStore(filename)
+        setattr(cls, "store", store)
+        setattr(cls, "rokuyo", store.rokuyo)
+        setattr(cls, "holiday", store.holiday)
+
+    @classmethod
+    def add_holidays(cls, national_holidays):
+        days = sorted(
+            (date(int(day[0:4]), int(day[4:6]), int(day[6:8])), name)
+            for day, name in national_holidays.items()
+        )
+        for day, name in holiday.derive_holidays(days):
+            national_holidays[day.strftime("%Y%m%d")] = name
 
     @staticmethod
     def day_of_week(date):
@@ -118,3 +218,44 @@ class Almanac:
         r = -2 * C + C // 4 if y >= 1582 else -1 * C + 5
         h = (d + (26 * (m + 1)) // 10 + Y + Y // 4 + r) % 7
         return Almanac.DayOfWeek(h)
+
+
+def _read_only(mapping):
+    if isinstance(mapping, dict):
+        return MappingProxyType(mapping)
+    return mapping
+
+
+class SeasonMapping(Mapping):
+    """収録した年の二十四節気と雑節を YYYYMMDD 形式のキーで引く辞書
+
+    年ごとに初めて引いたときに計算して覚えておく。暦注ファイルを開く
+    だけなら計算しない。
+    """
+
+    def __init__(self, years):
+        self.years = frozenset(years)
+        self.__seasons = {}
+
+    def __year(self, year):
+        seasons = self.__seasons.get(year)
+        if seasons is None:
+            seasons = solar_terms.seasons_of_year(year)
+            self.__seasons[year] = seasons
+        return seasons
+
+    def __getitem__(self, key):
+        try:
+            year = int(key[0:4])
+        except (ValueError, TypeError):
+            raise KeyError(key)
+        if year not in self.years:
+            raise KeyError(key)
+        return self.__year(year)[key]
+
+    def __iter__(self):
+        for year in sorted(self.years):
+            yield from self.__year(year)
+
+    def __len__(self):
+        return sum(len(self.__year(year)) for year in self.years)
@@ -0,0 +1,235 @@
+"""コンパイル済みの暦注ファイル
+
+複数年分の曜日・六曜・祝日を一つのバイナリファイルにまとめたもの。
+ファイルは mmap で開き, 日付の序数から固定長のレコードを直接引く。
+開く処理はヘッダーを読むだけで, 収録した年数によらない。
+
+ファイルの構成 (数値はすべてリトルエンディアン)
+
+- ヘッダー (HEADER)
+- ラベルの文字列表: ラベル数 + 1 個の uint32 のオフセットと UTF-8 の本体.
+  ラベル番号 0 は空文字列
+- レコード (RECORD): 初日から一日ずつ, 曜日・六曜・祝日のラベル番号
+"""
+
+import mmap
+import os
+import struct
+from collections.abc import Mapping
+from datetime import date
+
+"""ファイルの識別子"""
+MAGIC = b"PLNALMNC"
+
+"""形式の版. 互換性のない変更をしたら上げる"""
+VERSION = 1
+
+"""識別子, 版, レコード長, 初日の序数, 日数, ラベル数,
+ラベルのオフセット表の位置, ラベルの本体の位置, レコードの位置"""
+HEADER = struct.Struct("<8sHHIIIIII")
+
+"""曜日 (Almanac.DayOfWeek の番号), 六曜のラベル番号, 祝日のラベル番号"""
+RECORD = struct.Struct("<BxHH")
+
+_OFFSET = struct.Struct("<I")
+
+
+def _to_ordinal(day):
+    """日付 (date または YYYYMMDD 形式の文字列) を序数に変換する"""
+    if isinstance(day, date):
+        return day.toordinal()
+    return date(int(day[0:4]), int(day[4:6]), int(day[6:8])).toordinal()
+
+
+def compile_almanac(filename, rokuyo, holiday, years=None):
+    """六曜と祝日の辞書 (YYYYMMDD 形式のキー) から暦注ファイルを作る
+
+    years を省略した場合は, 辞書に含まれる年の範囲を収録する。
+    六曜の定義がない年が範囲にあれば, 空の暦注を収録せずに
+    ValueError にする。
+    """
+    if years is None:
+        keys = [int(key[0:4]) for key in (*rokuyo, *holiday)]
+        if not keys:
+            raise ValueError("no definitions to compile")
+        years = range(min(keys), max(keys) + 1)
+    covered = {int(key[0:4]) for key in rokuyo}
+    missing = [year for year in years if year not in covered]
+    if missing:
+        raise ValueError(
+            "no rokuyo definitions for {}".format(", ".join(map(str, missing)))
+        )
+    first = date(min(years), 1, 1).toordinal()
+    end = date(max(years) + 1, 1, 1).toordinal()
+
+    labels = [""]
+    label_ids = {"": 0}
+
+    def intern(label):
+        if label not in label_ids:
+            label_ids[label] = len(labels)
+            labels.append(label)
+        return label_ids[label]
+
+    records = bytearray(RECORD.size * (end - first))
+    for index, ordinal in enumerate(range(first, end)):
+        day = date.fromordinal(ordinal)
+        key = day.strftime("%Y%m%d")
+        RECORD.pack_into(
+            records,
+            index * RECORD.size,
+            (day.weekday() + 2) % 7,
+            intern(rokuyo.get(key, "")),
+            intern(holiday.get(key, "")),
+        )
+
+    blob = bytearray()
+    offsets = bytearray()
+    for label in labels:
+        offsets += _OFFSET.pack(len(blob))
+        blob += label.encode("utf-8")
+    offsets += _OFFSET.pack(len(blob))
+
+    labels_offset = HEADER.size
+    blob_offset = labels_offset + len(offsets)
+    # レコードは 8 バイト境界にそろえる
+    records_offset = (blob_offset + len(blob) + 7) // 8 * 8
+    header = HEADER.pack(
+        MAGIC,
+        VERSION,
+        RECORD.size,
+        first,
+        end - first,
+        len(labels),
+        labels_offset,
+        blob_offset,
+        records_offset,
+    )
+    padding = bytes(records_offset - blob_offset - len(blob))
+
+    temporary = "{}.{}.tmp".format(filename, os.getpid())
+    with open(temporary, mode="wb") as f:
+        f.write(header + offsets + blob + padding + records)
+    os.replace(temporary, filename)
+
+
+class AlmanacStore:
+    """暦注ファイルを mmap で開いたもの"""
+
+    def __init__(self, filename):
+        self.filename = filename
+        with open(filename, mode="rb") as f:
+            self.__map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            (
+                magic,
+                version,
+                record_size,
+                self.first,
+                self.days,
+                self.label_count,
+                self.__labels_offset,
+                self.__blob_offset,
+                self.__records_offset,
+            ) = HEADER.unpack_from(self.__map)
+        except struct.error:
+            self.close()
+            raise ValueError("{}: not an almanac file".format(filename))
+        if magic != MAGIC or record_size != RECORD.size:
+            self.close()
+            raise ValueError("{}: not an almanac file".format(filename))
+        if version != VERSION:
+            self.close()
+            raise ValueError(
+                "{}: unsupported almanac version {}".format(filename, version)
+            )
+        if len(self.__map) < self.__records_offset + self.days * RECORD.size:
+            self.close()
+            raise ValueError("{}: truncated almanac file".format(filename))
+
+        self.__labels = {0: ""}
+        self.rokuyo = LabelMapping(self, 1)
+        self.holiday = LabelMapping(self, 2)
+
+    def close(self):
+        self.__map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def first_year(self):
+        return date.fromordinal(self.first).year
+
+    @property
+    def last_year(self):
+        return date.fromordinal(self.first + self.days - 1).year
+
+    def covers(self, year):
+        return self.first_year <= year <= self.last_year
+
+    def label(self, label_id):
+        """ラベル番号の文字列 (一度読んだものは覚えておく)"""
+        label = self.__labels.get(label_id)
+        if label is None:
+            if not 0 <= label_id < self.label_count:
+                raise IndexError(label_id)
+            position = self.__labels_offset + label_id * _OFFSET.size
+            start, end = struct.unpack_from("<II", self.__map, position)
+            label = str(
+                self.__map[
+                    self.__blob_offset + start : self.__blob_offset + end
+                ],
+                "utf-8",
+            )
+            self.__labels[label_id] = label
+        return label
+
+    def record(self, day):
+        """日付のレコード (曜日の番号, 六曜のラベル番号, 祝日のラベル番号)"""
+        return self.record_at(_to_ordinal(day) - self.first)
+
+    def record_at(self, index):
+        """初日から index 日目のレコード"""
+        if not 0 <= index < self.days:
+            raise KeyError(date.fromordinal(self.first + index))
+        return RECORD.unpack_from(
+            self.__map, self.__records_offset + index * RECORD.size
+        )
+
+    def day_of_week(self, day):
+        """曜日の番号 (Almanac.DayOfWeek の番号)"""
+        return self.record(day)[0]
+
+
+class LabelMapping(Mapping):
+    """暦注ファイルの六曜または祝日を YYYYMMDD 形式のキーで引く辞書
+
+    Almanac.rokuyo, Almanac.holiday の代わりに使う。ラベルが空の日は
+    含まない。
+    """
+
+    def __init__(self, store, field):
+        self.store = store
+        self.field = field
+
+    def __getitem__(self, key):
+        try:
+            label_id = self.store.record(key)[self.field]
+        except (KeyError, ValueError, TypeError):
+            raise KeyError(key)
+        if label_id == 0:
+            raise KeyError(key)
+        return self.store.label(label_id)
+
+    def __iter__(self):
+        for index in range(self.store.days):
+            if self.store.record_at(index)[self.field]:
+                day = date.fromordinal(self.store.first + index)
+                yield day.strftime("%Y%m%d")
+
+    def __len__(self):
+        return sum(1 for _ in self)
@@ -0,0 +1,483 @@
+"""PDF の解析
+
+    planner analyze 2024.pdf 2024-weekly.pdf
+    planner analyze 2024.pdf --json report.json
+    planner analyze --modes 2024 -k weekly
+
+出力した PDF を読み, ページごとのコンテンツストリームの大きさ
+(保存時と展開後), 命令の種類ごとの数, テキストオブジェクトと
+フォントの切り替えの数, フォーム (XObject) と埋め込んだフォントの
+サブセットの大きさを集計する。複数のファイルを渡すと合計を並べて
+比べる。--modes では一つの予定表を圧縮の有無とフォームの有無を
+変えて出力し, 同じ集計を並べる。JSON の出力はサイズの退行の検出に使う。
+
+reportlab が出力する形 (相互参照表と直接の /Length) を前提とする。
+"""
+
+import base64
+import json
+import os
+import re
+import zlib
+from collections import Counter
+from typing import NamedTuple
+
+"""JSON の形式. 互換性のない変更をした場合は値を変える"""
+FORMAT = 1
+
+"""区切り文字と空白"""
+_DELIMITERS = b"()<>[]{}/%"
+_WHITESPACE = b" \t\r\n\f\0"
+
+_TOKEN = re.compile(
+    rb"""
+    (?P<space>[ \t\r\n\f\0]+|%[^\r\n]*)
+    |(?P<open_dict><<)|(?P<close_dict>>>)
+    |(?P<open_array>\[)|(?P<close_array>\])
+    |(?P<name>/[^ \t\r\n\f\0()<>\[\]{}/%]*)
+    |(?P<hex><[0-9A-Fa-f \t\r\n\f]*>)
+    |(?P<string>\()
+    |(?P<number>[+-]?(?:\d+\.?\d*|\.\d+)(?![^ \t\r\n\f\0()<>\[\]{}/%]))
+    |(?P<keyword>[^ \t\r\n\f\0()<>\[\]{}/%]+)
+    """,
+    re.VERBOSE,
+)
+
+
+class Ref(NamedTuple):
+    """間接参照"""
+
+    number: int
+    generation: int
+
+
+class Name(str):
+    """名前オブジェクト (先頭の / を除いた名前)"""
+
+
+class Keyword(str):
+    """キーワード (コンテンツストリームでは演算子)"""
+
+
+class PdfError(ValueError):
+    pass
+
+
+class Lexer:
+    """PDF の字句解析"""
+
+    def __init__(self, data, position=0):
+        self.data = data
+        self.position = position
+
+    def token(self):
+        """次の字句 (種類, 値). 終わりなら None"""
+        while True:
+            match = _TOKEN.match(self.data, self.position)
+            if match is None:
+                if self.position >= len(self.data):
+                    return None
+                raise PdfError("unexpected byte at {}".format(self.position))
+            self.position = match.end()
+            kind = match.lastgroup
+            if kind == "space":
+                continue
+            value = match.group()
+            if kind == "string":
+                return kind, self.__string()
+            if kind == "name":
+                return kind, Name(value[1:].decode("latin-1"))
+            if kind == "hex":
+                return kind, bytes.fromhex(value[1:-1].decode())
+            if kind == "number":
+                return kind, float(value) if b"." in value else int(value)
+            if kind == "keyword":
+                return kind, Keyword(value.decode("latin-1"))
+            return kind, None
+
+    def __string(self):
+        """括弧で囲んだ文字列 (エスケープは展開しない)"""
+        depth = 1
+        start = position = self.position
+        data = self.data
+        while depth:
+            if position >= len(data):
+                raise PdfError("unterminated string at {}".format(start))
+            byte = data[position]
+            if byte == 0x5C:  # backslash
+                position += 1
+            elif byte == 0x28:
+                depth += 1
+            elif byte == 0x29:
+                depth -= 1
+            position += 1
+        self.position = position
+        return data[start : position - 1]
+
+    def value(self, token=None):
+        """次のオブジェクト. 数値の後の「数値 R」は間接参照にする"""
+        if token is None:
+            token = self.token()
+        if token is None:
+            raise PdfError("unexpected end of data")
+        kind, value = token
+        if kind == "open_dict":
+            result = {}
+            while True:
+                token = self.token()
+                if token is not None and token[0] == "close_dict":
+                    return result
+                key = self.value(token)
+                result[key] = self.value()
+        if kind == "open_array":
+            result = []
+            while True:
+                token = self.token()
+                if token is not None and token[0] == "close_array":
+                    return result
+                result.append(self.value(token))
+        if kind == "number" and isinstance(value, int):
+            position = self.position
+            generation = self.token()
+            keyword = self.token()
+            if (
+                generation is not None
+                and generation[0] == "number"
+                and keyword == ("keyword", "R")
+            ):
+                return Ref(value, generation[1])
+            self.position = position
+        return value
+
+
+class Stream(NamedTuple):
+    """ストリーム. data は保存されたままのバイト列"""
+
+    dictionary: dict
+    data: bytes
+
+    def decode(self):
+        """フィルターを展開したバイト列"""
+        filters = self.dictionary.get("Filter", [])
+        if not isinstance(filters, list):
+            filters = [filters]
+        data = self.data
+        for name in filters:
+            if name == "ASCII85Decode":
+                data = base64.a85decode(
+                    data.strip().removesuffix(b"~>"), ignorechars=_WHITESPACE
+                )
+            elif name == "FlateDecode":
+                data = zlib.decompress(data)
+            else:
+                raise PdfError("unsupported filter: {}".format(name))
+        return data
+
+
+class Document:
+    """相互参照表から引く PDF の文書"""
+
+    def __init__(self, data):
+        self.data = data
+        match = re.search(rb"startxref\s+(\d+)\s+%%EOF\s*$", data)
+        if match is None:
+            raise PdfError("startxref not found")
+        self.offsets = {}
+        lexer = Lexer(data, int(match.group(1)))
+        if lexer.token() != ("keyword", "xref"):
+            raise PdfError("cross-reference stream is not supported")
+        while True:
+            token = lexer.token()
+            if token == ("keyword", "trailer"):
+                break
+            first, count = token[1], lexer.token()[1]
+            for number in range(first, first + count):
+                offset, _ = lexer.token(), lexer.token()
+                if lexer.token() == ("keyword", "n"):
+                    self.offsets[number] = offset[1]
+        self.trailer = lexer.value()
+        self.version = re.match(rb"%PDF-(\d+\.\d+)", data).group(1).decode()
+        self.__objects = {}
+
+    def object(self, number):
+        """番号の間接オブジェクト. ストリームは Stream で返す"""
+        if number not in self.__objects:
+            lexer = Lexer(self.data, self.offsets[number])
+            for _ in range(3):  # 番号, 世代, obj
+                lexer.token()
+            value = lexer.value()
+            position = lexer.position
+            if lexer.token() == ("keyword", "stream"):
+                start = lexer.position
+                if self.data[start : start + 2] == b"\r\n":
+                    start += 2
+                elif self.data[start : start + 1] == b"\n":
+                    start += 1
+                length = self.resolve(value["Length"])
+                value = Stream(value, self.data[start : start + length])
+            else:
+                lexer.position = position
+            self.__objects[number] = value
+        return self.__objects[number]
+
+    def resolve(self, value):
+        while isinstance(value, Ref):
+            value = self.object(value.number)
+        return value
+
+    def objects(self):
+        for number in sorted(self.offsets):
+            yield number, self.object(number)
+
+    def pages(self):
+        """ページのオブジェクトを順に返す"""
+        root = self.resolve(self.trailer["Root"])
+        stack = [self.resolve(root["Pages"])]
+        pages = []
+        while stack:
+            node = stack.pop()
+            if node.get("Type") == "Pages":
+                stack.extend(
+                    self.resolve(kid) for kid in reversed(node["Kids"])
+                )
+            else:
+                pages.append(node)
+        return pages
+
+
+def operators(content):
+    """コンテンツストリームの演算子を順に返す"""
+    lexer = Lexer(content)
+    while True:
+        token = lexer.token()
+        if token is None:
+            return
+        kind, value = token
+        if kind != "keyword" or value in ("true", "false", "null"):
+            continue
+        yield value
+        if value == "ID":
+            # インライン画像のデータを読み飛ばす
+            end = content.find(b"EI", lexer.position)
+            lexer.position = len(content) if end < 0 else end + 2
+
+
+def analyze_content(streams):
+    """コンテンツストリームの大きさと演算子の集計"""
+    stored = decoded = 0
+    histogram = Counter()
+    for stream in streams:
+        data = stream.decode()
+        stored += len(stream.data)
+        decoded += len(data)
+        histogram.update(operators(data))
+    return {
+        "bytes": stored,
+        "decoded_bytes": decoded,
+        "operators": dict(sorted(histogram.items())),
+        "text_objects": histogram["BT"],
+        "font_switches": histogram["Tf"],
+        "xobjects_drawn": histogram["Do"],
+    }
+
+
+def analyze(filename):
+    """PDF を解析した結果 (JSON に変換できる辞書)"""
+    with open(filename, mode="rb") as f:
+        document = Document(f.read())
+
+    pages = []
+    for number, page in enumerate(document.pages(), start=1):
+        contents = document.resolve(page.get("Contents", []))
+        if not isinstance(contents, list):
+            contents = [contents]
+        report = {"number": number}
+        report.update(
+            analyze_content(document.resolve(stream) for stream in contents)
+        )
+        resources = document.resolve(page.get("Resources", {}))
+        report["xobjects"] = sorted(
+            document.resolve(resources.get("XObject", {}))
+        )
+        pages.append(report)
+
+    forms = []
+    fonts = []
+    for number, value in document.objects():
+        if isinstance(value, Stream) and value.dictionary.get("Subtype") == (
+            "Form"
+        ):
+            report = {"object": number}
+            report.update(analyze_content([value]))
+            forms.append(report)
+        elif isinstance(value, dict) and value.get("Type") == (
+            "FontDescriptor"
+        ):
+            for key in ("FontFile", "FontFile2", "FontFile3"):
+                if key in value:
+                    font_file = document.resolve(value[key])
+                    fonts.append(
+                        {
+                            "name": value.get("FontName"),
+                            "bytes": len(font_file.data),
+                            "decoded_bytes": len(font_file.decode()),
+                        }
+                    )
+
+    operators = Counter()
+    for report in pages + forms:
+        operators.update(report["operators"])
+    totals = {
+        "pages": len(pages),
+        "content_bytes": sum(page["bytes"] for page in pages),
+        "content_decoded_bytes": sum(page["decoded_bytes"] for page in pages),
+        "form_bytes": sum(form["bytes"] for form in forms),
+        "font_bytes": sum(font["bytes"] for font in fonts),
+        "text_objects": operators["BT"],
+        "font_switches": operators["Tf"],
+        "operators": dict(sorted(operators.items())),
+    }
+    return {
+        "file": str(filename),
+        "bytes": os.path.getsize(filename),
+        "pdf_version": document.version,
+        "objects": len(document.offsets),
+        "totals": totals,
+        "pages": pages,
+        "forms": forms,
+        "fonts": fonts,
+    }
+
+
+def format_report(report, file):
+    """解析結果を表にして出力する"""
+    totals = report["totals"]
+    print(
+        "{}: {} bytes, PDF {}, {} objects, {} pages".format(
+            report["file"],
+            report["bytes"],
+            report["pdf_version"],
+            report["objects"],
+            totals["pages"],
+        ),
+        file=file,
+    )
+    print(
+        "{:>6} {:>9} {:>9} {:>6} {:>5} {:>5} {:>5}".format(
+            "page", "bytes", "decoded", "ops", "BT", "Tf", "Do"
+        ),
+        file=file,
+    )
+    for page in report["pages"] + [
+        dict(form, number="form {}".format(form["object"]))
+        for form in report["forms"]
+    ]:
+        print(
+            "{:>6} {:>9} {:>9} {:>6} {:>5} {:>5} {:>5}".format(
+                page["number"],
+                page["bytes"],
+                page["decoded_bytes"],
+                sum(page["operators"].values()),
+                page["text_objects"],
+                page["font_switches"],
+                page["xobjects_drawn"],
+            ),
+            file=file,
+        )
+    for font in report["fonts"]:
+        print(
+            "font {}: {} bytes ({} decoded)".format(
+                font["name"], font["bytes"], font["decoded_bytes"]
+            ),
+            file=file,
+        )
+    print(
+        "operators: "
+        + ", ".join(
+            "{} {}".format(name, count)
+            for name, count in sorted(
+                totals["operators"].items(), key=lambda item: -item[1]
+            )
+        ),
+        file=file,
+    )
+
+
+"""比較する合計の項目"""
+COMPARED = (
+    "pages",
+    "content_bytes",
+    "content_decoded_bytes",
+    "form_bytes",
+    "font_bytes",
+    "text_objects",
+    "font_switches",
+)
+
+
+def format_comparison(reports, file):
+    """複数の解析結果の合計を並べて出力する"""
+    width = max(len(report["file"]) for report in reports)
+    print(
+        " ".join(
+            ["{:<{}}".format("file", width), "{:>9}".format("bytes")]
+            + ["{:>9}".format(name[:9]) for name in COMPARED]
+        ),
+        file=file,
+    )
+    for report in reports:
+        print(
+            " ".join(
+                [
+                    "{:<{}}".format(report["file"], width),
+                    "{:>9}".format(report["bytes"]),
+                ]
+                + ["{:>9}".format(report["totals"][name]) for name in COMPARED]
+            ),
+            file=file,
+        )
+
+
+"""比べる出力の方式と, 方式ごとに変える Planner のクラス定数"""
+MODES = {
+    "compressed": {},
+    "uncompressed": {"PAGE_COMPRESSION": 0},
+    "no-forms": {"USE_FORMS": False},
+    "uncompressed-no-forms": {"PAGE_COMPRESSION": 0, "USE_FORMS": False},
+}
+
+
+def render_modes(year, kind, directory, almanac, paper="A4"):
+    """予定表を方式ごとに出力し, ファイル名のリストを返す
+
+    almanac は年の暦注 (Almanac)。ToDoリストでは使わない。
+    """
+    from planner import planner
+
+    base = {
+        "yearly": planner.YearlyPlanner,
+        "weekly": planner.WeeklyPlanner,
+        "todo": planner.ToDoList,
+    }[kind]
+    filenames = []
+    for mode, constants in MODES.items():
+        cls = type(base.__name__, (base,), constants)
+        if kind == "todo":
+            document = cls(paper)
+        else:
+            document = cls(year, paper=paper, almanac=almanac)
+        filename = os.path.join(
+            directory, "{}-{}-{}.pdf".format(year, kind, mode)
+        )
+        document.print(filename)
+        filenames.append(filename)
+    return filenames
+
+
+def write_json(reports, file):
+    json.dump(
+        {"format": FORMAT, "reports": reports},
+        file,
+        ensure_ascii=False,
+        indent=2,
+    )
@@ -0,0 +1,213 @@
+"""暦計算のための天文計算
+
+J. Meeus, Astronomical Algorithms (2nd ed.) の 25 章 (太陽の位置) と
+49 章 (月の位相) による。時刻はユリウス日で表す。
+"""
+
+import math
+
+"""日本標準時の協定世界時からの時差 (日)"""
+JST = 9 / 24
+
+"""1 朔望月の平均の長さ (日)"""
+SYNODIC_MONTH = 29.530588861
+
+"""1 太陽年の平均の長さ (日)"""
+TROPICAL_YEAR = 365.242189
+
+_J2000 = 2451545.0
+
+# 序数 (0001-01-01 が 1) とユリウス日 (正午起点) の差
+_ORDINAL_TO_JD = 1721424.5
+
+_NEW_MOON_TERMS = (
+    # (係数, E の次数, M, M', F, Ω)
+    (-0.40720, 0, 0, 1, 0, 0),
+    (0.17241, 1, 1, 0, 0, 0),
+    (0.01608, 0, 0, 2, 0, 0),
+    (0.01039, 0, 0, 0, 2, 0),
+    (0.00739, 1, -1, 1, 0, 0),
+    (-0.00514, 1, 1, 1, 0, 0),
+    (0.00208, 2, 2, 0, 0, 0),
+    (-0.00111, 0, 0, 1, -2, 0),
+    (-0.00057, 0, 0, 1, 2, 0),
+    (0.00056, 1, 1, 2, 0, 0),
+    (-0.00042, 0, 0, 3, 0, 0),
+    (0.00042, 1, 1, 0, 2, 0),
+    (0.00038, 1, 1, 0, -2, 0),
+    (-0.00024, 1, -1, 2, 0, 0),
+    (-0.00017, 0, 0, 0, 0, 1),
+    (-0.00007, 0, 2, 1, 0, 0),
+    (0.00004, 0, 0, 2, -2, 0),
+    (0.00004, 0, 3, 0, 0, 0),
+    (0.00003, 0, 1, 1, -2, 0),
+    (0.00003, 0, 0, 2, 2, 0),
+    (-0.00003, 0, 1, 1, 2, 0),
+    (0.00003, 0, -1, 1, 2, 0),
+    (-0.00002, 0, -1, 1, -2, 0),
+    (-0.00002, 0, 1, 3, 0, 0),
+    (0.00002, 0, 0, 4, 0, 0),
+)
+
+_PLANETARY_TERMS = (
+    # (係数, 定数項, k の係数). 先頭の項の偏角には -0.009173 T^2 が加わる
+    (0.000325, 299.77, 0.107408),
+    (0.000165, 251.88, 0.016321),
+    (0.000164, 251.83, 26.651886),
+    (0.000126, 349.42, 36.412478),
+    (0.000110, 84.66, 18.206239),
+    (0.000062, 141.74, 53.303771),
+    (0.000060, 207.14, 2.453732),
+    (0.000056, 154.84, 7.306860),
+    (0.000047, 34.52, 27.261239),
+    (0.000042, 207.19, 0.121824),
+    (0.000040, 291.34, 1.844379),
+    (0.000037, 161.72, 24.198154),
+    (0.000035, 239.56, 25.513099),
+    (0.000023, 331.55, 3.592518),
+)
+
+
+def delta_t(year):
+    """力学時と世界時の差 ΔT (秒)
+
+    Espenak と Meeus による多項式近似 (1961 年以降) と長期近似式。
+    """
+    if 1961 <= year < 1986:
+        t = year - 1975
+        return 45.45 + 1.067 * t - t**2 / 260 - t**3 / 718
+    if 1986 <= year < 2005:
+        t = year - 2000
+        return (
+            63.86
+            + 0.3345 * t
+            - 0.060374 * t**2
+            + 0.0017275 * t**3
+            + 0.000651814 * t**4
+            + 0.00002373599 * t**5
+        )
+    if 2005 <= year < 2050:
+        t = year - 2000
+        return 62.92 + 0.32217 * t + 0.005589 * t**2
+    u = (year - 1820) / 100
+    if 2050 <= year < 2150:
+        return -20 + 32 * u**2 - 0.5628 * (2150 - year)
+    return -20 + 32 * u**2
+
+
+def jd_from_ordinal(ordinal):
+    """序数の日の 0 時 (世界時) のユリウス日"""
+    return ordinal + _ORDINAL_TO_JD
+
+
+def jst_ordinal(jd):
+    """ユリウス日 (世界時) の時刻が日本標準時で何日にあたるか (序数)"""
+    return math.floor(jd + JST - _ORDINAL_TO_JD)
+
+
+def new_moon(k):
+    """k 番目の朔のユリウス日 (世界時)
+
+    k = 0 は 2000 年 1 月 6 日の朔。
+    """
+    t = k / 1236.85
+    jde = (
+        2451550.09766
+        + SYNODIC_MONTH * k
+        + 0.00015437 * t**2
+        - 0.000000150 * t**3
+        + 0.00000000073 * t**4
+    )
+    e = 1 - 0.002516 * t - 0.0000074 * t**2
+    m = math.radians(
+        2.5534 + 29.10535670 * k - 0.0000014 * t**2 - 0.00000011 * t**3
+    )
+    m_moon = math.radians(
+        201.5643
+        + 385.81693528 * k
+        + 0.0107582 * t**2
+        + 0.00001238 * t**3
+        - 0.000000058 * t**4
+    )
+    f = math.radians(
+        160.7108
+        + 390.67050284 * k
+        - 0.0016118 * t**2
+        - 0.00000227 * t**3
+        + 0.000000011 * t**4
+    )
+    omega = math.radians(
+        124.7746 - 1.56375588 * k + 0.0020672 * t**2 + 0.00000215 * t**3
+    )
+
+    for coefficient, power, a, b, c, d in _NEW_MOON_TERMS:
+        jde += (
+            coefficient
+            * e**power
+            * math.sin(a * m + b * m_moon + c * f + d * omega)
+        )
+    for index, (coefficient, constant, rate) in enumerate(_PLANETARY_TERMS):
+        angle = constant + rate * k
+        if index == 0:
+            angle -= 0.009173 * t**2
+        jde += coefficient * math.sin(math.radians(angle))
+
+    year = 2000 + k / 12.3685
+    return jde - delta_t(year) / 86400
+
+
+def new_moon_index(jd):
+    """jd の直前 (jd を含む) の朔の番号"""
+    k = math.floor((jd - 2451550.09766) / SYNODIC_MONTH)
+    while new_moon(k + 1) <= jd:
+        k += 1
+    while new_moon(k) > jd:
+        k -= 1
+    return k
+
+
+def solar_longitude(jd):
+    """太陽の視黄経 (度)
+
+    ユリウス日 (世界時) を受け取り, 精度は 0.01 度程度。
+    """
+    year = 2000 + (jd - _J2000) / TROPICAL_YEAR
+    t = (jd + delta_t(year) / 86400 - _J2000) / 36525
+    l0 = 280.46646 + 36000.76983 * t + 0.0003032 * t**2
+    m = math.radians(357.52911 + 35999.05029 * t - 0.0001537 * t**2)
+    c = (
+        (1.914602 - 0.004817 * t - 0.000014 * t**2) * math.sin(m)
+        + (0.019993 - 0.000101 * t) * math.sin(2 * m)
+        + 0.000289 * math.sin(3 * m)
+    )
+    omega = math.radians(125.04 - 1934.136 * t)
+    return (l0 + c - 0.00569 - 0.00478 * math.sin(omega)) % 360
+
+
+def solar_term(longitude, jd):
+    """jd に最も近い, 太陽の視黄経が longitude 度になる時刻"""
+    for _ in range(10):
+        difference = (longitude - solar_longitude(jd) + 180) % 360 - 180
+        jd += difference * TROPICAL_YEAR / 360
+        if abs(difference) < 1e-7:
+            break
+    return jd
+
+
+def solar_terms(start, end, step=30, offset=0):
+    """start から end までに太陽の視黄経が offset + step * n 度になる時刻
+
+    (時刻, 黄経) の組を時刻順に返す。
+    """
+    terms = []
+    longitude = solar_longitude(start)
+    target = offset + math.ceil((longitude - offset) / step) * step
+    jd = start + ((target - longitude) % 360) * TROPICAL_YEAR / 360
+    while True:
+        jd = solar_term(target % 360, jd)
+        if jd >= end:
+            return terms
+        if jd >= start:
+            terms.append((jd, target % 360))
+        target += step
+        jd += step * TROPICAL_YEAR / 360
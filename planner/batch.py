@@ -0,0 +1,279 @@
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from typing import NamedTuple
+
+from planner import font, ics, instrument, page_cache, planner
+from planner.almanac import Almanac
+from planner.tasks import read_tasks
+from planner.years import expand_paths
+
+"""予定表の種類ごとの出力ファイル名"""
+OUTPUTS = {
+    "yearly": "{year}.pdf",
+    "weekly": "{year}-weekly.pdf",
+    "todo": "todo.pdf",
+}
+
+"""暦注を必要とする予定表の種類"""
+ALMANAC_KINDS = ("yearly", "weekly")
+
+"""ワーカーの初期化に失敗した場合のエラー"""
+_init_error = None
+
+"""月ごとの描画結果のキャッシュ. None ならキャッシュしない"""
+_page_cache = None
+
+"""ワーカーが読み込んだ暦注 (Almanac)"""
+_almanac = None
+
+"""ワーカーが読み込んだ年ごとの予定の索引 (ics.EventIndex)"""
+_events = {}
+
+
+class Job(NamedTuple):
+    """出力ジョブ"""
+
+    kind: str
+    year: int
+    filename: str
+    """用紙 (paper.PAPERS のいずれか)"""
+    paper: str = "A4"
+    """一つの予定表の月を並列に描くプロセス数"""
+    month_jobs: int = 1
+    """出力するページ番号の集合. None ならページ番号で選ばない"""
+    pages: frozenset = None
+    """出力するページが含む日付の範囲 (datetime.date). None なら制限しない"""
+    start: date = None
+    end: date = None
+    """ToDoリストに書くタスクのファイル (CSV または JSON Lines)"""
+    tasks: str = None
+
+    @property
+    def selects_pages(self):
+        """一部のページだけを出力するかどうか"""
+        return self.kind in ALMANAC_KINDS and (
+            self.pages is not None
+            or self.start is not None
+            or self.end is not None
+        )
+
+
+class JobResult(NamedTuple):
+    """出力ジョブの結果"""
+
+    job: Job
+    elapsed: float
+    error: str = None
+    font_stats: dict = {}
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def plan_jobs(
+    years,
+    kinds,
+    directory=".",
+    paper="A4",
+    month_jobs=1,
+    pages=None,
+    start=None,
+    end=None,
+    tasks=None,
+):
+    """年と予定表の種類の組み合わせからジョブを作成する
+
+    ToDoリストは年に依存しないため一度だけ出力する。tasks はToDoリストに
+    書くタスクのファイル。
+    pages, start, end で年間・週間予定表の一部のページだけを選んだ
+    場合は, 出力ファイル名の末尾に "-pages" をつける。start から end
+    までの日付に重ならない年の年間・週間予定表は出力しない。
+    """
+    dated = [
+        year
+        for year in years
+        if (start is None or start.year <= year)
+        and (end is None or year <= end.year)
+    ]
+    jobs = []
+    for kind in kinds:
+        targets = dated if kind in ALMANAC_KINDS else years[:1]
+        for year in targets:
+            job = Job(
+                kind,
+                year,
+                os.path.join(directory, OUTPUTS[kind].format(year=year)),
+                paper,
+                month_jobs,
+                None if pages is None else frozenset(pages),
+                start,
+                end,
+                tasks if kind == "todo" else None,
+            )
+            if job.selects_pages:
+                root, ext = os.path.splitext(job.filename)
+                job = job._replace(filename=root + "-pages" + ext)
+            jobs.append(job)
+    return jobs
+
+
+def load_almanac(filename, years):
+    """コンパイル済みの暦注ファイルを読み込む
+
+    ファイルはワーカー間で mmap のページを共有する。
+    """
+    almanac = Almanac.open(filename)
+    missing = [year for year in years if not almanac.covers(year)]
+    if missing:
+        raise ValueError(
+            "{}: no data for {}".format(filename, ", ".join(map(str, missing)))
+        )
+    return almanac
+
+
+def init_worker(
+    rokuyo, holiday, years, almanac=None, incremental=False, events=None
+):
+    """ワーカーの初期化
+
+    暦注と予定の読み込みとフォントの登録はワーカーごとに一度だけ行う。
+    almanac を指定した場合は rokuyo と holiday より優先する。
+    incremental の場合は月ごとの描画結果をキャッシュする。
+    events は予定を読み込む iCalendar ファイルのリスト。
+    失敗した場合はプールを壊さず、各ジョブの失敗として報告する。
+    """
+    global _init_error, _page_cache, _almanac, _events
+    _init_error = None
+    _events = {}
+    _page_cache = page_cache.PageCache() if incremental else None
+    try:
+        with instrument.span("load_almanac"):
+            if almanac is not None:
+                _almanac = load_almanac(almanac, years)
+            else:
+                _almanac = Almanac.create(
+                    years,
+                    expand_paths(rokuyo, years),
+                    expand_paths(holiday, years),
+                )
+        if events:
+            with instrument.span("load_events"):
+                _events = ics.load(events, years)
+        with instrument.span("register_fonts"):
+            font.register_fonts()
+    except Exception:
+        _init_error = traceback.format_exc()
+
+
+def create_document(job):
+    if job.kind == "yearly":
+        return planner.YearlyPlanner(
+            job.year,
+            _page_cache,
+            job.paper,
+            job.month_jobs,
+            _almanac,
+            _events.get(job.year),
+        )
+    if job.kind == "weekly":
+        return planner.WeeklyPlanner(
+            job.year,
+            _page_cache,
+            job.paper,
+            job.month_jobs,
+            _almanac,
+            _events.get(job.year),
+        )
+    if job.kind == "todo":
+        return planner.ToDoList(
+            job.paper,
+            None if job.tasks is None else read_tasks(job.tasks),
+        )
+    raise ValueError("unknown kind: {}".format(job.kind))
+
+
+def run_job(job):
+    """ジョブを実行する
+
+    出力先のディレクトリがなければ作る。例外はワーカーの外に送出せず、
+    結果に記録する。
+    """
+    if _init_error is not None:
+        return JobResult(job, 0.0, _init_error)
+
+    start = time.perf_counter()
+    try:
+        os.makedirs(os.path.dirname(job.filename) or ".", exist_ok=True)
+        with instrument.span("{} {}".format(job.kind, job.year)):
+            document = create_document(job)
+            if job.selects_pages:
+                pages = document.select_pages(job.pages, job.start, job.end)
+                if not pages:
+                    raise ValueError("no pages selected")
+                document.print_pages(pages, job.filename)
+            else:
+                document.print(job.filename)
+    except Exception:
+        return JobResult(
+            job, time.perf_counter() - start, traceback.format_exc()
+        )
+    return JobResult(
+        job, time.perf_counter() - start, font_stats=document.font_stats
+    )
+
+
+def run(
+    jobs,
+    rokuyo=None,
+    holiday=None,
+    workers=1,
+    almanac=None,
+    incremental=False,
+    events=None,
+):
+    """ジョブを実行する
+
+    workers が 1 の場合は現在のプロセスで順に実行し、
+    2 以上の場合はプロセスプールに分配する。
+    """
+    years = sorted(set(job.year for job in jobs if job.kind in ALMANAC_KINDS))
+    initargs = (rokuyo, holiday, years, almanac, incremental, events)
+    if workers <= 1:
+        init_worker(*initargs)
+        return [run_job(job) for job in jobs]
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=init_worker, initargs=initargs
+    ) as executor:
+        return list(executor.map(run_job, jobs))
+
+
+def report(results, elapsed, file):
+    """ジョブごとの所要時間と集計を出力する"""
+    for result in results:
+        print(
+            "{:<6} {:>4} {:>8.3f}s {:<4} {:>5} glyphs {}".format(
+                result.job.kind,
+                result.job.year,
+                result.elapsed,
+                "ok" if result.ok else "FAIL",
+                sum(stats["glyphs"] for stats in result.font_stats.values()),
+                result.job.filename,
+            ),
+            file=file,
+        )
+        if not result.ok:
+            print(result.error, file=file)
+    failed = sum(1 for result in results if not result.ok)
+    print(
+        "{} jobs, {} failed, {:.3f}s total, {:.3f}s elapsed".format(
+            len(results),
+            failed,
+            sum(result.elapsed for result in results),
+            elapsed,
+        ),
+        file=file,
+    )
@@ -0,0 +1,213 @@
+from array import array
+from bisect import bisect_right
+from datetime import date
+
+from planner import holiday
+
+
+def _to_ordinal(day):
+    """日付 (date または YYYYMMDD 形式の文字列) を序数に変換する"""
+    if isinstance(day, date):
+        return day.toordinal()
+    day = str(day)
+    return date(int(day[0:4]), int(day[4:6]), int(day[6:8])).toordinal()
+
+
+class BusinessCalendar:
+    """営業日カレンダー
+
+    土日と祝日 (振替休日・国民の休日を含む) を休業日とし,
+    年ごとの営業日数の累積和の表から営業日を計算する。
+    表は問い合わせのあった年から順に作り, 年ごとにメモ化する。
+
+    holidays は Almanac.holiday と同じ YYYYMMDD 形式の文字列を
+    キーとする辞書で, 省略すると祝日法の規則から年ごとに求める。
+    company_holidays には会社独自の休業日を日付または文字列で渡す。
+    """
+
+    """休業日とする曜日 (date.weekday() の値)"""
+    WEEKEND = (5, 6)
+
+    def __init__(self, holidays=None, company_holidays=(), weekend=WEEKEND):
+        self.statutory = holidays is None
+        self.closed = frozenset(map(_to_ordinal, holidays or ())) | frozenset(
+            map(_to_ordinal, company_holidays)
+        )
+        self.weekend = frozenset(weekend)
+        if len(self.weekend) >= 7:
+            raise ValueError("no business days in a week")
+
+        self.__tables = {}
+        self.__closed_days = {}
+        self.__first_year = None
+        self.__last_year = None
+        # __cumulative[k]: first_year から first_year + k - 1 年までの営業日数
+        self.__cumulative = array("L", [0])
+
+    def with_holidays(self, company_holidays):
+        """休業日を追加したカレンダーを作る"""
+        return BusinessCalendar(
+            None if self.statutory else {},
+            [date.fromordinal(ordinal) for ordinal in self.closed]
+            + list(company_holidays),
+            self.weekend,
+        )
+
+    def closed_days(self, year):
+        """year 年の休業日 (土日を除く) の序数の集合"""
+        closed = self.__closed_days.get(year)
+        if closed is None:
+            closed = self.closed
+            if self.statutory:
+                closed = closed | frozenset(
+                    map(_to_ordinal, holiday.national_holidays(year))
+                )
+            self.__closed_days[year] = closed
+        return closed
+
+    def year_table(self, year):
+        """一年分の営業日数の累積和
+
+        table[i] は元日から i 日目の手前までの営業日数。
+        """
+        table = self.__tables.get(year)
+        if table is None:
+            start = date(year, 1, 1).toordinal()
+            end = date(year + 1, 1, 1).toordinal()
+            weekday = date(year, 1, 1).weekday()
+            closed = self.closed_days(year)
+            weekend = self.weekend
+
+            table = array("H", [0])
+            count = 0
+            for ordinal in range(start, end):
+                if weekday not in weekend and ordinal not in closed:
+                    count += 1
+                table.append(count)
+                weekday = (weekday + 1) % 7
+            self.__tables[year] = table
+        return table
+
+    def __cover(self, first_year, last_year):
+        """累積和の表が first_year から last_year までを含むようにする"""
+        if self.__first_year is not None:
+            if (
+                self.__first_year <= first_year
+                and last_year <= self.__last_year
+            ):
+                return
+            first_year = min(first_year, self.__first_year)
+            last_year = max(last_year, self.__last_year)
+
+        if first_year == self.__first_year:
+            cumulative = self.__cumulative
+            start = self.__last_year + 1
+        else:
+            cumulative = array("L", [0])
+            start = first_year
+        for year in range(start, last_year + 1):
+            cumulative.append(cumulative[-1] + self.year_table(year)[-1])
+
+        self.__first_year = first_year
+        self.__last_year = last_year
+        self.__cumulative = cumulative
+
+    def __rank(self, ordinal):
+        """first_year の元日から ordinal の手前までの営業日数"""
+        day = date.fromordinal(ordinal)
+        index = ordinal - date(day.year, 1, 1).toordinal()
+        return (
+            self.__cumulative[day.year - self.__first_year]
+            + self.year_table(day.year)[index]
+        )
+
+    def __business_day(self, rank):
+        """first_year の元日から数えて rank 番目 (0 始まり) の営業日"""
+        while rank < 0:
+            previous_year = self.__first_year - 1
+            self.__cover(previous_year, previous_year)
+            rank += self.year_table(previous_year)[-1]
+        while rank >= self.__cumulative[-1]:
+            next_year = self.__last_year + 1
+            self.__cover(next_year, next_year)
+
+        k = bisect_right(self.__cumulative, rank) - 1
+        year = self.__first_year + k
+        table = self.year_table(year)
+        index = bisect_right(table, rank - self.__cumulative[k])
+        return date.fromordinal(date(year, 1, 1).toordinal() + index - 1)
+
+    def __is_open(self, ordinal):
+        day = date.fromordinal(ordinal)
+        return (
+            ordinal not in self.closed_days(day.year)
+            and day.weekday() not in self.weekend
+        )
+
+    def is_business_day(self, day):
+        return self.__is_open(_to_ordinal(day))
+
+    def count(self, start, end):
+        """start から end の前日までの営業日数
+
+        end が start より前の場合は負の値を返す。
+        """
+        start = _to_ordinal(start)
+        end = _to_ordinal(end)
+        self.__cover(
+            date.fromordinal(min(start, end)).year,
+            date.fromordinal(max(start, end)).year,
+        )
+        return self.__rank(end) - self.__rank(start)
+
+    def add(self, day, n):
+        """day から n 営業日後 (n が負の場合は n 営業日前) の営業日
+
+        n が 0 の場合は, day が営業日ならその日, そうでなければ翌営業日。
+        """
+        ordinal = _to_ordinal(day)
+        year = date.fromordinal(ordinal).year
+        self.__cover(year, year)
+        rank = self.__rank(ordinal)
+        if n > 0 and self.__is_open(ordinal):
+            rank += 1
+        return self.__business_day(rank + n - 1 if n > 0 else rank + n)
+
+    def next_business_day(self, day):
+        """day の翌営業日"""
+        return self.add(day, 1)
+
+    def previous_business_day(self, day):
+        """day の前営業日"""
+        return self.add(day, -1)
+
+    def add_many(self, days, n):
+        """複数の日付に対する add
+
+        n には整数, または days と同じ長さの整数の列を渡す。
+        """
+        days = list(days)
+        offsets = [n] * len(days) if isinstance(n, int) else list(n)
+        if len(offsets) != len(days):
+            raise ValueError("days and n must have the same length")
+        if not days:
+            return []
+        years = [date.fromordinal(_to_ordinal(day)).year for day in days]
+        self.__cover(min(years), max(years))
+        return [self.add(day, offset) for day, offset in zip(days, offsets)]
+
+    def count_many(self, periods):
+        """複数の (start, end) に対する count"""
+        periods = [
+            (_to_ordinal(start), _to_ordinal(end)) for start, end in periods
+        ]
+        if not periods:
+            return []
+        ordinals = [ordinal for period in periods for ordinal in period]
+        self.__cover(
+            date.fromordinal(min(ordinals)).year,
+            date.fromordinal(max(ordinals)).year,
+        )
+        return [
+            self.__rank(end) - self.__rank(start) for start, end in periods
+        ]
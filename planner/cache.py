@@ -0,0 +1,44 @@
+"""キャッシュの保存先
+
+フォント, 月ごとの描画結果, 取得したページのキャッシュで共有する。
+標準ライブラリ以外を読み込まない。
+"""
+
+import os
+import tempfile
+from pathlib import Path
+
+
+def cache_directory(name):
+    """キャッシュの保存先
+
+    PLANNER_CACHE_DIR, XDG_CACHE_HOME, ~/.cache の順に参照する。
+    """
+    if "PLANNER_CACHE_DIR" in os.environ:
+        root = Path(os.environ["PLANNER_CACHE_DIR"])
+    elif "XDG_CACHE_HOME" in os.environ:
+        root = Path(os.environ["XDG_CACHE_HOME"]).joinpath("planner")
+    else:
+        root = Path.home().joinpath(".cache", "planner")
+    return root.joinpath(name)
+
+
+def write_file(path, data):
+    """path に data (bytes) を書き込む
+
+    同じディレクトリの一時ファイルに書いてから置き換えるため, 読む側に
+    書きかけのファイルは見えない。一時ファイルは書き込みごとに別の名前
+    にするため, 同じ path に複数のスレッドやプロセスが同時に書いてもよい。
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    descriptor, temporary = tempfile.mkstemp(
+        prefix=path.name + ".", suffix=".tmp", dir=path.parent
+    )
+    try:
+        with os.fdopen(descriptor, "wb") as f:
+            f.write(data)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
@@ -0,0 +1,69 @@
+"""定義ファイル (YAML) から Python のデータを作る
+
+    python -m planner.data.conf
+
+起動を速くするため, 実行時は YAML を読まずに作ったデータを読み込む。
+YAML を変更したら実行して, 作ったファイルもあわせてコミットする。
+"""
+
+import json
+from importlib.resources import files
+
+import yaml
+
+import planner.data.conf
+
+"""定義ファイル → 作るモジュールと変数の名前"""
+SOURCES = {
+    "day_of_week.yml": ("day_of_week.py", "DAYS_OF_WEEK"),
+}
+
+HEADER = '''"""{source} から作ったデータ. 編集しない (python -m planner.data.conf)"""
+
+'''
+
+
+def format_value(value, indent=""):
+    """black と同じ形の Python のリテラル"""
+    inner = indent + "    "
+    if isinstance(value, list):
+        items = [inner + format_value(item, inner) for item in value]
+        return "[\n{},\n{}]".format(",\n".join(items), indent)
+    if isinstance(value, dict):
+        items = [
+            "{}{}: {}".format(
+                inner, format_value(key), format_value(item, inner)
+            )
+            for key, item in value.items()
+        ]
+        return "{{\n{},\n{}}}".format(",\n".join(items), indent)
+    if isinstance(value, str):
+        return json.dumps(value, ensure_ascii=False)
+    return repr(value)
+
+
+def compile_source(source, name):
+    with open(
+        files(planner.data.conf).joinpath(source), "r", encoding="utf-8"
+    ) as f:
+        data = yaml.safe_load(f)
+    return "{}{} = {}\n".format(
+        HEADER.format(source=source),
+        name,
+        format_value(data),
+    )
+
+
+def main():
+    for source, (module, name) in SOURCES.items():
+        with open(
+            files(planner.data.conf).joinpath(module),
+            "w",
+            encoding="utf-8",
+            newline="\n",
+        ) as f:
+            f.write(compile_source(source, name))
+
+
+if __name__ == "__main__":
+    main()
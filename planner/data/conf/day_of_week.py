@@ -0,0 +1,53 @@
+"""day_of_week.yml から作ったデータ. 編集しない (python -m planner.data.conf)"""
+
+DAYS_OF_WEEK = [
+    {
+        "number": 1,
+        "name_en": "Sun",
+        "name_en_long": "Sunday",
+        "name_ja": "日",
+        "name_ja_long": "日曜日",
+    },
+    {
+        "number": 2,
+        "name_en": "Mon",
+        "name_en_long": "Monday",
+        "name_ja": "月",
+        "name_ja_long": "月曜日",
+    },
+    {
+        "number": 3,
+        "name_en": "Tue",
+        "name_en_long": "Tuesday",
+        "name_ja": "火",
+        "name_ja_long": "火曜日",
+    },
+    {
+        "number": 4,
+        "name_en": "Wed",
+        "name_en_long": "Wednesday",
+        "name_ja": "水",
+        "name_ja_long": "水曜日",
+    },
+    {
+        "number": 5,
+        "name_en": "Thu",
+        "name_en_long": "Thursday",
+        "name_ja": "木",
+        "name_ja_long": "木曜日",
+    },
+    {
+        "number": 6,
+        "name_en": "Fri",
+        "name_en_long": "Friday",
+        "name_ja": "金",
+        "name_ja_long": "金曜日",
+    },
+    {
+        "number": 0,
+        "name_en": "Sat",
+        "name_en_long": "Saturday",
+        "name_ja": "土",
+        "name_ja_long": "土曜日",
+    },
+]
@@ -0,0 +1,344 @@
+"""暦注データの取得
+
+国立天文台と六曜テキストのページを複数年分まとめて並行に取得し,
+定義ファイル (YYYYMMDD 名称) に変換する。
+
+- ホストごとに keep-alive の接続を使い回す
+- ETag / Last-Modified による再検証つきのディスクキャッシュを持ち,
+  変更のないページは再取得も再解析もしない
+- 失敗した要求は間隔を広げながら再試行する
+"""
+
+import asyncio
+import hashlib
+import http.client
+import json
+import os
+from collections import deque
+from pathlib import Path
+from typing import NamedTuple
+from urllib.parse import urljoin, urlsplit
+
+from planner import scrape
+from planner.cache import cache_directory, write_file
+
+"""取得元の URL. {year} は対象の年, {previous_year} は前年に置き換える"""
+SOURCES = {
+    "holiday": (
+        "https://www.nao.ac.jp/news/topics/{previous_year}/"
+        "{previous_year}0201-rekiyoko.html"
+    ),
+    "rokuyo": "https://www.genkibox.com/rokuyo/rokuyo_{year}.html",
+}
+
+"""再試行する HTTP ステータス"""
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+USER_AGENT = "planner"
+
+
+class FetchError(Exception):
+    pass
+
+
+class Response(NamedTuple):
+    """取得結果"""
+
+    url: str
+    body: bytes
+    digest: str
+    """キャッシュの内容をそのまま使ったかどうか"""
+    cached: bool
+
+
+def parse_page(kind, year, body):
+    """取得したページを定義 (YYYYMMDD → 名称の辞書) に変換する"""
+    data = body.decode("utf-8", errors="replace")
+    if kind == "holiday":
+        return scrape.parse_national_holidays(
+            scrape.NationalHolidayNaojParser(), year, data
+        )
+    return scrape.parse_rokuyo(data)
+
+
+class Cache:
+    """ページと解析結果のディスクキャッシュ
+
+    ページは URL ごとに本文とメタデータ (ETag, Last-Modified, ハッシュ) を,
+    解析結果は本文のハッシュごとに保存する。
+    """
+
+    def __init__(self, directory=None):
+        self.directory = Path(directory or cache_directory("fetch"))
+
+    def __path(self, *parts):
+        return self.directory.joinpath(*parts)
+
+    def __url_key(self, url):
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def metadata(self, url):
+        path = self.__path("pages", self.__url_key(url) + ".json")
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def body(self, url):
+        path = self.__path("pages", self.__url_key(url) + ".body")
+        try:
+            return path.read_bytes()
+        except OSError:
+            return None
+
+    def store(self, url, body, digest, headers):
+        key = self.__url_key(url)
+        write_file(self.__path("pages", key + ".body"), body)
+        metadata = {
+            "url": url,
+            "sha256": digest,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+        }
+        write_file(
+            self.__path("pages", key + ".json"),
+            json.dumps(metadata).encode("utf-8"),
+        )
+
+    def parsed(self, kind, digest):
+        path = self.__path("parsed", "{}-{}.json".format(kind, digest))
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def store_parsed(self, kind, digest, definitions):
+        path = self.__path("parsed", "{}-{}.json".format(kind, digest))
+        write_file(
+            path, json.dumps(definitions, ensure_ascii=False).encode("utf-8")
+        )
+
+
+class ConnectionPool:
+    """ホストごとの keep-alive 接続の置き場
+
+    接続は同時に最大 size 本まで作り, 使い終わったものは次の要求で使い回す。
+    """
+
+    def __init__(self, size=4, timeout=10):
+        self.size = size
+        self.timeout = timeout
+        self.opened = 0
+        self.__idle = {}
+        self.__limits = {}
+
+    def __host(self, url):
+        parts = urlsplit(url)
+        return (parts.scheme, parts.hostname, parts.port)
+
+    def __limit(self, host):
+        if host not in self.__limits:
+            self.__limits[host] = asyncio.Semaphore(self.size)
+        return self.__limits[host]
+
+    def __connect(self, host):
+        scheme, hostname, port = host
+        factory = (
+            http.client.HTTPSConnection
+            if scheme == "https"
+            else http.client.HTTPConnection
+        )
+        self.opened += 1
+        return factory(hostname, port, timeout=self.timeout)
+
+    async def request(self, url, headers):
+        """GET 要求を送り (ステータス, ヘッダー, 本文) を返す"""
+        host = self.__host(url)
+        parts = urlsplit(url)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+
+        async with self.__limit(host):
+            idle = self.__idle.setdefault(host, deque())
+            connection = idle.pop() if idle else self.__connect(host)
+            try:
+                status, response_headers, body = await asyncio.to_thread(
+                    self.__send, connection, path, headers
+                )
+            except BaseException:
+                connection.close()
+                raise
+            if response_headers.get("Connection", "").lower() == "close":
+                connection.close()
+            else:
+                idle.append(connection)
+            return status, response_headers, body
+
+    def __send(self, connection, path, headers):
+        connection.request("GET", path, headers=headers)
+        response = connection.getresponse()
+        body = response.read()
+        return response.status, dict(response.getheaders()), body
+
+    def close(self):
+        for idle in self.__idle.values():
+            while idle:
+                idle.pop().close()
+
+
+class Fetcher:
+    """キャッシュと再試行つきの並行取得"""
+
+    def __init__(
+        self,
+        cache=None,
+        concurrency=8,
+        connections_per_host=4,
+        timeout=10,
+        retries=3,
+        backoff=0.5,
+    ):
+        self.cache = cache
+        self.concurrency = concurrency
+        self.pool = ConnectionPool(connections_per_host, timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.statistics = {
+            "requests": 0,
+            "downloaded": 0,
+            "not_modified": 0,
+            "retries": 0,
+            "parsed": 0,
+            "parse_cache_hits": 0,
+        }
+        self.__semaphore = None
+
+    async def fetch(self, url):
+        """ページを取得する (キャッシュがあれば再検証する)
+
+        キャッシュはリダイレクトの後の URL ではなく, 要求した URL で引く。
+        """
+        if self.__semaphore is None:
+            self.__semaphore = asyncio.Semaphore(self.concurrency)
+
+        metadata = self.cache.metadata(url) if self.cache else None
+        cached_body = self.cache.body(url) if metadata else None
+        headers = {"User-Agent": USER_AGENT}
+        if cached_body is not None:
+            if metadata.get("etag"):
+                headers["If-None-Match"] = metadata["etag"]
+            if metadata.get("last_modified"):
+                headers["If-Modified-Since"] = metadata["last_modified"]
+
+        async with self.__semaphore:
+            status, response_headers, body, location = await self.__get(
+                url, headers
+            )
+
+        if status == 304 and cached_body is not None:
+            self.statistics["not_modified"] += 1
+            return Response(location, cached_body, metadata["sha256"], True)
+        if status != 200:
+            raise FetchError("{}: HTTP {}".format(location, status))
+
+        self.statistics["downloaded"] += 1
+        digest = hashlib.sha256(body).hexdigest()
+        if self.cache:
+            self.cache.store(url, body, digest, response_headers)
+        return Response(location, body, digest, False)
+
+    async def __get(self, url, headers, redirects=5):
+        attempt = 0
+        while True:
+            self.statistics["requests"] += 1
+            try:
+                status, response_headers, body = await self.pool.request(
+                    url, headers
+                )
+            except (OSError, http.client.HTTPException) as e:
+                error = e
+                status = None
+            else:
+                if status in (301, 302, 303, 307, 308) and redirects > 0:
+                    url = urljoin(url, response_headers.get("Location", ""))
+                    redirects -= 1
+                    continue
+                if status not in RETRY_STATUSES:
+                    return status, response_headers, body, url
+                error = FetchError("{}: HTTP {}".format(url, status))
+
+            if attempt >= self.retries:
+                raise FetchError("{}: {}".format(url, error)) from error
+            self.statistics["retries"] += 1
+            await asyncio.sleep(self.backoff * 2**attempt)
+            attempt += 1
+
+    def parse(self, kind, year, response):
+        """取得したページを解析する (同じ内容のページは再解析しない)"""
+        definitions = (
+            self.cache.parsed(kind, response.digest) if self.cache else None
+        )
+        if definitions is not None:
+            self.statistics["parse_cache_hits"] += 1
+            return definitions
+        self.statistics["parsed"] += 1
+        definitions = parse_page(kind, year, response.body)
+        if definitions is None:
+            raise FetchError(
+                "{}: unexpected page structure".format(response.url)
+            )
+        if self.cache:
+            self.cache.store_parsed(kind, response.digest, definitions)
+        return definitions
+
+    def close(self):
+        self.pool.close()
+
+
+class FetchResult(NamedTuple):
+    kind: str
+    year: int
+    filename: str
+    error: str = None
+
+
+def source_url(kind, year, sources=None):
+    return (sources or SOURCES)[kind].format(year=year, previous_year=year - 1)
+
+
+def write_definitions(filename, definitions):
+    with open(filename, mode="w", encoding="utf-8") as f:
+        for day, label in definitions.items():
+            f.write("{} {}\n".format(day, label))
+
+
+async def fetch_years(fetcher, years, directory=".", kinds=None, sources=None):
+    """年ごとの定義ファイルを並行に取得して directory に書き出す
+
+    失敗はファイルごとに結果に記録し, ほかのファイルの取得は続ける。
+    """
+
+    async def fetch_one(kind, year):
+        filename = os.path.join(directory, "{}-{}.txt".format(kind, year))
+        url = source_url(kind, year, sources)
+        try:
+            response = await fetcher.fetch(url)
+            write_definitions(filename, fetcher.parse(kind, year, response))
+        except FetchError as e:
+            return FetchResult(kind, year, filename, str(e))
+        except Exception as e:
+            # 解析の誤りや書き出しの失敗も, このファイルだけの失敗にする
+            return FetchResult(kind, year, filename, "{}: {!r}".format(url, e))
+        return FetchResult(kind, year, filename)
+
+    try:
+        return await asyncio.gather(
+            *(
+                fetch_one(kind, year)
+                for year in years
+                for kind in kinds or (sources or SOURCES)
+            )
+        )
+    finally:
+        fetcher.close()
@@ -0,0 +1,192 @@
+import hashlib
+import pickle
+import threading
+from fnmatch import fnmatch
+from importlib.resources import files
+from pathlib import Path
+from weakref import WeakKeyDictionary
+
+import reportlab
+from reportlab import rl_config
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTEncoding, TTFont, TTFontFace
+
+import planner.data.font
+from planner.cache import cache_directory, write_file
+
+"""埋め込みフォント"""
+FONTS = {
+    "mplus-r": "mplus-1m-regular.ttf",
+    "mplus-b": "mplus-1m-bold.ttf",
+}
+
+"""キャッシュの形式. 互換性のない変更をした場合は値を変える"""
+CACHE_FORMAT = 1
+
+"""キャッシュしない (解析結果ではない, または pickle できない) 属性"""
+_TRANSIENT_ATTRIBUTES = ("_ttf_data", "_pdfScale", "filename")
+
+
+def _pdf_scale(units_per_em):
+    if units_per_em == 1000:
+        return lambda x: x
+    multiplier = 1000 / units_per_em
+    return lambda x: x * multiplier
+
+
+class CachedTTFontFace(TTFontFace):
+    """解析結果をキャッシュから復元した TrueType 書体"""
+
+    def __init__(self, filename, data, attributes):
+        pdfmetrics.TypeFace.__init__(self, None)
+        self.__dict__.update(attributes)
+        self.filename = filename
+        self._ttf_data = data
+        self._pdfScale = _pdf_scale(self.unitsPerEm)
+
+
+class FontCache:
+    """解析済みフォントの永続キャッシュ
+
+    TTF の解析結果 (メトリクスとサブセット作成用のテーブル) を
+    フォントファイルのハッシュをキーとして保存する。
+    """
+
+    def __init__(self, directory=None):
+        self.directory = Path(directory or cache_directory("fonts"))
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, data):
+        digest = hashlib.sha256(data)
+        digest.update(
+            "{}:{}".format(reportlab.Version, CACHE_FORMAT).encode("ascii")
+        )
+        return digest.hexdigest()
+
+    def path(self, key):
+        return self.directory.joinpath("{}.pickle".format(key))
+
+    def load_face(self, filename):
+        filename = str(filename)
+        with open(filename, mode="rb") as f:
+            data = f.read()
+        key = self.key(data)
+
+        try:
+            with open(self.path(key), mode="rb") as f:
+                attributes = pickle.load(f)
+        except FileNotFoundError:
+            attributes = None
+        except Exception:
+            # 壊れたキャッシュは解析し直して上書きする
+            attributes = None
+        if attributes is not None:
+            self.hits += 1
+            face = CachedTTFontFace(filename, data, attributes)
+        else:
+            self.misses += 1
+            face = TTFontFace(filename)
+            self.store(key, face)
+        face.digest = key
+        return face
+
+    def store(self, key, face):
+        attributes = {
+            name: value
+            for name, value in vars(face).items()
+            if name not in _TRANSIENT_ATTRIBUTES
+        }
+        path = self.path(key)
+        try:
+            write_file(
+                path,
+                pickle.dumps(attributes, protocol=pickle.HIGHEST_PROTOCOL),
+            )
+        except OSError:
+            # キャッシュに書き込めなくても描画は続けられる
+            pass
+
+
+class CachedTTFont(TTFont):
+    """解析済みの書体から作る TrueType フォント
+
+    TTFont.__init__ は書体を解析し直すため呼び出さない。
+    """
+
+    def __init__(self, name, face):
+        self.fontName = name
+        self.face = face
+        self.encoding = TTEncoding()
+        self.state = WeakKeyDictionary()
+        self._asciiReadable = rl_config.ttfAsciiReadable
+        self.shapable = not any(
+            fnmatch(name, pattern) for pattern in rl_config.unShapedFontGlob
+        )
+
+
+class FontRegistry:
+    """プロセス全体で共有するフォントの登録簿
+
+    フォントはプロセスごとに一度だけ解析して登録する。
+    """
+
+    def __init__(self, fonts=FONTS, cache=None):
+        self.fonts = fonts
+        self.cache = cache
+        self.lock = threading.Lock()
+
+    def register(self):
+        # 同時に出力するスレッドが同じフォントを二重に登録しないようにする
+        with self.lock:
+            if self.cache is None:
+                self.cache = FontCache()
+            registered = pdfmetrics.getRegisteredFontNames()
+            for name, filename in self.fonts.items():
+                if name not in registered:
+                    pdfmetrics.registerFont(
+                        CachedTTFont(
+                            name,
+                            self.cache.load_face(
+                                files(planner.data.font).joinpath(filename)
+                            ),
+                        )
+                    )
+
+    def version(self):
+        """登録したフォントの版 (フォントファイルのハッシュ)"""
+        self.register()
+        return {
+            name: getattr(pdfmetrics.getFont(name).face, "digest", None)
+            for name in self.fonts
+        }
+
+    def embedded_glyphs(self, canvas):
+        """文書に埋め込まれるグリフの統計
+
+        サブセットは保存時に破棄されるため, canvas.save() の前に呼び出す。
+        """
+        doc = canvas._doc
+        statistics = {}
+        for name in self.fonts:
+            font = pdfmetrics.getFont(name)
+            state = font.state.get(doc)
+            if state is None:
+                continue
+            statistics[name] = {
+                "glyphs": len(state.assignments),
+                "subsets": len(state.subsets),
+            }
+        return statistics
+
+
+registry = FontRegistry()
+
+
+def register_fonts():
+    """フォントを登録する (登録済みのフォントは読み込まない)"""
+    registry.register()
+
+
+def embedded_glyphs(canvas):
+    return registry.embedded_glyphs(canvas)
@@ -0,0 +1,197 @@
+"""国民の祝日
+
+国民の祝日に関する法律の規則から, 任意の年の祝日と休日を求める。
+"""
+
+import calendar
+from datetime import date
+from functools import lru_cache
+from typing import NamedTuple
+
+from planner import astro
+
+"""振替休日の名称"""
+SUBSTITUTE_HOLIDAY = "振替休日"
+
+"""国民の休日の名称"""
+CITIZENS_HOLIDAY = "国民の休日"
+
+"""法律の施行日"""
+ENFORCEMENT = date(1948, 7, 20)
+
+"""振替休日 (第3条第2項) の施行日"""
+SUBSTITUTE_HOLIDAY_ENFORCEMENT = date(1973, 4, 12)
+
+"""国民の休日 (第3条第3項) の施行日"""
+CITIZENS_HOLIDAY_ENFORCEMENT = date(1985, 12, 27)
+
+"""振替休日・国民の休日の規定が改正された年"""
+AMENDMENT_2007 = 2007
+
+
+class Rule(NamedTuple):
+    """祝日の規則
+
+    kind が "fixed" なら month 月 day 日, "monday" なら month 月の
+    第 day 月曜日, "equinox" なら month 月の春分日・秋分日。
+    """
+
+    name: str
+    kind: str
+    month: int
+    day: int
+    first_year: int
+    last_year: int = 9999
+
+
+RULES = (
+    Rule("元日", "fixed", 1, 1, 1949),
+    Rule("成人の日", "fixed", 1, 15, 1949, 1999),
+    Rule("成人の日", "monday", 1, 2, 2000),
+    Rule("建国記念の日", "fixed", 2, 11, 1967),
+    Rule("天皇誕生日", "fixed", 2, 23, 2020),
+    Rule("春分の日", "equinox", 3, 0, 1949),
+    Rule("天皇誕生日", "fixed", 4, 29, 1949, 1988),
+    Rule("みどりの日", "fixed", 4, 29, 1989, 2006),
+    Rule("昭和の日", "fixed", 4, 29, 2007),
+    Rule("憲法記念日", "fixed", 5, 3, 1949),
+    Rule("みどりの日", "fixed", 5, 4, 2007),
+    Rule("こどもの日", "fixed", 5, 5, 1949),
+    Rule("海の日", "fixed", 7, 20, 1996, 2002),
+    Rule("海の日", "monday", 7, 3, 2003),
+    Rule("山の日", "fixed", 8, 11, 2016),
+    Rule("敬老の日", "fixed", 9, 15, 1966, 2002),
+    Rule("敬老の日", "monday", 9, 3, 2003),
+    Rule("秋分の日", "equinox", 9, 0, 1948),
+    Rule("体育の日", "fixed", 10, 10, 1966, 1999),
+    Rule("体育の日", "monday", 10, 2, 2000, 2019),
+    Rule("スポーツの日", "monday", 10, 2, 2020),
+    Rule("文化の日", "fixed", 11, 3, 1948),
+    Rule("勤労感謝の日", "fixed", 11, 23, 1948),
+    Rule("天皇誕生日", "fixed", 12, 23, 1989, 2018),
+)
+
+"""特別な年の祝日
+
+祝日の移動は (月, 日) で, 祝日でなくなる場合は None で指定する。
+"""
+OVERRIDES = {
+    1959: {"皇太子明仁親王の結婚の儀": (4, 10)},
+    1989: {"昭和天皇の大喪の礼": (2, 24)},
+    1990: {"即位礼正殿の儀": (11, 12)},
+    1993: {"皇太子徳仁親王の結婚の儀": (6, 9)},
+    2019: {"天皇の即位の日": (5, 1), "即位礼正殿の儀": (10, 22)},
+    2020: {"海の日": (7, 23), "スポーツの日": (7, 24), "山の日": (8, 10)},
+    2021: {"海の日": (7, 22), "スポーツの日": (7, 23), "山の日": (8, 8)},
+}
+
+
+def equinox_day(year, month):
+    """春分日 (month=3) または秋分日 (month=9) の日
+
+    1900 年から 2150 年までは近似式により, それ以外は太陽の視黄経から求める。
+    """
+    constants = {
+        3: ((1979, 20.8357), (2099, 20.8431), (2150, 21.8510)),
+        9: ((1979, 23.2588), (2099, 23.2488), (2150, 24.2488)),
+    }[month]
+    if 1900 <= year <= 2150:
+        for last_year, constant in constants:
+            if year <= last_year:
+                break
+        base = 1983 if year <= 1979 else 1980
+        return int(
+            constant + 0.242194 * (year - 1980) - int((year - base) / 4)
+        )
+
+    longitude = 0 if month == 3 else 180
+    guess = astro.jd_from_ordinal(date(year, month, 21).toordinal())
+    return date.fromordinal(
+        astro.jst_ordinal(astro.solar_term(longitude, guess))
+    ).day
+
+
+def nth_monday(year, month, n):
+    first_weekday = calendar.monthrange(year, month)[0]
+    return 1 + (7 - first_weekday) % 7 + 7 * (n - 1)
+
+
+def _rule_day(rule, year):
+    if rule.kind == "fixed":
+        return rule.day
+    if rule.kind == "monday":
+        return nth_monday(year, rule.month, rule.day)
+    return equinox_day(year, rule.month)
+
+
+def statutory_holidays(year):
+    """国民の祝日 (振替休日・国民の休日を含まない) を日付順に返す"""
+    overrides = OVERRIDES.get(year, {})
+    holidays = {}
+    for rule in RULES:
+        if not rule.first_year <= year <= rule.last_year:
+            continue
+        if rule.name in overrides:
+            continue
+        day = date(year, rule.month, _rule_day(rule, year))
+        if day >= ENFORCEMENT:
+            holidays[day] = rule.name
+    for name, month_day in overrides.items():
+        if month_day is not None:
+            holidays[date(year, *month_day)] = name
+    return sorted(holidays.items())
+
+
+def derive_holidays(holidays):
+    """国民の祝日から振替休日と国民の休日を求める
+
+    holidays は (日付, 名称) の日付順の列。規定の施行日と
+    2007 年の改正に従い, 祝日の列を一度走査して求める。
+    """
+    ordinals = {day.toordinal() for day, _ in holidays}
+    derived = {}
+
+    previous = None
+    for day, _ in holidays:
+        ordinal = day.toordinal()
+
+        # 第3条第2項: 日曜日にあたる祝日の後の最も近い祝日でない日
+        # (2006 年までは翌日)
+        if day.weekday() == 6 and day >= SUBSTITUTE_HOLIDAY_ENFORCEMENT:
+            substitute = ordinal + 1
+            if day.year >= AMENDMENT_2007:
+                while substitute in ordinals:
+                    substitute += 1
+            if substitute not in ordinals:
+                derived[substitute] = SUBSTITUTE_HOLIDAY
+
+        # 第3条第3項: 前日と翌日が祝日である日
+        # (2006 年までは日曜日と振替休日を除く)
+        if previous is not None and ordinal - previous == 2:
+            between = date.fromordinal(previous + 1)
+            if between >= CITIZENS_HOLIDAY_ENFORCEMENT and (
+                between.year >= AMENDMENT_2007
+                or (between.weekday() != 6 and previous + 1 not in derived)
+            ):
+                derived.setdefault(previous + 1, CITIZENS_HOLIDAY)
+        previous = ordinal
+
+    return sorted(
+        (date.fromordinal(ordinal), name) for ordinal, name in derived.items()
+    )
+
+
+@lru_cache(maxsize=None)
+def _national_holidays(year):
+    holidays = statutory_holidays(year)
+    return tuple(sorted(holidays + derive_holidays(holidays)))
+
+
+def national_holidays(year):
+    """一年分の祝日と休日 (Almanac.holiday と同じ YYYYMMDD 形式の辞書)
+
+    計算結果は年ごとにメモ化する。
+    """
+    return {
+        day.strftime("%Y%m%d"): name for day, name in _national_holidays(year)
+    }
@@ -0,0 +1,664 @@
+"""iCalendar (.ics) の予定
+
+    events = ics.load(["team.ics", "personal.ics"], [2024])[2024]
+    events.day(calendar.index(date(2024, 7, 15)))
+
+ファイルは一行ずつ読み, 予定 (VEVENT) を一つずつ取り出して年ごとの
+索引に入れる。繰り返しの予定 (RRULE, RDATE, EXDATE) は索引の年に
+重なる回だけを展開する。索引は元日からの日数ごとの予定のリストで,
+描画では日ごとに一度引くだけにする。保持するのは索引の年の予定だけ
+なので, メモリーの使用量はファイルの大きさによらない。
+
+RRULE は FREQ (DAILY, WEEKLY, MONTHLY, YEARLY), INTERVAL, COUNT, UNTIL,
+BYDAY, BYMONTHDAY, BYMONTH, BYSETPOS に対応し, ほかの規則は無視する。
+ほかの FREQ (HOURLY など) の規則の予定は, 解析できない予定として読み飛ばす。
+"""
+
+import calendar
+import re
+import warnings
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from typing import NamedTuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+"""予定を表示するタイムゾーン"""
+ZONE = "Asia/Tokyo"
+
+"""対応する FREQ. HOURLY などの時刻単位の繰り返しには対応しない"""
+FREQUENCIES = ("DAILY", "WEEKLY", "MONTHLY", "YEARLY")
+
+"""BYDAY の曜日 (date.weekday() の順)"""
+WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+
+"""読み込むプロパティ. ほかのプロパティ (DESCRIPTION など) は保持しない"""
+PROPERTIES = frozenset(
+    (
+        "UID",
+        "SUMMARY",
+        "STATUS",
+        "DTSTART",
+        "DTEND",
+        "DURATION",
+        "RRULE",
+        "RDATE",
+        "EXDATE",
+        "RECURRENCE-ID",
+    )
+)
+
+_DURATION = re.compile(
+    r"([+-])?P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$"
+)
+
+"""内容行 (名前, パラメーター, 値). パラメーターの引用符の中の : と ; は区切りではない"""
+_LINE = re.compile(
+    r'([A-Za-z0-9-]+)((?:;(?:[^:;"]|"[^"]*")*)*):(.*)', re.DOTALL
+)
+
+_PARAMETER = re.compile(r'[^;"]+(?:"[^"]*"[^;"]*)*')
+
+_BYDAY = re.compile(r"([+-]?\d+)?(MO|TU|WE|TH|FR|SA|SU)$")
+
+_ESCAPES = {"\\n": "\n", "\\N": "\n", "\\,": ",", "\\;": ";", "\\\\": "\\"}
+
+
+class Rule(NamedTuple):
+    """繰り返しの規則 (RRULE)"""
+
+    freq: str
+    interval: int = 1
+    count: int = None
+    until: object = None
+    """(何番目, 曜日) のタプル. 何番目を指定しない場合は None"""
+    byday: tuple = ()
+    bymonthday: tuple = ()
+    bymonth: tuple = ()
+    bysetpos: tuple = ()
+
+
+class Event(NamedTuple):
+    """予定"""
+
+    uid: str
+    summary: str
+    """開始. 終日の予定は date, それ以外は datetime"""
+    start: object
+    """終了 (この時刻を含まない)"""
+    end: object
+    """繰り返しの規則. 繰り返さない予定は None"""
+    rule: Rule = None
+    """RDATE で追加する回の開始"""
+    rdates: tuple = ()
+    """EXDATE で除く回の開始"""
+    exdates: tuple = ()
+    """繰り返しの一回を変更した予定の元の開始 (RECURRENCE-ID)"""
+    recurrence_id: object = None
+
+    @property
+    def all_day(self):
+        return not isinstance(self.start, datetime)
+
+
+class Occurrence(NamedTuple):
+    """日ごとの索引の予定"""
+
+    """開始時刻 (HH:MM). 終日の予定と前日から続く予定は空文字列"""
+    time: str
+    summary: str
+
+
+def _unfold(lines):
+    """折り返した内容行をつなぐ"""
+    current = None
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t"):
+            if current is not None:
+                current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current is not None:
+        yield current
+
+
+def _parameters(text):
+    """パラメーター (";TZID=Asia/Tokyo;VALUE=DATE" など) の辞書"""
+    if not text:
+        return {}
+    return {
+        key.upper(): value.strip('"')
+        for key, _, value in (
+            parameter.partition("=") for parameter in _PARAMETER.findall(text)
+        )
+    }
+
+
+def _unescape(value):
+    return re.sub(r"\\[nN,;\\]", lambda m: _ESCAPES[m.group()], value)
+
+
+@lru_cache(maxsize=None)
+def _zone(name):
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return None
+
+
+def parse_time(parameters, value):
+    """日付 (date) または日時 (datetime) の値
+
+    UTC (末尾の Z) と TZID の日時はタイムゾーンつきにする。TZID が
+    不明な場合と TZID のない日時は, 表示するタイムゾーンの日時とみなす。
+    """
+    value = value.strip()
+    if parameters.get("VALUE") == "DATE" or len(value) == 8:
+        return date(int(value[:4]), int(value[4:6]), int(value[6:8]))
+    moment = datetime(
+        int(value[:4]),
+        int(value[4:6]),
+        int(value[6:8]),
+        int(value[9:11]),
+        int(value[11:13]),
+        int(value[13:15]),
+    )
+    if value.endswith("Z"):
+        return moment.replace(tzinfo=timezone.utc)
+    zone = _zone(parameters["TZID"]) if "TZID" in parameters else None
+    return moment if zone is None else moment.replace(tzinfo=zone)
+
+
+def parse_duration(value):
+    match = _DURATION.match(value.strip())
+    if match is None:
+        raise ValueError("invalid duration: {}".format(value))
+    sign, weeks, days, hours, minutes, seconds = match.groups()
+    duration = timedelta(
+        weeks=int(weeks or 0),
+        days=int(days or 0),
+        hours=int(hours or 0),
+        minutes=int(minutes or 0),
+        seconds=int(seconds or 0),
+    )
+    return -duration if sign == "-" else duration
+
+
+def parse_rule(value):
+    """RRULE の値
+
+    FREQ がないか FREQUENCIES にない規則は ValueError にする。
+    """
+    parts = dict(
+        part.partition("=")[::2] for part in value.upper().split(";") if part
+    )
+    if parts.get("FREQ") not in FREQUENCIES:
+        raise ValueError("unsupported FREQ: {}".format(parts.get("FREQ")))
+    byday = []
+    for day in filter(None, parts.get("BYDAY", "").split(",")):
+        match = _BYDAY.match(day)
+        if match is None:
+            raise ValueError("invalid BYDAY: {}".format(day))
+        ordinal, weekday = match.groups()
+        byday.append(
+            (int(ordinal) if ordinal else None, WEEKDAYS.index(weekday))
+        )
+
+    def numbers(name):
+        return tuple(int(n) for n in parts.get(name, "").split(",") if n)
+
+    return Rule(
+        freq=parts["FREQ"],
+        interval=int(parts.get("INTERVAL", 1)),
+        count=int(parts["COUNT"]) if "COUNT" in parts else None,
+        until=parse_time({}, parts["UNTIL"]) if "UNTIL" in parts else None,
+        byday=tuple(byday),
+        bymonthday=numbers("BYMONTHDAY"),
+        bymonth=numbers("BYMONTH"),
+        bysetpos=numbers("BYSETPOS"),
+    )
+
+
+def _event(properties):
+    """プロパティの辞書から予定を作る. 取り消した予定は None
+
+    プロパティの辞書は名前から (パラメーターの文字列, 値) への辞書。
+    """
+    properties = {
+        name: (
+            [(_parameters(p), v) for p, v in value]
+            if name in ("RDATE", "EXDATE")
+            else (_parameters(value[0]), value[1])
+        )
+        for name, value in properties.items()
+    }
+    if "DTSTART" not in properties:
+        return None
+    if properties.get("STATUS", (None, ""))[1].upper() == "CANCELLED":
+        return None
+    start = parse_time(*properties["DTSTART"])
+    if "DTEND" in properties:
+        end = parse_time(*properties["DTEND"])
+    elif "DURATION" in properties:
+        end = start + parse_duration(properties["DURATION"][1])
+    elif isinstance(start, datetime):
+        end = start
+    else:
+        end = start + timedelta(days=1)
+
+    def times(name):
+        return tuple(
+            parse_time(parameters, value)
+            for parameters, values in properties.get(name, [])
+            if parameters.get("VALUE") != "PERIOD"
+            for value in values.split(",")
+        )
+
+    return Event(
+        uid=properties.get("UID", (None, ""))[1],
+        summary=_unescape(properties.get("SUMMARY", (None, ""))[1]),
+        start=start,
+        end=end,
+        rule=(
+            parse_rule(properties["RRULE"][1])
+            if "RRULE" in properties
+            else None
+        ),
+        rdates=times("RDATE"),
+        exdates=times("EXDATE"),
+        recurrence_id=(
+            parse_time(*properties["RECURRENCE-ID"])
+            if "RECURRENCE-ID" in properties
+            else None
+        ),
+    )
+
+
+def _outside(properties, years):
+    """繰り返さない予定が years のどの年にも重ならないことが,
+    日時を解析するまでもなくわかるかどうか
+
+    タイムゾーンの違いの分, 前後の年に重なる予定は残す。
+    """
+    if "RRULE" in properties or "RDATE" in properties:
+        return False
+    if "RECURRENCE-ID" in properties:
+        return False
+    try:
+        first = int(properties["DTSTART"][1].strip()[:4])
+        last = (
+            int(properties["DTEND"][1].strip()[:4])
+            if "DTEND" in properties
+            else first
+        )
+        if "DURATION" in properties:
+            # 長さの分だけ後の年に重なりうる. 端数の一年は前後の年の分で補う
+            duration = parse_duration(properties["DURATION"][1])
+            last = first + duration.days // 365
+    except ValueError:
+        return False
+    return last < years[0] - 1 or first > years[-1] + 1
+
+
+def read_events(lines, years=None, errors=None):
+    """内容行 (テキストファイルなど) から予定を順に取り出す
+
+    予定の中の通知 (VALARM) などは読み飛ばす。years (昇順の年のリスト)
+    を指定すると, その年に重ならない繰り返さない予定は解析せずに省く。
+    解析できない予定も読み飛ばし, errors (リスト) を指定するとその理由
+    を加える。
+    """
+    properties = None
+    depth = 0
+    for line in _unfold(lines):
+        match = _LINE.match(line)
+        if match is None:
+            continue
+        name, parameters, value = match.groups()
+        name = name.upper()
+        if name == "BEGIN":
+            if properties is not None:
+                depth += 1
+            elif value.upper() == "VEVENT":
+                properties = {}
+                depth = 0
+        elif name == "END" and properties is not None:
+            if depth:
+                depth -= 1
+                continue
+            try:
+                if (
+                    years
+                    and "DTSTART" in properties
+                    and _outside(properties, years)
+                ):
+                    event = None
+                else:
+                    event = _event(properties)
+            except (ValueError, KeyError, IndexError) as e:
+                if errors is not None:
+                    uid = properties.get("UID", (None, ""))[1]
+                    errors.append("{}: {}".format(uid or "VEVENT", e))
+                event = None
+            if event is not None:
+                yield event
+            properties = None
+        elif properties is not None and not depth and name in PROPERTIES:
+            # パラメーターは予定を作るときに解析する
+            if name in ("RDATE", "EXDATE"):
+                properties.setdefault(name, []).append((parameters, value))
+            else:
+                properties[name] = (parameters, value)
+
+
+def _period(freq, day):
+    """日を含む繰り返しの期間の番号"""
+    if freq == "DAILY":
+        return day.toordinal()
+    if freq == "WEEKLY":
+        # 序数 1 (0001-01-01) は月曜日
+        return (day.toordinal() - 1) // 7
+    if freq == "MONTHLY":
+        return day.year * 12 + day.month - 1
+    if freq == "YEARLY":
+        return day.year
+    raise ValueError("unsupported FREQ: {}".format(freq))
+
+
+def _period_start(freq, period):
+    if freq == "DAILY":
+        return date.fromordinal(period)
+    if freq == "WEEKLY":
+        return date.fromordinal(period * 7 + 1)
+    if freq == "MONTHLY":
+        return date(period // 12, period % 12 + 1, 1)
+    if freq == "YEARLY":
+        return date(period, 1, 1)
+    raise ValueError("unsupported FREQ: {}".format(freq))
+
+
+def _nth_weekdays(first, last, byday):
+    """first から last までの日のうち BYDAY に当たる日"""
+    days = set()
+    for ordinal, weekday in byday:
+        matches = range(
+            (first + timedelta((weekday - first.weekday()) % 7)).toordinal(),
+            last.toordinal() + 1,
+            7,
+        )
+        if ordinal is None:
+            days.update(date.fromordinal(day) for day in matches)
+        elif 0 < abs(ordinal) <= len(matches):
+            days.add(
+                date.fromordinal(
+                    matches[ordinal - 1 if ordinal > 0 else ordinal]
+                )
+            )
+    return days
+
+
+def _days_of_month(rule, year, month, first_day):
+    length = calendar.monthrange(year, month)[1]
+    if rule.bymonthday:
+        days = {
+            date(year, month, day if day > 0 else length + 1 + day)
+            for day in rule.bymonthday
+            if 1 <= (day if day > 0 else length + 1 + day) <= length
+        }
+        if rule.byday:
+            weekdays = {weekday for _, weekday in rule.byday}
+            days = {day for day in days if day.weekday() in weekdays}
+        return days
+    if rule.byday:
+        return _nth_weekdays(
+            date(year, month, 1), date(year, month, length), rule.byday
+        )
+    if first_day.day <= length:
+        return {date(year, month, first_day.day)}
+    return set()
+
+
+def _candidates(rule, period, first_day):
+    """期間の中の回の日 (昇順)"""
+    freq = rule.freq
+    if freq == "DAILY":
+        day = date.fromordinal(period)
+        days = {day}
+        if rule.bymonthday:
+            length = calendar.monthrange(day.year, day.month)[1]
+            if not any(
+                day.day == (n if n > 0 else length + 1 + n)
+                for n in rule.bymonthday
+            ):
+                days = set()
+        if rule.byday and day.weekday() not in {w for _, w in rule.byday}:
+            days = set()
+    elif freq == "WEEKLY":
+        monday = period * 7 + 1
+        days = {
+            date.fromordinal(monday + weekday)
+            for weekday in (
+                [weekday for _, weekday in rule.byday] or [first_day.weekday()]
+            )
+        }
+    elif freq == "MONTHLY":
+        days = _days_of_month(rule, period // 12, period % 12 + 1, first_day)
+    elif freq == "YEARLY":
+        if rule.byday and not rule.bymonth and not rule.bymonthday:
+            days = _nth_weekdays(
+                date(period, 1, 1), date(period, 12, 31), rule.byday
+            )
+        else:
+            days = set()
+            for month in rule.bymonth or [first_day.month]:
+                days |= _days_of_month(rule, period, month, first_day)
+    else:
+        raise ValueError("unsupported FREQ: {}".format(freq))
+    if rule.bymonth and freq != "YEARLY":
+        days = {day for day in days if day.month in rule.bymonth}
+    days = sorted(days)
+    if rule.bysetpos:
+        days = sorted(
+            days[position - 1 if position > 0 else position]
+            for position in rule.bysetpos
+            if 0 < abs(position) <= len(days)
+        )
+    return days
+
+
+def expand(rule, start, first, last):
+    """start から始まる繰り返しのうち, first から last までの日に
+    始まる回の開始を順に返す
+
+    start と rule.until はタイムゾーンのない日時か日付。COUNT が
+    なければ first の前の期間は数えずに飛ばす。
+    """
+    all_day = not isinstance(start, datetime)
+    first_day = start if all_day else start.date()
+    until = rule.until
+    if until is not None and not all_day and not isinstance(until, datetime):
+        until = datetime.combine(until, datetime.max.time())
+    elif until is not None and all_day and isinstance(until, datetime):
+        until = until.date()
+    interval = max(rule.interval, 1)
+    period = _period(rule.freq, first_day)
+    skip = 0
+    if rule.count is None:
+        skip = max(_period(rule.freq, first) - period, 0) // interval
+    count = 0
+    for n in range(skip, skip + 1_000_000):
+        current = period + n * interval
+        if _period_start(rule.freq, current) > last:
+            return
+        for day in _candidates(rule, current, first_day):
+            if day < first_day:
+                continue
+            moment = day if all_day else datetime.combine(day, start.time())
+            if until is not None and moment > until:
+                return
+            count += 1
+            if rule.count is not None and count > rule.count:
+                return
+            if first <= day <= last:
+                yield moment
+
+
+def _instant(value):
+    """回を識別する開始 (タイムゾーンつきは UTC にそろえる)"""
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class EventIndex:
+    """一年分の日ごとの予定の索引
+
+    day(index) は元日からの日数 index の日の予定を, 終日の予定, 開始
+    時刻の順に返す。同じ UID の予定の同じ回は一度だけ入れ, 繰り返しの
+    一回を変更した予定 (RECURRENCE-ID) は元の回と置き換える。
+    """
+
+    def __init__(self, year, zone=ZONE):
+        self.year = year
+        self.zone = _zone(zone)
+        self.first = date(year, 1, 1)
+        self.last = date(year, 12, 31)
+        self.days = [
+            []
+            for _ in range(self.last.toordinal() - self.first.toordinal() + 1)
+        ]
+        self.events = 0
+        self.__instances = {}
+        self.__overridden = set()
+        self.__sorted = True
+
+    def __len__(self):
+        """索引に入れた回の数"""
+        return len(self.__instances)
+
+    def __local(self, value):
+        if isinstance(value, datetime) and value.tzinfo is not None:
+            return value.astimezone(self.zone)
+        return value
+
+    def add(self, event):
+        """予定のうち索引の年に重なる回を入れる"""
+        self.events += 1
+        start = event.start
+        zone = start.tzinfo if isinstance(start, datetime) else None
+        duration = event.end - start
+        if duration < timedelta(0):
+            duration = timedelta(0)
+
+        if event.recurrence_id is not None:
+            key = (event.uid, _instant(event.recurrence_id))
+            self.__overridden.add(key)
+            self.__remove(key)
+
+        def wall(value):
+            """予定のタイムゾーンでの, タイムゾーンのない日時"""
+            if zone is None and isinstance(value, datetime):
+                # タイムゾーンのない予定は表示するタイムゾーンとみなす
+                return self.__local(value).replace(tzinfo=None)
+            if isinstance(value, datetime) and value.tzinfo is not None:
+                return value.astimezone(zone).replace(tzinfo=None)
+            return value
+
+        # タイムゾーンの違いと予定の長さの分だけ広く展開し, 後で切り詰める
+        first = self.first - duration - timedelta(days=1)
+        last = self.last + timedelta(days=1)
+        if event.rule is not None and event.recurrence_id is None:
+            rule = event.rule._replace(until=wall(event.rule.until))
+            starts = list(expand(rule, wall(start), first, last))
+        else:
+            starts = [wall(start)]
+        starts += [wall(value) for value in event.rdates]
+        excluded = {wall(value) for value in event.exdates}
+
+        # UID のない予定は同じ予定とみなせないため, 予定ごとに区別する
+        uid = event.uid or (None, self.events)
+        for moment in starts:
+            if moment in excluded:
+                continue
+            if zone is not None:
+                moment = moment.replace(tzinfo=zone)
+            key = (uid, _instant(moment))
+            if event.recurrence_id is None and key in self.__overridden:
+                continue
+            self.__add(key, event.summary, moment, moment + duration)
+
+    def __add(self, key, summary, start, end):
+        if key in self.__instances:
+            return
+        if isinstance(start, datetime):
+            start = self.__local(start)
+            end = self.__local(end)
+            first_day = start.date()
+            last_day = (
+                (end - timedelta(microseconds=1)).date()
+                if end > start
+                else first_day
+            )
+            time = "{:02d}:{:02d}".format(start.hour, start.minute)
+        else:
+            first_day = start
+            last_day = end - timedelta(days=1) if end > start else start
+            time = ""
+        offset = self.first.toordinal()
+        first = max(first_day.toordinal() - offset, 0)
+        last = min(last_day.toordinal() - offset, len(self.days) - 1)
+        if first > last:
+            return
+        self.__instances[key] = range(first, last + 1)
+        for index in range(first, last + 1):
+            self.days[index].append(
+                (
+                    time if index == first_day.toordinal() - offset else "",
+                    summary,
+                    key,
+                )
+            )
+        self.__sorted = False
+
+    def __remove(self, key):
+        for index in self.__instances.pop(key, ()):
+            self.days[index] = [
+                entry for entry in self.days[index] if entry[2] != key
+            ]
+
+    def day(self, index):
+        """元日からの日数 index の日の予定 (Occurrence のリスト)"""
+        if not self.__sorted:
+            for entries in self.days:
+                # 開始時刻と件名が同じなら入れた順. 回のキーは date と
+                # datetime を含み比べられない
+                entries.sort(key=lambda entry: (entry[0], entry[1]))
+            self.__sorted = True
+        return [
+            Occurrence(time, summary) for time, summary, _ in self.days[index]
+        ]
+
+
+def load(filenames, years, zone=ZONE):
+    """ファイルの予定を読み込み, 年ごとの索引 (EventIndex) の辞書を返す
+
+    ファイルは一度ずつ先頭から順に読む。解析できない予定は読み飛ばし,
+    ファイルごとにその数を警告する。
+    """
+    indexes = {year: EventIndex(year, zone) for year in years}
+    for filename in filenames:
+        errors = []
+        with open(filename, encoding="utf-8-sig", errors="replace") as f:
+            for event in read_events(f, sorted(indexes), errors):
+                for index in indexes.values():
+                    index.add(event)
+        if errors:
+            warnings.warn(
+                "{}: skipped {} invalid events ({})".format(
+                    filename, len(errors), errors[0]
+                ),
+                stacklevel=2,
+            )
+    return indexes
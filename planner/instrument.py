@@ -0,0 +1,159 @@
+"""計測
+
+    with instrument.Profiler(memory=True) as profiler:
+        planner.YearlyPlanner(2024).print("2024.pdf")
+    profiler.write("profile.json")
+
+名前つきの区間 (span) の所要時間と, ページ・テキストオブジェクト・
+線分・出力の大きさなどのカウンターを記録する。memory を指定すると
+tracemalloc で区間ごとのメモリーの増減と最大使用量を, stats を指定すると
+cProfile の結果 (pstats) を保存する。
+
+計測していないときの span() と count() は何もしない。
+"""
+
+import cProfile
+import json
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+
+"""メモリーの割り当ての多い箇所として報告する数"""
+TOP_ALLOCATIONS = 10
+
+"""計測中の Profiler. 計測していなければ None"""
+_active = None
+
+_NULL_SPAN = nullcontext()
+
+
+def enabled():
+    return _active is not None
+
+
+def span(name):
+    """名前つきの区間 (with 文で使う)"""
+    if _active is None:
+        return _NULL_SPAN
+    return _active.span(name)
+
+
+def count(name, value=1):
+    if _active is not None:
+        _active.counters[name] += value
+
+
+def count_code(code):
+    """コンテンツストリームの命令のうちテキストオブジェクトと線分を数える"""
+    if _active is None:
+        return
+    counters = _active.counters
+    for operator in code:
+        if operator.startswith("BT"):
+            counters["text_objects"] += 1
+        elif operator.endswith(" l S"):
+            counters["lines"] += 1
+
+
+class Profiler:
+    """区間とカウンターの記録"""
+
+    def __init__(self, memory=False, stats=None):
+        self.memory = memory
+        self.stats = stats
+        self.spans = []
+        self.counters = Counter()
+        self.depth = 0
+        self.start = None
+        self.elapsed = None
+        self.peak_memory = None
+        self.allocations = []
+        self.__profile = None
+
+    def __enter__(self):
+        global _active
+        if _active is not None:
+            raise RuntimeError("profiler is already running")
+        _active = self
+        if self.memory:
+            tracemalloc.start()
+        if self.stats:
+            self.__profile = cProfile.Profile()
+            self.__profile.enable()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        global _active
+        self.elapsed = time.perf_counter() - self.start
+        if self.__profile is not None:
+            self.__profile.disable()
+            self.__profile.dump_stats(self.stats)
+        if self.memory:
+            self.peak_memory = tracemalloc.get_traced_memory()[1]
+            statistics = tracemalloc.take_snapshot().statistics("lineno")
+            self.allocations = [
+                {
+                    "location": "{}:{}".format(
+                        statistic.traceback[0].filename,
+                        statistic.traceback[0].lineno,
+                    ),
+                    "size": statistic.size,
+                    "count": statistic.count,
+                }
+                for statistic in statistics[:TOP_ALLOCATIONS]
+            ]
+            tracemalloc.stop()
+        _active = None
+
+    @contextmanager
+    def span(self, name):
+        record = {
+            "name": name,
+            "depth": self.depth,
+            "start": time.perf_counter() - self.start,
+        }
+        self.spans.append(record)
+        if self.memory:
+            memory = tracemalloc.get_traced_memory()[0]
+        self.depth += 1
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["elapsed"] = time.perf_counter() - start
+            self.depth -= 1
+            if self.memory:
+                record["memory"] = tracemalloc.get_traced_memory()[0] - memory
+
+    def totals(self):
+        """区間の名前ごとの回数と所要時間の合計"""
+        totals = {}
+        for record in self.spans:
+            total = totals.setdefault(
+                record["name"], {"count": 0, "elapsed": 0.0}
+            )
+            total["count"] += 1
+            total["elapsed"] += record.get("elapsed", 0.0)
+        return totals
+
+    def report(self):
+        report = {
+            "elapsed": self.elapsed,
+            "spans": self.spans,
+            "totals": self.totals(),
+            "counters": dict(self.counters),
+        }
+        if self.memory:
+            report["memory"] = {
+                "peak": self.peak_memory,
+                "top": self.allocations,
+            }
+        if self.stats:
+            report["stats"] = str(self.stats)
+        return report
+
+    def write(self, filename):
+        with open(filename, mode="w", encoding="utf-8") as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2)
@@ -0,0 +1,115 @@
+"""ページのレイアウト
+
+予定表のページを, 区切り線で分けた列, 列の中に横に並ぶ欄 (セル),
+欄を上から区切る行の格子として宣言する (GridSpec)。描画に使う座標は
+GridLayout がポイント単位で一度だけ計算し, 描画の処理は表を引くだけにする。
+"""
+
+from array import array
+from functools import lru_cache
+from typing import NamedTuple
+
+from planner.paper import PAPERS
+
+
+class GridSpec(NamedTuple):
+    """ページの格子の宣言. 長さはミリメートル単位"""
+
+    """欄の行数"""
+    rows: int
+    """列に横に並ぶ欄の数"""
+    cells_in_column: int = 1
+    """ページの列の数"""
+    columns_in_page: int = 3
+    """列の左右のマージン"""
+    margin_x: float = 5
+    """ページ上下のマージン"""
+    margin_y: float = 8
+    """上のマージンから行の格子の上端までの距離"""
+    rows_top: float = 0
+    """上のマージンから見出しのベースラインまでの距離"""
+    header_offset: float = 3
+    """行の下端からラベルのベースラインまでの高さ"""
+    label_offset: float = 0
+    """行の下端から罫線までの距離"""
+    rule_offset: float = 1
+    """用紙 (PAPERS のいずれか)"""
+    paper: str = "A4"
+
+
+class GridLayout:
+    """格子の座標表 (ポイント単位)
+
+    - separators: 列の区切り線の x 座標
+    - cell_x: ページ内の欄の番号 (左上から列ごとに 0, 1, ...) ごとの左端
+    - rule_y, label_y: 行ごとの罫線とラベルのベースラインの y 座標
+    """
+
+    __slots__ = (
+        "spec",
+        "width",
+        "height",
+        "cells_in_page",
+        "cell_width",
+        "separators",
+        "cell_x",
+        "header_y",
+        "rule_y",
+        "label_y",
+    )
+
+    def __init__(self, spec):
+        # reportlab は CLI の起動を遅くするので, 座標を計算するときに読み込む
+        from reportlab.lib import pagesizes
+        from reportlab.lib.units import mm
+
+        if spec.paper not in PAPERS:
+            raise ValueError("unknown paper: {}".format(spec.paper))
+        self.spec = spec
+        # 座標はミリメートルで求め, 最後にポイントに変換する
+        width, height = [
+            size / mm
+            for size in pagesizes.landscape(getattr(pagesizes, spec.paper))
+        ]
+        columns = spec.columns_in_page
+        cells = spec.cells_in_column
+        column_width = width / columns
+        cell_width = (width - 2 * spec.margin_x * columns) / (columns * cells)
+
+        self.width = width * mm
+        self.height = height * mm
+        self.cells_in_page = columns * cells
+        self.cell_width = cell_width * mm
+        self.separators = array(
+            "d", [column_width * i * mm for i in range(1, columns)]
+        )
+        self.cell_x = array(
+            "d",
+            [
+                (column_width * column + spec.margin_x + cell_width * cell)
+                * mm
+                for column in range(columns)
+                for cell in range(cells)
+            ],
+        )
+
+        top = height - spec.margin_y
+        self.header_y = (top - spec.header_offset) * mm
+        top -= spec.rows_top
+        row_height = (top - spec.margin_y) / spec.rows
+        self.rule_y = array("d")
+        self.label_y = array("d")
+        for _ in range(spec.rows):
+            top -= row_height
+            self.rule_y.append((top - spec.rule_offset) * mm)
+            self.label_y.append((top + spec.label_offset) * mm)
+
+    def page_and_cell(self, number):
+        """0 から数えた欄の通し番号をページの番号と欄の番号に分ける"""
+        return divmod(number, self.cells_in_page)
+
+
+@lru_cache(maxsize=None)
+def grid_layout(spec):
+    """格子の座標表 (宣言ごとに一度だけ計算する)"""
+    return GridLayout(spec)
@@ -0,0 +1,132 @@
+"""旧暦 (太陰太陽暦) と六曜
+
+朔の日を月の初日とし, 中気 (太陽の視黄経が 30 度の倍数になる時刻) を
+含む月に月名を与え, 中気を含まない月を閏月とする。
+六曜は旧暦の月と日の和を 6 で割った余りで決まる。
+"""
+
+from datetime import date
+from functools import lru_cache
+from typing import NamedTuple
+
+from planner import astro
+
+"""(旧暦の月 + 旧暦の日) % 6 に対応する六曜"""
+ROKUYO = ("大安", "赤口", "先勝", "友引", "先負", "仏滅")
+
+
+class Lunation(NamedTuple):
+    """旧暦の月
+
+    start は月の初日 (朔の日), end は翌月の初日の序数。
+    """
+
+    start: int
+    end: int
+    month: int
+    leap: bool
+
+
+class LunarDate(NamedTuple):
+    """旧暦の日付"""
+
+    month: int
+    day: int
+    leap: bool
+
+
+def lunations(start, end):
+    """序数 start から end の前日までを含む旧暦の月を順に返す"""
+    # 月名を決めるため, 前後に中気を含む月が現れるまで余分に計算する
+    first = astro.new_moon_index(astro.jd_from_ordinal(start) - astro.JST)
+    last = astro.new_moon_index(astro.jd_from_ordinal(end) - astro.JST)
+    indexes = range(first - 2, last + 3)
+    starts = [astro.jst_ordinal(astro.new_moon(k)) for k in indexes]
+
+    principal_terms = [
+        (astro.jst_ordinal(jd), longitude)
+        for jd, longitude in astro.solar_terms(
+            astro.jd_from_ordinal(starts[0]) - astro.JST,
+            astro.jd_from_ordinal(starts[-1]) - astro.JST,
+        )
+    ]
+
+    months = []
+    term = 0
+    for month_start, month_end in zip(starts, starts[1:]):
+        while (
+            term < len(principal_terms)
+            and principal_terms[term][0] < month_start
+        ):
+            term += 1
+        if (
+            term < len(principal_terms)
+            and principal_terms[term][0] < month_end
+        ):
+            # 雨水 (330 度) を含む月が正月, 冬至 (270 度) を含む月が 11 月
+            month = (principal_terms[term][1] // 30 + 1) % 12 + 1
+            months.append([month_start, month_end, month, False])
+        else:
+            months.append([month_start, month_end, None, True])
+
+    for index, lunation in enumerate(months):
+        if lunation[2] is None and index > 0:
+            lunation[2] = months[index - 1][2]
+
+    return [
+        Lunation(*lunation)
+        for lunation in months
+        if lunation[2] is not None
+        and lunation[1] > start
+        and lunation[0] < end
+    ]
+
+
+def lunar_dates(start, end):
+    """序数 start から end の前日までの旧暦の日付"""
+    dates = []
+    ordinal = start
+    for lunation in lunations(start, end):
+        while ordinal < min(lunation.end, end):
+            dates.append(
+                LunarDate(
+                    lunation.month, ordinal - lunation.start + 1, lunation.leap
+                )
+            )
+            ordinal += 1
+    return dates
+
+
+def lunar_date(day):
+    """日付を旧暦の日付に変換する"""
+    ordinal = day.toordinal()
+    return lunar_dates(ordinal, ordinal + 1)[0]
+
+
+def rokuyo_range(start, end):
+    """start から end の前日までの六曜の一覧
+
+    朔と中気は期間の前後の分だけ一度に求め, 各日は月と日の和から決める。
+    """
+    return [
+        ROKUYO[(lunar.month + lunar.day) % 6]
+        for lunar in lunar_dates(start.toordinal(), end.toordinal())
+    ]
+
+
+@lru_cache(maxsize=None)
+def _rokuyo_of_year(year):
+    start = date(year, 1, 1)
+    return tuple(rokuyo_range(start, date(year + 1, 1, 1)))
+
+
+def rokuyo_of_year(year):
+    """一年分の六曜 (Almanac.rokuyo と同じ YYYYMMDD 形式の辞書)
+
+    計算結果は年ごとにメモ化する。
+    """
+    ordinal = date(year, 1, 1).toordinal()
+    return {
+        date.fromordinal(ordinal + index).strftime("%Y%m%d"): label
+        for index, label in enumerate(_rokuyo_of_year(year))
+    }
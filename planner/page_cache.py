@@ -0,0 +1,199 @@
+"""月ごとのページのキャッシュ
+
+暦注の一部だけを直したときに, 入力の変わった月だけを描き直して
+残りの月はキャッシュから組み立てる。
+
+月の描画結果は, その月が追加したコンテンツストリームの命令と
+使ったフォームの定義として記録する。再生すると描画した場合と
+同じ順にページとフォームのオブジェクトを作るため, 出力は
+(invariant モードで) 全体を描き直した場合とバイト単位で一致する。
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import reportlab
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfgen.canvas import Canvas
+
+from planner import font, instrument
+from planner.cache import cache_directory, write_file
+
+"""キャッシュの形式. 描画の処理や記録の形式を変えた場合は値を変える"""
+CACHE_FORMAT = 1
+
+
+def page_key(*inputs):
+    """描画の入力からキャッシュのキーを作る
+
+    入力は JSON に変換できる値。フォントの版と reportlab の版も含める。
+    """
+    digest = hashlib.sha256()
+    digest.update(
+        json.dumps(
+            [CACHE_FORMAT, reportlab.Version, font.registry.version()]
+            + list(inputs),
+            ensure_ascii=False,
+            sort_keys=True,
+            default=repr,
+        ).encode("utf-8")
+    )
+    return digest.hexdigest()
+
+
+class PageCache:
+    """月ごとの描画結果のディスクキャッシュ"""
+
+    def __init__(self, directory=None):
+        self.directory = Path(directory or cache_directory("pages"))
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, key):
+        return self.directory.joinpath("{}.json".format(key))
+
+    def get(self, key):
+        try:
+            fragment = json.loads(self.path(key).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            # 壊れたキャッシュは描き直して上書きする
+            fragment = None
+        if fragment is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return fragment
+
+    def put(self, key, fragment):
+        path = self.path(key)
+        try:
+            write_file(
+                path, json.dumps(fragment, ensure_ascii=False).encode("utf-8")
+            )
+        except OSError:
+            # キャッシュに書き込めなくても描画は続けられる
+            pass
+
+
+class RecordingCanvas(Canvas):
+    """描画した命令を記録・再生できるキャンバス
+
+    記録の結果 (fragment) は描画に必要な PDF の版と, ページ区切りごとの
+    区間のリストを持つ。各区間はその区間で初めて使ったフォームの定義,
+    使ったフォームの名前, コンテンツストリームの命令を持つ。
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.__form_code = {}
+        self.__recording = None
+        self.__recorded_forms = set()
+        self.__start = 0
+
+    def start_recording(self):
+        self.__recording = []
+        self.__recorded_forms = set()
+        self.__start_segment()
+
+    def stop_recording(self):
+        self.__end_segment()
+        segments, self.__recording = self.__recording, None
+        # 透明度などを使うと PDF の版が上がる
+        return {"pdf_version": self._doc._pdfVersion, "segments": segments}
+
+    def __start_segment(self):
+        self.__recording.append({"forms": [], "uses": [], "code": []})
+        self.__start = len(self._code)
+
+    def __end_segment(self):
+        self.__recording[-1]["code"] = self._code[self.__start :]
+
+    def replay(self, fragment):
+        """記録した描画をキャンバスに追加する"""
+        self._doc._pdfVersion = max(
+            self._doc._pdfVersion, tuple(fragment["pdf_version"])
+        )
+        for index, segment in enumerate(fragment["segments"]):
+            if index > 0:
+                self.showPage()
+            for name, code in segment["forms"]:
+                if not self.hasForm(name):
+                    self.beginForm(name)
+                    self._code.extend(code)
+                    self.endForm()
+            self._code.extend(segment["code"])
+            self._formsinuse.extend(segment["uses"])
+
+    def showPage(self):
+        if instrument.enabled():
+            instrument.count("pages")
+            instrument.count_code(self._code)
+        if self.__recording is not None:
+            self.__end_segment()
+        super().showPage()
+        if self.__recording is not None:
+            self.__start_segment()
+
+    def endForm(self, **extra_attributes):
+        self.__form_code[self._formData[0]] = list(self._code)
+        instrument.count_code(self._code)
+        super().endForm(**extra_attributes)
+
+    def save(self):
+        super().save()
+        if instrument.enabled():
+            instrument.count("output_bytes", self.__output_size())
+
+    def __output_size(self):
+        if isinstance(self._filename, (str, os.PathLike)):
+            return os.path.getsize(self._filename)
+        return self._filename.tell()
+
+    def doForm(self, name):
+        super().doForm(name)
+        if self.__recording is None:
+            return
+        segment = self.__recording[-1]
+        if name not in self.__recorded_forms and name in self.__form_code:
+            segment["forms"].append([name, self.__form_code[name]])
+            self.__recorded_forms.add(name)
+        segment["uses"].append(name)
+
+    def reserve_glyphs(self, texts):
+        """文字の符号をあらかじめ決める
+
+        TrueType フォントのサブセットの符号は文字を使った順に決まるため,
+        一部の月だけを描き直しても符号が変わらないよう, 使う文字を
+        フォントごとに並べてから割り当てる。texts はフォント名から
+        文字列のリストへの辞書で, 先頭の文字列の文字から順に割り当てる。
+        後ろの文字列に文字が増えても, 前の文字列の文字の符号は変わらない。
+        フォントごとに割り当てた文字の一覧のリストを返す。
+        """
+        reserved = {}
+        for name, groups in texts.items():
+            typeface = pdfmetrics.getFont(name)
+            reserved[name] = []
+            for text in groups:
+                characters = "".join(sorted(set(text)))
+                for subset, _ in typeface.splitString(characters, self._doc):
+                    typeface.getSubsetInternalName(subset, self._doc)
+                reserved[name].append(characters)
+        return reserved
+
+    def glyph_codes(self, texts):
+        """文字に割り当てた符号
+
+        texts はフォント名から文字列への辞書で, フォントごとに
+        (文字, 符号) のリストを返す。
+        """
+        codes = {}
+        for name, text in texts.items():
+            state = pdfmetrics.getFont(name).state.get(self._doc)
+            assignments = {} if state is None else state.assignments
+            codes[name] = [
+                (character, assignments.get(ord(character), 0))
+                for character in sorted(set(text))
+            ]
+        return codes
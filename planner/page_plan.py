@@ -0,0 +1,110 @@
+"""ページの割り付け
+
+予定表の各ページのどの欄に, どの月のどの日を描くかを, ページを描かずに
+年の暦表から求める。ページは先頭から必要な分だけ順に求めるため,
+特定のページや日付を含むページだけを出力するときに, その前のページを
+描かずに済む。
+"""
+
+from typing import NamedTuple
+
+
+class Cell(NamedTuple):
+    """ページの欄"""
+
+    """ページ内の欄の番号 (GridLayout.cell_x の添字)"""
+    cell: int
+    """見出しに書く月"""
+    month: int
+    """欄に描く日 (暦表の元日からの日数の範囲)"""
+    days: range
+
+
+class Page(NamedTuple):
+    """ページに描く欄"""
+
+    """文書の中のページ番号 (1 から数える)"""
+    number: int
+    cells: tuple
+
+    @property
+    def days(self):
+        """ページに描く日の範囲"""
+        if not self.cells:
+            return range(0)
+        return range(self.cells[0].days.start, self.cells[-1].days.stop)
+
+
+def _paginate(layout, groups):
+    """欄のグループを順にページに割り付ける
+
+    groups は (月, 日の範囲) のリストの並び。グループごとに新しい
+    ページから始める。
+    """
+    number = 0
+    for group in groups:
+        cells = []
+        for index, (month, days) in enumerate(group):
+            cell = layout.page_and_cell(index)[1]
+            if cell == 0 and cells:
+                number += 1
+                yield Page(number, tuple(cells))
+                cells = []
+            cells.append(Cell(cell, month, days))
+        if cells:
+            number += 1
+            yield Page(number, tuple(cells))
+
+
+def yearly_pages(calendar, layout):
+    """一月を一つの欄として, 1 月から通しで並べる"""
+    return _paginate(
+        layout,
+        [((month, calendar.month(month)) for month in range(1, 12 + 1))],
+    )
+
+
+def weekly_pages(calendar, layout, rows, months=range(1, 12 + 1)):
+    """月ごとに新しいページから始め, rows 日ずつを一つの欄にする"""
+    return _paginate(
+        layout,
+        (
+            ((month, days[i : i + rows]) for i in range(0, len(days), rows))
+            for month, days in (
+                (month, calendar.month(month)) for month in months
+            )
+        ),
+    )
+
+
+def select(pages, numbers=None, start=None, end=None):
+    """ページ番号が numbers に含まれ, start から end までの日
+    (元日からの日数, 両端を含む) を含むページ
+
+    ページは先頭から順に調べ, 条件を満たすページがもうないとわかった
+    時点で止める。
+    """
+    last = max(numbers) if numbers else None
+    for page in pages:
+        if last is not None and page.number > last:
+            return
+        if end is not None and page.days.start > end:
+            return
+        if numbers is not None and page.number not in numbers:
+            continue
+        if start is not None and page.days.stop <= start:
+            continue
+        yield page
+
+
+def parse_pages(value):
+    """ページ番号の指定 (例: 3, 10-12, 1,5-6) を番号の集合に変換する"""
+    numbers = set()
+    for part in value.split(","):
+        first, separator, last = part.partition("-")
+        first = int(first)
+        last = int(last) if separator else first
+        if first < 1 or last < first:
+            raise ValueError("invalid page range: {}".format(part))
+        numbers.update(range(first, last + 1))
+    return numbers
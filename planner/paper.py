@@ -0,0 +1,7 @@
+"""用紙の名前
+
+コマンドラインの選択肢にも使うため, 何も読み込まない。
+"""
+
+"""用紙 (reportlab.lib.pagesizes の名前). ページは横向きに使う"""
+PAPERS = ("A3", "A4", "A5", "B4", "B5", "letter", "legal")
@@ -1,415 +1,632 @@
-import math
-from datetime import date, timedelta
-from importlib.resources import files
+import io
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
 
 from reportlab.lib.colors import black, blue, red
-from reportlab.lib.pagesizes import A4, landscape
-from reportlab.lib.units import mm
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.pdfgen.canvas import Canvas
+from reportlab.pdfbase.pdfmetrics import stringWidth
 
-import planner.data.font
-from planner.almanac import Almanac
-from planner.coordinate import Coordinate
+from planner import font, instrument, page_plan
+from planner.almanac import Almanac  # noqa: F401
+from planner.layout import GridSpec, grid_layout
+from planner.page_cache import RecordingCanvas, page_key
+from planner.render import TextBatch, fit, join_fitting, text_width, truncate
+from planner.year_calendar import YearCalendar
 
 
 class Planner:
     """予定表"""
 
-    # ミリメートル単位のページサイズ
-    WIDTH, HEIGHT = [size / mm for size in landscape(A4)]
+    """ページの格子. 座標は GridLayout がポイント単位で計算する"""
+    GRID = GridSpec(rows=31)
 
-    COLUMNS_IN_PAGE = 3
-    COLUMN_WIDTH = WIDTH / COLUMNS_IN_PAGE
+    """直近に出力した文書に埋め込んだグリフの統計"""
+    font_stats = {}
 
-    """ページ左右のマージン"""
-    MARGIN_X = 5
+    """ページごとに同じ罫線などをフォーム (XObject) として描くかどうか"""
+    USE_FORMS = True
 
-    """ページ上下のマージン"""
-    MARGIN_Y = 8
+    """コンテンツストリームの圧縮. None なら reportlab の既定 (圧縮する)"""
+    PAGE_COMPRESSION = None
 
-    def __init__(self):
-        pass
+    def __init__(self, paper="A4"):
+        with instrument.span("layout"):
+            self.layout = grid_layout(self.GRID._replace(paper=paper))
 
     def _create_canvas(self, filename):
-        pdfmetrics.registerFont(
-            TTFont(
-                "mplus-r",
-                files(planner.data.font).joinpath("mplus-1m-regular.ttf"),
+        """キャンバスを作る
+
+        同じ入力からは同じ出力になるよう, 作成日時や文書 ID を固定する
+        invariant モードで出力する。
+        """
+        with instrument.span("create_canvas"):
+            with instrument.span("register_fonts"):
+                font.register_fonts()
+            return RecordingCanvas(
+                filename,
+                pagesize=(self.layout.width, self.layout.height),
+                bottomup=1,
+                pageCompression=self.PAGE_COMPRESSION,
+                encrypt=None,
+                invariant=1,
             )
-        )
-        pdfmetrics.registerFont(
-            TTFont(
-                "mplus-b",
-                files(planner.data.font).joinpath("mplus-1m-bold.ttf"),
-            )
-        )
-        return Canvas(
-            filename,
-            pagesize=landscape(A4),
-            bottomup=1,
-            pageCompression=None,
-            encrypt=None,
-        )
 
-    def _fill_color_of_the_day(self, day):
-        day_of_week = Almanac.day_of_week(day)
-        if day_of_week == Almanac.DayOfWeek.Sunday or day in Almanac.holiday:
-            color = red
-        elif day_of_week == Almanac.DayOfWeek.Saturday:
-            color = blue
+    def _layout(self):
+        """描画に影響するクラス定数と格子"""
+        layout = {}
+        for cls in reversed(type(self).__mro__):
+            for name, value in vars(cls).items():
+                if name.isupper():
+                    layout[name] = value
+        layout["GRID"] = self.layout.spec
+        return layout
+
+    def _draw_static(self, canvas, name, draw, x=0):
+        """ページごとに同じ内容を x ポイント右に移動して描く
+
+        draw(canvas, x) は x を左端として描く関数。内容は文書ごとに
+        一度だけフォームとして定義し, 各ページからは参照して配置する。
+        """
+        if not self.USE_FORMS:
+            draw(canvas, x)
+            return
+        if not canvas.hasForm(name):
+            canvas.beginForm(name)
+            draw(canvas, 0)
+            canvas.endForm()
+        if x:
+            canvas.saveState()
+            canvas.translate(x, 0)
+            canvas.doForm(name)
+            canvas.restoreState()
         else:
-            color = black
-        return color
-
+            canvas.doForm(name)
 
-class WeeklyPlanner(Planner):
-    """週間予定表"""
-
-    ROWS_IN_COLUMN = 7
-    SUBCOLUMNS_IN_COLUMN = 1
-    SUBCOLUMNS_IN_PAGE = SUBCOLUMNS_IN_COLUMN * Planner.COLUMNS_IN_PAGE
-
-    SUBCOLUMN_WIDTH = (
-        Planner.WIDTH - 2 * Planner.MARGIN_X * Planner.COLUMNS_IN_PAGE
-    ) / SUBCOLUMNS_IN_PAGE
+    def _draw_column_separators(self, canvas, x=0):
+        canvas.setDash(1, 2)
+        for separator in self.layout.separators:
+            canvas.line(x + separator, 0, x + separator, self.layout.height)
 
-    def __init__(self, year):
+    def _draw_rules(self, canvas, x=0, rows=None):
+        """欄の上から rows 本の罫線"""
+        layout = self.layout
+        right = x + layout.cell_width
+        canvas.setDash(1, 1)
+        canvas.setLineWidth(0.5)
+        for y in layout.rule_y[:rows]:
+            canvas.line(x, y, right, y)
+
+    def _save(self, canvas):
+        self.font_stats = font.embedded_glyphs(canvas)
+        with instrument.span("save"):
+            canvas.save()
+
+
+class CalendarPlanner(Planner, ABC):
+    """年の暦にそって月ごとに描く予定表 (年間予定表と週間予定表)"""
+
+    """月ごとの描画結果のキャッシュ (PageCache). None ならキャッシュしない"""
+    cache = None
+
+    """月を並列に描くプロセス数. 1 なら現在のプロセスで順に描く"""
+    workers = 1
+
+    """日ごとの予定の索引 (ics.EventIndex). None なら予定を描かない"""
+    events = None
+
+    """日のラベルの文字の大きさと, 欄に収めるために縮める下限 (ポイント)"""
+    LABEL_SIZE = 6
+    LABEL_MIN_SIZE = 4
+
+    """予定の文字の大きさと行送り (ポイント)"""
+    EVENT_SIZE = 5
+    EVENT_LEADING = 6
+    """日のラベルと同じ行に書く場合の, ラベルとの間隔 (ポイント)"""
+    EVENT_GAP = 3
+
+    def __init__(
+        self,
+        year,
+        cache=None,
+        paper="A4",
+        workers=1,
+        almanac=None,
+        events=None,
+    ):
+        super().__init__(paper)
         self.year = year
+        self.workers = workers
+        self.calendar = self._create_calendar(year, almanac)
+        self.cache = cache
+        self.events = self._check_events(year, events)
+
+    def _create_calendar(self, year, almanac=None):
+        """年間の暦表
+
+        almanac (Almanac) を省略した場合はクラスに読み込んだ暦注を使う。
+        """
+        with instrument.span("calendar"):
+            if almanac is None:
+                return YearCalendar(year)
+            if not almanac.covers(year):
+                raise ValueError(
+                    "{!r} does not cover {}".format(almanac, year)
+                )
+            return YearCalendar(
+                year, almanac.rokuyo, almanac.holiday, almanac.season
+            )
 
-        start = date(year, 1, 1)
-        end = date(year, 12, 31)
-        days_in_year = [
-            start + timedelta(days=delta)
-            for delta in range(0, (end - start).days + 1)
-        ]
-
-        months = []
-        for month in range(1, 12 + 1):
-            days_in_month = [day for day in days_in_year if day.month == month]
-            months.append(
-                [
-                    month,
-                    [
-                        days_in_month[i : i + WeeklyPlanner.ROWS_IN_COLUMN]
-                        for i in range(
-                            0,
-                            len(days_in_month),
-                            WeeklyPlanner.ROWS_IN_COLUMN,
+    def _check_events(self, year, events):
+        """予定の索引 (ics.EventIndex) が年に合っているか確かめる"""
+        if events is not None and events.year != year:
+            raise ValueError(
+                "events for {} cannot be used for {}".format(events.year, year)
+            )
+        return events
+
+    def _reserve_glyphs(self, canvas, groups):
+        """月の番号と日のラベルと予定の文字の符号を割り当てる
+
+        groups は月ごとの日 (元日からの日数) の並びのリスト。日のラベルの
+        文字を先にまとめて割り当て, 予定の文字は月の順に割り当てる。
+        """
+        groups = [list(group) for group in groups]
+        with instrument.span("reserve_glyphs"):
+            return canvas.reserve_glyphs(
+                {
+                    "mplus-b": ["0123456789"],
+                    "mplus-r": [
+                        "".join(
+                            self._fitted_label(index)[0]
+                            for group in groups
+                            for index in group
+                        )
+                    ]
+                    + [
+                        "".join(
+                            text
+                            for index in group
+                            for _, _, text in self._event_lines(index)
                         )
+                        for group in groups
                     ],
-                ]
+                }
             )
-        self.months = months
-
-    def __subcolumn_index_in_page(self, subcolumn_number):
-        index = subcolumn_number % WeeklyPlanner.SUBCOLUMNS_IN_PAGE
-        if index == 0:
-            index = WeeklyPlanner.SUBCOLUMNS_IN_PAGE
-        return index
-
-    def __column_index_in_page(self, subcolumn_number):
-        index = (
-            math.ceil(subcolumn_number / WeeklyPlanner.SUBCOLUMNS_IN_COLUMN)
-            % Planner.COLUMNS_IN_PAGE
+
+    def _month_key(self, canvas, month):
+        """月の描画結果のキャッシュのキー
+
+        月の暦注 (日ごとのラベルと表示色), 予定, レイアウトの定数と,
+        月に使う文字の符号から作る。ほかの月の文字は含めないため,
+        ほかの月だけに文字が増えても変わらない。
+        """
+        days = [
+            [
+                self._fitted_label(index),
+                self.calendar.color[index],
+                self._event_lines(index),
+            ]
+            for index in self.calendar.month(month)
+        ]
+        text = "".join(
+            label + "".join(line[2] for line in lines)
+            for (label, _), _, lines in days
+        )
+        return page_key(
+            type(self).__name__,
+            self._layout(),
+            canvas.glyph_codes({"mplus-b": "0123456789", "mplus-r": text}),
+            month,
+            days,
         )
-        if index == 0:
-            index = Planner.COLUMNS_IN_PAGE
-        return index
 
-    def __subcolumn_origin(self, subcolumn_number):
-        column_index_in_page = self.__column_index_in_page(subcolumn_number)
+    def _draw_months(self, canvas, months, glyphs):
+        """月ごとの描画
+
+        キャッシュにある月は記録した描画結果を再生し, ない月は描いて
+        記録する。workers が 2 以上なら, ない月をワーカープロセスで
+        並列に描いて記録し, 月の順に再生する。文字の符号は glyphs で
+        固定しているため, 出力はプロセス数によらず同じになる。
+        """
+        keys = {}
+        fragments = {}
+        if self.cache is not None:
+            for month in months:
+                keys[month] = self._month_key(canvas, month)
+                fragment = self.cache.get(keys[month])
+                if fragment is not None:
+                    instrument.count("months_replayed")
+                    fragments[month] = fragment
+
+        missing = [month for month in months if month not in fragments]
+        if self.workers > 1 and len(missing) > 1:
+            with instrument.span("render_shards"):
+                with ProcessPoolExecutor(
+                    max_workers=min(self.workers, len(missing))
+                ) as executor:
+                    rendered = executor.map(
+                        partial(_render_month, self, glyphs=glyphs), missing
+                    )
+                    for month, fragment in zip(missing, rendered):
+                        fragments[month] = fragment
+                        if self.cache is not None:
+                            self.cache.put(keys[month], fragment)
 
-        x = (
-            Planner.COLUMN_WIDTH * (column_index_in_page - 1)
-            + Planner.MARGIN_X
+        for month in months:
+            with instrument.span("month {:02d}".format(month)):
+                if month in fragments:
+                    canvas.replay(fragments[month])
+                elif self.cache is None:
+                    self._draw_month_content(canvas, month)
+                else:
+                    canvas.start_recording()
+                    self._draw_month_content(canvas, month)
+                    self.cache.put(keys[month], canvas.stop_recording())
+
+    @abstractmethod
+    def _draw_month_content(self, canvas, month):
+        """月の内容を描く"""
+
+    """表示色の分類ごとの色"""
+    COLORS = {
+        YearCalendar.WEEKDAY: black,
+        YearCalendar.SATURDAY: blue,
+        YearCalendar.HOLIDAY: red,
+    }
+
+    def _fill_color_of_the_day(self, calendar, index):
+        return CalendarPlanner.COLORS[calendar.color[index]]
+
+    def _day_label(self, calendar, index):
+        label = "{:>2}({}) {} {}".format(
+            calendar.day_of_month[index],
+            calendar.weekday(index).name_ja,
+            calendar.rokuyo_label(index),
+            calendar.holiday_label(index),
+        )
+        season = calendar.season_label(index)
+        # 春分の日と秋分の日には二十四節気の春分と秋分を重ねて書かない
+        if season and not calendar.holiday_label(index).startswith(season):
+            label = "{} {}".format(label.rstrip(), season)
+        return label
+
+    def _fitted_label(self, index):
+        """日のラベルと文字の大きさ
+
+        欄の幅を超える場合は LABEL_MIN_SIZE まで文字を小さくし, それでも
+        収まらなければ末尾を省略する。
+        """
+        return fit(
+            self._day_label(self.calendar, index),
+            self.layout.cell_width,
+            "mplus-r",
+            self.LABEL_SIZE,
+            self.LABEL_MIN_SIZE,
         )
-        y = Planner.HEIGHT - Planner.MARGIN_Y
-
-        return (x, y)
 
-    def __draw_column_separator(self, canvas):
-        for i in range(1, Planner.COLUMNS_IN_PAGE):
-            canvas.setDash(1, 2)
-            canvas.line(
-                ((Planner.WIDTH / Planner.COLUMNS_IN_PAGE) * i) * mm,
+    def _event_lines(self, index):
+        """日の予定を描く位置 (ラベルの位置からの差) と文字列のリスト
+
+        ラベルの下に行が空いていれば一件ずつ行を分けて, 空いていなければ
+        ラベルの右に続けて書く。欄に収まらない予定は文字の幅を測って
+        切り詰め, 省いた件数を +N と書く。
+        """
+        if self.events is None:
+            return []
+        occurrences = self.events.day(index)
+        if not occurrences:
+            return []
+        items = [
+            "{} {}".format(o.time, o.summary) if o.time else o.summary
+            for o in occurrences
+        ]
+        layout = self.layout
+        size = self.EVENT_SIZE
+        leading = self.EVENT_LEADING
+        lines = int((layout.label_y[0] - layout.rule_y[0] - size) // leading)
+        if lines > 0:
+            if len(items) > lines:
+                items = items[: lines - 1] + [
+                    "+{}".format(len(items) - lines + 1)
+                ]
+            return [
+                (
+                    0,
+                    -leading * (line + 1),
+                    truncate(item, layout.cell_width, "mplus-r", size),
+                )
+                for line, item in enumerate(items)
+            ]
+        label, label_size = self._fitted_label(index)
+        offset = text_width(label, "mplus-r", label_size) + self.EVENT_GAP
+        return [
+            (
+                offset,
                 0,
-                ((Planner.WIDTH / Planner.COLUMNS_IN_PAGE) * i) * mm,
-                self.HEIGHT * mm,
+                join_fitting(
+                    items, layout.cell_width - offset, "mplus-r", size
+                ),
             )
+        ]
 
-    def __draw_header(self, canvas, origin, month_number):
-        header = canvas.beginText()
-        header.setFillColor(black)
-        header.setTextOrigin(origin.x * mm, origin.y * mm)
-        header.setFont("mplus-b", 12)
-        header.textOut("{}".format(month_number))
-        canvas.drawText(header)
-
-    def __row_height(self, canvas_height):
-        return canvas_height / WeeklyPlanner.ROWS_IN_COLUMN
-
-    def __draw_row(self, canvas, origin, day):
-        canvas.setDash(1, 1)
-        canvas.setLineWidth(0.5)
-        canvas.line(
-            origin.x * mm,
-            (origin.y - 1) * mm,
-            (origin.x + WeeklyPlanner.SUBCOLUMN_WIDTH) * mm,
-            (origin.y - 1) * mm,
+    @abstractmethod
+    def pages(self):
+        """ページの割り付け (page_plan.Page) を順に返す"""
+
+    def select_pages(self, numbers=None, start=None, end=None):
+        """ページ番号が numbers に含まれ, start から end までの日付
+        (datetime.date, 両端を含む) を含むページ"""
+        return list(
+            page_plan.select(
+                self.pages(),
+                numbers,
+                None if start is None else self.calendar.index(start),
+                None if end is None else self.calendar.index(end),
+            )
         )
 
-        day_as_str = day.strftime("%Y%m%d")
-        rokuyo = (
-            Almanac.rokuyo[day_as_str] if day_as_str in Almanac.rokuyo else ""
+    def print_pages(self, pages, filename):
+        """選んだページ (page_plan.Page) だけを出力する
+
+        月ごとの描画結果のキャッシュは使わず, 選んだページだけを描く。
+        """
+        canvas = self._create_canvas(filename)
+        # 月ごとに描いた場合と同じ符号になるよう, 月ごとにまとめて割り当てる
+        months = {}
+        for page in pages:
+            for cell in page.cells:
+                months.setdefault(cell.month, []).extend(cell.days)
+        self._reserve_glyphs(canvas, months.values())
+        for page in pages:
+            with instrument.span("page {:02d}".format(page.number)):
+                self._draw_page(canvas, page)
+                canvas.showPage()
+        self._save(canvas)
+
+    def _draw_page(self, canvas, page):
+        self._draw_static(canvas, "separators", self._draw_column_separators)
+        for cell in page.cells:
+            self._draw_cell(canvas, cell)
+
+    """欄の罫線のフォームの名前. {} は行数"""
+    RULES_FORM = "rules-{}"
+
+    def _draw_cell(self, canvas, cell):
+        """欄の罫線と, 月の見出しと日のラベル"""
+        layout = self.layout
+        x = layout.cell_x[cell.cell]
+        rows = len(cell.days)
+        self._draw_static(
+            canvas,
+            self.RULES_FORM.format(rows),
+            partial(self._draw_rules, rows=rows),
+            x,
         )
-        holiday = (
-            Almanac.holiday[day_as_str]
-            if day_as_str in Almanac.holiday
-            else ""
-        )
-        day_of_week = Almanac.day_of_week(day_as_str)
 
-        text_object = canvas.beginText()
-        text_object.setTextOrigin(origin.x * mm, (origin.y + 22) * mm)
-        text_object.setFont("mplus-r", 6)
+        with TextBatch(canvas) as text:
+            text.draw(
+                x,
+                layout.header_y,
+                "{}".format(cell.month),
+                "mplus-b",
+                12,
+                black,
+            )
+            for day, y in zip(cell.days, layout.label_y):
+                label, size = self._fitted_label(day)
+                text.draw(
+                    x,
+                    y,
+                    label,
+                    "mplus-r",
+                    size,
+                    self._fill_color_of_the_day(self.calendar, day),
+                )
+                for dx, dy, line in self._event_lines(day):
+                    text.draw(
+                        x + dx, y + dy, line, "mplus-r", self.EVENT_SIZE, black
+                    )
 
-        color = super()._fill_color_of_the_day(day_as_str)
-        text_object.setFillColor(color)
 
-        text_object.textOut(
-            "{}({}) {} {}".format(
-                day.strftime("%e"), day_of_week.name_ja, rokuyo, holiday
-            )
+class WeeklyPlanner(CalendarPlanner):
+    """週間予定表"""
+
+    """一週間を一つの欄に描き, 見出しの下に 7 行並べる"""
+    GRID = GridSpec(rows=7, rows_top=3, label_offset=22)
+
+    RULES_FORM = "weekly-rules-{}"
+
+    def pages(self):
+        return page_plan.weekly_pages(
+            self.calendar, self.layout, self.GRID.rows
         )
-        canvas.drawText(text_object)
 
     def print_months(self, months, filename):
         self.__print_months(
-            [m for m in self.months if m[0] in months], filename
+            [m for m in range(1, 12 + 1) if m in months], filename
         )
 
     def print_month(self, month, filename):
-        self.__print_months(
-            [m for m in self.months if m[0] == month], filename
-        )
+        self.__print_months([month], filename)
 
     def print(self, filename):
-        self.__print_months(self.months, filename)
+        self.__print_months(range(1, 12 + 1), filename)
 
     def __print_months(self, months, filename):
         canvas = super()._create_canvas(filename)
+        glyphs = super()._reserve_glyphs(
+            canvas, [self.calendar.month(month) for month in months]
+        )
 
-        for month in months:
-            month_number = month[0]
-            for week in enumerate(month[1], start=1):
-                week_number_in_month = week[0]
-                days_in_week = week[1]
-
-                subcolumn_index_in_page = self.__subcolumn_index_in_page(
-                    week_number_in_month
-                )
-
-                if subcolumn_index_in_page == 1:
-                    if week_number_in_month > 1:
-                        canvas.showPage()
-                    self.__draw_column_separator(canvas)
-
-                x, y = self.__subcolumn_origin(week_number_in_month)
-
-                origin = Coordinate(x, y)
-
-                origin.move(0, -3)
-                self.__draw_header(canvas, origin, month_number)
-
-                row_height = self.__row_height(origin.y - Planner.MARGIN_Y)
-                origin.move(0, -1 * row_height)
-
-                for day in days_in_week:
-                    self.__draw_row(canvas, origin, day)
-                    origin.move(0, -1 * row_height)
+        super()._draw_months(canvas, months, glyphs)
+        super()._save(canvas)
 
+    def _draw_month_content(self, canvas, month):
+        for page in page_plan.weekly_pages(
+            self.calendar, self.layout, self.GRID.rows, [month]
+        ):
+            super()._draw_page(canvas, page)
             canvas.showPage()
 
-        canvas.save()
-
 
-class YearlyPlanner(Planner):
+class YearlyPlanner(CalendarPlanner):
     """年間予定表"""
 
-    MONTHS_IN_COLUMN = 2
-    MONTHS_IN_PAGE = MONTHS_IN_COLUMN * Planner.COLUMNS_IN_PAGE
-    MONTH_WIDTH = (
-        Planner.WIDTH - 2 * Planner.MARGIN_X * Planner.COLUMNS_IN_PAGE
-    ) / MONTHS_IN_PAGE
+    """一月を一つの欄に描き, 列ごとに二か月並べる"""
+    GRID = GridSpec(rows=31, cells_in_column=2)
 
-    def __init__(self, year):
-        self.year = year
-        start = date(self.year, 1, 1)
-        end = date(self.year, 12, 31)
-        self.days_in_year = [
-            start + timedelta(days=delta)
-            for delta in range(0, (end - start).days + 1)
-        ]
+    RULES_FORM = "yearly-rules-{}"
 
     def print(self, filename):
         canvas = super()._create_canvas(filename)
+        glyphs = super()._reserve_glyphs(
+            canvas, [self.calendar.month(month) for month in range(1, 12 + 1)]
+        )
 
-        for month in range(1, 12 + 1):
-            if month % YearlyPlanner.MONTHS_IN_PAGE == 1:
-                if month > YearlyPlanner.MONTHS_IN_PAGE:
-                    canvas.showPage()
-                for i in range(1, Planner.COLUMNS_IN_PAGE):
-                    canvas.setDash(1, 2)
-                    canvas.line(
-                        ((Planner.WIDTH / Planner.COLUMNS_IN_PAGE) * i) * mm,
-                        0,
-                        ((Planner.WIDTH / Planner.COLUMNS_IN_PAGE) * i) * mm,
-                        Planner.HEIGHT * mm,
-                    )
-
-            index_in_page = (month - 1) % YearlyPlanner.MONTHS_IN_PAGE
-            column_index = ((month - 1) % YearlyPlanner.MONTHS_IN_PAGE) // (
-                Planner.COLUMNS_IN_PAGE - 1
-            )
-            index_in_column = index_in_page % YearlyPlanner.MONTHS_IN_COLUMN
-
-            #   12   34   56   month
-            #   01   23   45   index_in_page
-            #   00   11   22   column_index
-            #   01   01   01   index_in_column
-            # +----+----+----+
-            # |:##:|:##:|:##:|
-            # |:##:|:##:|:##:|
-            # +----+----+----+
-            x = (
-                (
-                    2 * Planner.MARGIN_X
-                    + YearlyPlanner.MONTHS_IN_COLUMN
-                    * YearlyPlanner.MONTH_WIDTH
-                )
-                * column_index
-                + Planner.MARGIN_X
-                + YearlyPlanner.MONTH_WIDTH * index_in_column
+        super()._draw_months(canvas, range(1, 12 + 1), glyphs)
+        canvas.showPage()
+        super()._save(canvas)
+
+    def pages(self):
+        return page_plan.yearly_pages(self.calendar, self.layout)
+
+    def _draw_month_content(self, canvas, month):
+        #   12   34   56   month
+        #   01   23   45   cell
+        # +----+----+----+
+        # |:##:|:##:|:##:|
+        # |:##:|:##:|:##:|
+        # +----+----+----+
+        page, cell = self.layout.page_and_cell(month - 1)
+        if cell == 0:
+            if page > 0:
+                canvas.showPage()
+            super()._draw_static(
+                canvas, "separators", super()._draw_column_separators
             )
-            y = Planner.HEIGHT - Planner.MARGIN_Y
-            origin = Coordinate(x, y)
-
-            month_label = canvas.beginText()
-            month_label.setFillColor(black)
-            month_label.setTextOrigin(origin.x * mm, (origin.y - 3) * mm)
-            month_label.setFont("mplus-b", 12)
-            month_label.textOut("{}".format(month))
-            canvas.drawText(month_label)
-
-            for day in filter(lambda d: d.month == month, self.days_in_year):
-                origin.move(
-                    0, -1 * (Planner.HEIGHT - Planner.MARGIN_Y * 2) / 31
-                )
-
-                canvas.setDash(1, 1)
-                canvas.setLineWidth(0.5)
-                canvas.line(
-                    origin.x * mm,
-                    (origin.y - 1) * mm,
-                    (origin.x + YearlyPlanner.MONTH_WIDTH) * mm,
-                    (origin.y - 1) * mm,
-                )
+        super()._draw_cell(
+            canvas, page_plan.Cell(cell, month, self.calendar.month(month))
+        )
 
-                day_as_str = day.strftime("%Y%m%d")
-                rokuyo = (
-                    Almanac.rokuyo[day_as_str]
-                    if day_as_str in Almanac.rokuyo
-                    else ""
-                )
-                holiday = (
-                    Almanac.holiday[day_as_str]
-                    if day_as_str in Almanac.holiday
-                    else ""
-                )
-                day_of_week = Almanac.day_of_week(day_as_str)
 
-                text_object = canvas.beginText()
-                text_object.setTextOrigin(origin.x * mm, origin.y * mm)
-                text_object.setFont("mplus-r", 6)
+class ToDoList(Planner):
+    """ToDoリスト"""
 
-                color = super()._fill_color_of_the_day(day_as_str)
-                text_object.setFillColor(color)
+    """列ごとに一つの欄を描き, 31 行並べる"""
+    GRID = GridSpec(rows=31)
 
-                text_object.textOut(
-                    "{}({}) {} {}".format(
-                        day.strftime("%e"),
-                        day_of_week.name_ja,
-                        rokuyo,
-                        holiday,
-                    )
-                )
-                canvas.drawText(text_object)
+    """タスクを指定しない場合に出力する空のページの数"""
+    PAGES = 2
 
-        canvas.showPage()
-        canvas.save()
+    """各行の書式. 最初の全角の空白に優先度を, 後ろにタスクを書く"""
+    ROW = "　｜ ｜"
+    ROW_SIZE = 16
 
+    """タスクの文字の大きさ (ポイント)"""
+    TASK_SIZE = 9
 
-class ToDoList(Planner):
-    """ToDoリスト"""
+    """行の書式とタスク, タスクと期限の間隔 (ポイント)"""
+    TASK_GAP = 3
 
-    TODOS_IN_COLUMN = 31
-    TODO_COLUMN_IN_COLUMN = 1
-    TODO_COLUMN_IN_PAGE = TODO_COLUMN_IN_COLUMN * Planner.COLUMNS_IN_PAGE
-    TODO_COLUMN_WIDTH = (
-        Planner.WIDTH - Planner.MARGIN_X * Planner.COLUMNS_IN_PAGE * 2
-    ) / TODO_COLUMN_IN_PAGE
+    def __init__(self, paper="A4", tasks=None):
+        """tasks はタスク (tasks.Task) の iterable. None なら空のページ"""
+        super().__init__(paper)
+        self.tasks = tasks
 
-    def __row_height(self, canvas_height):
-        return canvas_height / ToDoList.TODOS_IN_COLUMN
+    def __draw_page(self, canvas, x=0):
+        """ページの内容はすべて同じなので, ページ全体を一つのフォームにする"""
+        layout = self.layout
+        super()._draw_column_separators(canvas, x)
 
-    def __draw_row(self, canvas, origin):
-        canvas.setDash(1, 1)
-        canvas.setLineWidth(0.5)
-        canvas.line(
-            origin.x * mm,
-            (origin.y - 1) * mm,
-            (origin.x + ToDoList.TODO_COLUMN_WIDTH) * mm,
-            (origin.y - 1) * mm,
-        )
+        for cell_x in layout.cell_x:
+            cell_x += x
+            super()._draw_rules(canvas, cell_x)
+            with TextBatch(canvas) as text:
+                for y in layout.label_y:
+                    text.draw(
+                        cell_x, y, self.ROW, "mplus-r", self.ROW_SIZE, black
+                    )
 
-        text_object = canvas.beginText()
-        text_object.setTextOrigin(origin.x * mm, origin.y * mm)
-        text_object.setFont("mplus-r", 16)
-        text_object.textOut("　｜ ｜")
-        canvas.drawText(text_object)
+    def _task_rows(self, tasks):
+        """ページの各行に描くタスクの (x, y, 文字列) のリスト
+
+        優先度は行の最初の欄に, 期限は欄の右端に寄せて書き, タスクは
+        その間に収まるよう文字の幅を測って切り詰める。
+        """
+        layout = self.layout
+        size = self.TASK_SIZE
+        rows = len(layout.label_y)
+        slot = text_width(self.ROW[0], "mplus-r", self.ROW_SIZE)
+        offset = text_width(self.ROW, "mplus-r", self.ROW_SIZE) + self.TASK_GAP
+        items = []
+        for index, task in enumerate(tasks):
+            cell, row = divmod(index, rows)
+            x = layout.cell_x[cell]
+            y = layout.label_y[row]
+            right = x + layout.cell_width
+            if task.priority:
+                items.append(
+                    (x, y, truncate(task.priority, slot, "mplus-r", size, ""))
+                )
+            if task.due is not None:
+                due = "{}/{}".format(task.due.month, task.due.day)
+                right -= text_width(due, "mplus-r", size)
+                items.append((right, y, due))
+                right -= self.TASK_GAP
+            # タスクの名前は一度しか測らないので, 幅を覚えておくのは
+            # 収まらずに切り詰めるものだけにする
+            title = task.title
+            if stringWidth(title, "mplus-r", size) > right - x - offset:
+                title = truncate(title, right - x - offset, "mplus-r", size)
+            items.append((x + offset, y, title))
+        return items
+
+    def __print_tasks(self, canvas):
+        """タスクを欄の行に順に書き, 必要なだけページを増やす
+
+        タスクは一ページ分ずつ読むため, すべてを一度に保持しない。
+        """
+        layout = self.layout
+        per_page = len(layout.label_y) * layout.cells_in_page
+        tasks = iter(self.tasks)
+        number = 0
+        while True:
+            chunk = list(islice(tasks, per_page))
+            if number > 0:
+                if not chunk:
+                    break
+                canvas.showPage()
+            number += 1
+            with instrument.span("page {:02d}".format(number)):
+                super()._draw_static(canvas, "todo-page", self.__draw_page)
+                with TextBatch(canvas) as text:
+                    for x, y, label in self._task_rows(chunk):
+                        text.draw(
+                            x, y, label, "mplus-r", self.TASK_SIZE, black
+                        )
+            instrument.count("tasks", len(chunk))
+            if len(chunk) < per_page:
+                break
 
     def print(self, filename):
         canvas = super()._create_canvas(filename)
-        for todo_number in range(1, ToDoList.TODO_COLUMN_IN_PAGE * 2 + 1):
-            if todo_number % ToDoList.TODO_COLUMN_IN_PAGE == 0:
-                todo_index = ToDoList.TODO_COLUMN_IN_PAGE
-            else:
-                todo_index = todo_number % ToDoList.TODO_COLUMN_IN_PAGE
-
-            if todo_index == 1:
-                if todo_number > 1:
+        if self.tasks is not None:
+            self.__print_tasks(canvas)
+        else:
+            for page in range(ToDoList.PAGES):
+                if page > 0:
                     canvas.showPage()
-                for i in range(1, Planner.COLUMNS_IN_PAGE):
-                    canvas.setDash(1, 2)
-                    canvas.line(
-                        ((Planner.WIDTH / Planner.COLUMNS_IN_PAGE) * i) * mm,
-                        0,
-                        ((Planner.WIDTH / Planner.COLUMNS_IN_PAGE) * i) * mm,
-                        Planner.HEIGHT * mm,
-                    )
-
-            x = Planner.COLUMN_WIDTH * (todo_index - 1) + Planner.MARGIN_X
-            y = Planner.HEIGHT - Planner.MARGIN_Y
+                super()._draw_static(canvas, "todo-page", self.__draw_page)
 
-            origin = Coordinate(x, y)
-            dy = self.__row_height(origin.y - Planner.MARGIN_Y)
-            origin.move(0, -1 * dy)
+        canvas.showPage()
+        super()._save(canvas)
 
-            for j in range(1, ToDoList.TODOS_IN_COLUMN + 1):
-                self.__draw_row(canvas, origin)
-                origin.move(0, -1 * dy)
 
-        canvas.showPage()
-        canvas.save()
+def _render_month(planner, month, glyphs):
+    """ワーカープロセスで月を描いて記録する"""
+    canvas = planner._create_canvas(io.BytesIO())
+    canvas.reserve_glyphs(glyphs)
+    canvas.start_recording()
+    planner._draw_month_content(canvas, month)
+    return canvas.stop_recording()
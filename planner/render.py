@@ -0,0 +1,120 @@
+"""描画の補助"""
+
+import math
+from functools import lru_cache
+
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+"""文字列の幅を覚えておく数 ((フォント, 大きさ, 文字列) の組の数)"""
+WIDTH_CACHE_SIZE = 8192
+
+
+class TextBatch:
+    """複数のラベルを一つのテキストオブジェクトにまとめて描く
+
+    フォントと塗りつぶしの色は直前のラベルから変わったときだけ設定する。
+    座標はポイント単位。with 文を抜けたときにまとめて出力する。
+    """
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.text = canvas.beginText()
+        self.font = None
+        self.color = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.canvas.drawText(self.text)
+
+    def draw(self, x, y, label, font_name, size, color):
+        if self.font != (font_name, size):
+            self.text.setFont(font_name, size)
+            self.font = (font_name, size)
+        if self.color is not color:
+            self.text.setFillColor(color)
+            self.color = color
+        self.text.setTextOrigin(x, y)
+        self.text.textOut(label)
+
+
+@lru_cache(maxsize=WIDTH_CACHE_SIZE)
+def text_width(text, font_name, size):
+    """文字列の幅 (ポイント)
+
+    登録したフォントの字幅から測り, 最近使った組から WIDTH_CACHE_SIZE
+    個まで覚えておく。ラベルや予定のように同じ文字列を何度も測る場合に使う。
+    """
+    return stringWidth(text, font_name, size)
+
+
+def truncate(text, width, font_name, size, ellipsis="…"):
+    """幅 width (ポイント) に収まるよう, 文字の幅を測って末尾を省略する"""
+    if text_width(text, font_name, size) <= width:
+        return text
+    available = width - text_width(ellipsis, font_name, size)
+    # 収まる最も長い先頭部分を二分探索する. 途中の部分は一度しか測らない
+    # ので覚えておかない
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if stringWidth(text[:middle], font_name, size) <= available:
+            low = middle
+        else:
+            high = middle - 1
+    return text[:low] + ellipsis if available >= 0 else ""
+
+
+def join_fitting(items, width, font_name, size, separator="  "):
+    """items を separator でつないで幅 width に収める
+
+    収まらない項目は省き, 省いた数を末尾に +N と書く。最初の項目も
+    収まらない場合は末尾を省略する。項目の幅は収まらなくなるまでの
+    分を一度ずつ測る。
+    """
+    gap = text_width(separator, font_name, size)
+    # ends[i] は先頭から i + 1 項目をつないだ幅
+    ends = []
+    for item in items:
+        end = (ends[-1] + gap if ends else 0) + text_width(
+            item, font_name, size
+        )
+        if end > width:
+            break
+        ends.append(end)
+    if len(ends) == len(items):
+        return separator.join(items)
+    for count in range(len(ends), 0, -1):
+        rest = "{}+{}".format(separator, len(items) - count)
+        if ends[count - 1] + text_width(rest, font_name, size) <= width:
+            return separator.join(items[:count]) + rest
+    rest = "{}+{}".format(separator, len(items) - 1) if len(items) > 1 else ""
+    return (
+        truncate(
+            items[0],
+            width - text_width(rest, font_name, size),
+            font_name,
+            size,
+        )
+        + rest
+    )
+
+
+def fit(text, width, font_name, size, min_size, step=0.5):
+    """幅 width (ポイント) に収まる (文字列, 文字の大きさ)
+
+    収まらない場合は step ポイント単位で min_size まで文字を小さくし,
+    それでも収まらなければ min_size で末尾を省略する。
+    """
+    measured = text_width(text, font_name, size)
+    if measured <= width:
+        return text, size
+    # 幅は文字の大きさに比例する. 丸めの誤差ではみ出す場合は一段小さくする
+    fitted = math.floor(size * width / measured / step) * step
+    if text_width(text, font_name, fitted) > width:
+        fitted -= step
+    if fitted >= min_size:
+        return text, fitted
+    return truncate(text, width, font_name, min_size), min_size
@@ -1,4 +1,5 @@
 import csv
+import html
 import re
 from datetime import datetime
 from urllib import request
@@ -27,6 +28,65 @@ def download_rokuyo(year):
     return download_html(url)
 
 
+"""高速な抽出で使う正規表現
+
+対象の div / table の範囲だけを文字列として切り出し, 入れ子のタグや
+省略されたタグなど想定外の構造があれば BeautifulSoup による解析に任せる。
+"""
+_DIV_TAG = re.compile(r"<div\b([^>]*)>", re.IGNORECASE)
+_TABLE_TAG = re.compile(r"<table\b([^>]*)>", re.IGNORECASE)
+_ATTRIBUTE = re.compile(
+    r"""([^\s"'=<>/]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'=<>`]+)))?"""
+)
+_COMMENT = re.compile(r"<!--.*?-->", re.DOTALL)
+_DIV_END = re.compile(r"</div", re.IGNORECASE)
+_TABLE_END = re.compile(r"</table", re.IGNORECASE)
+_NESTED_DIV = re.compile(r"<div\b", re.IGNORECASE)
+_NESTED_TABLE = re.compile(r"<(?:table|tbody|thead)\b", re.IGNORECASE)
+_PARAGRAPH_START = re.compile(r"<p\b", re.IGNORECASE)
+_ROW_START = re.compile(r"<tr\b", re.IGNORECASE)
+_CELL_START = re.compile(r"<td\b", re.IGNORECASE)
+# 要素の内容はタグを含まないものだけに一致させ, 開始タグの数と比べて
+# 一致しなかった要素があれば想定外の構造とみなす
+_PARAGRAPH = re.compile(r"<p\b[^>]*>([^<]*)</p\s*>", re.IGNORECASE)
+_ROW = re.compile(r"<tr\b[^>]*>(.*?)</tr\s*>", re.IGNORECASE | re.DOTALL)
+_CELL = re.compile(r"<td\b[^>]*>([^<]*)</td\s*>", re.IGNORECASE)
+_ROKUYO_DATE = re.compile("([0-9]{4})年([0-9]{1,2})月([0-9]{1,2})日")
+# 改行で連結した行から, 行ごとに最初の日付を取り出す
+_ROKUYO_DATE_LINE = re.compile(
+    "^.*?([0-9]{4})年([0-9]{1,2})月([0-9]{1,2})日.*$", re.MULTILINE
+)
+_HOLIDAY_DATE = re.compile("([0-9]{1,})月([0-9]{1,})日")
+
+
+def _attributes(source):
+    """タグの属性 (名前は小文字) の辞書"""
+    attributes = {}
+    for match in _ATTRIBUTE.finditer(source):
+        name = match.group(1).lower()
+        if name not in attributes:
+            value = match.group(2)
+            if value is None:
+                value = match.group(3)
+            if value is None:
+                value = match.group(4) or ""
+            attributes[name] = html.unescape(value)
+    return attributes
+
+
+def _texts(pattern, start_tag, content):
+    """pattern に一致する要素の文字列
+
+    タグを含むなどして一致しなかった要素がある場合は None を返す。
+    """
+    texts = pattern.findall(content)
+    if len(texts) != len(start_tag.findall(content)):
+        return None
+    if "&" in content:
+        texts = [html.unescape(text) for text in texts]
+    return texts
+
+
 def rokuyo_tag(tag):
     # html tags and attributes are case insensitive
     # https://html.spec.whatwg.org/multipage/syntax.html#writing
@@ -37,7 +97,60 @@ def rokuyo_tag(tag):
     )
 
 
+def extract_rokuyo(data):
+    """六曜のページから必要な範囲だけを切り出して六曜を抽出する
+
+    想定外の構造の場合は None を返す。
+    """
+    if not isinstance(data, str):
+        return None
+
+    regions = []
+    for match in _DIV_TAG.finditer(data):
+        attributes = _attributes(match.group(1))
+        if (
+            set(attributes.get("class", "").split()) == {"grpelem", "clearfix"}
+            and attributes.get("data-sizepolicy") == "fixed"
+        ):
+            start = match.end()
+            end = _DIV_END.search(data, start)
+            if end is None:
+                return None
+            content = _COMMENT.sub("", data[start : end.start()])
+            if _NESTED_DIV.search(content):
+                return None
+            regions.append(content)
+    if len(regions) != 2:
+        return None
+
+    rows = _texts(_PARAGRAPH, _PARAGRAPH_START, regions[0])
+    names = _texts(_PARAGRAPH, _PARAGRAPH_START, regions[1])
+    if not rows or not names or len(rows) != len(names):
+        return None
+
+    if any("\n" in row for row in rows):
+        return None
+    days = _ROKUYO_DATE_LINE.findall("\n".join(rows))
+    if len(days) != len(rows):
+        return None
+    return {
+        year + month.zfill(2) + day.zfill(2): name
+        for (year, month, day), name in zip(days, names)
+    }
+
+
 def parse_rokuyo(data):
+    """六曜のページを解析する
+
+    高速な抽出を試し, 想定外の構造の場合は BeautifulSoup で解析する。
+    """
+    rokuyo = extract_rokuyo(data)
+    if rokuyo is not None:
+        return rokuyo
+    return parse_rokuyo_soup(data)
+
+
+def parse_rokuyo_soup(data):
     soup = BeautifulSoup(data, "html.parser")
     divs = soup.find_all(rokuyo_tag)
     if not divs or len(divs) != 2:
@@ -49,7 +162,7 @@ def parse_rokuyo(data):
 
     days = []
     for row in rows:
-        match = re.search("([0-9]{4})年([0-9]{1,2})月([0-9]{1,2})日", row.text)
+        match = _ROKUYO_DATE.search(row.text)
         if match.groups() and len(match.groups()) == 3:
             year = match.group(1)
             month = match.group(2)
@@ -94,8 +207,54 @@ class NationalHolidayCaoParser(NationalHolidayParser):
         return national_holidays
 
 
+def extract_national_holidays(year, data):
+    """国立天文台のページから祝日の表だけを切り出して祝日を抽出する
+
+    想定外の構造の場合は None を返す。
+    """
+    if not isinstance(data, str):
+        return None
+
+    for match in _TABLE_TAG.finditer(data):
+        classes = _attributes(match.group(1)).get("class", "").split()
+        if "table--default" in classes:
+            break
+    else:
+        return None
+    start = match.end()
+    end = _TABLE_END.search(data, start)
+    if end is None:
+        return None
+    content = _COMMENT.sub("", data[start : end.start()])
+    if _NESTED_TABLE.search(content):
+        return None
+
+    rows = _ROW.findall(content)
+    if not rows or len(rows) != len(_ROW_START.findall(content)):
+        return None
+
+    national_holidays = {}
+    for row in rows:
+        columns = _texts(_CELL, _CELL_START, row)
+        if columns is None or len(columns) < 2:
+            return None
+        match = _HOLIDAY_DATE.search(columns[1])
+        if not match:
+            return None
+        month, day = match.groups()
+        ymd = "{}{}{}".format(year, month.zfill(2), day.zfill(2))
+        national_holidays[ymd] = columns[0]
+    return national_holidays
+
+
 class NationalHolidayNaojParser(NationalHolidayParser):
     def parse(self, year, data):
+        national_holidays = extract_national_holidays(year, data)
+        if national_holidays is not None:
+            return national_holidays
+        return self.parse_soup(year, data)
+
+    def parse_soup(self, year, data):
         soup = BeautifulSoup(data, "html.parser")
 
         table = soup.find("table", {"class": "table--default"})
@@ -111,7 +270,7 @@ class NationalHolidayNaojParser(NationalHolidayParser):
             columns = row.findChildren("td", recursive=False)
             name = columns[0].text
             date = columns[1].text
-            match = re.search("([0-9]{1,})月([0-9]{1,})日", date)
+            match = _HOLIDAY_DATE.search(date)
             if match.groups() and len(match.groups()) == 2:
                 month = match.group(1)
                 if len(month) == 1:
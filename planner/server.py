@@ -0,0 +1,353 @@
+"""予定表の出力サービス
+
+    planner serve --port 8000
+
+フォントと暦注を読み込んだまま常駐し, 予定表をメモリー上に出力して返す。
+
+- GET /yearly/2024, /weekly/2024?months=1,2, /todo: PDF
+- GET /stats: 要求の件数, キャッシュ, 応答時間 (p50/p99) の JSON
+
+同じ内容の要求が同時に届いた場合は一度だけ出力する。出力した PDF は
+(種類, 年, オプション) をキーとして, 合計の大きさに上限のある
+LRU キャッシュに保持する。
+"""
+
+import io
+import json
+import math
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from planner import batch, font, planner, years
+from planner.almanac import Almanac
+
+"""出力した PDF のキャッシュの既定の上限 (バイト)"""
+CACHE_BYTES = 64 * 1024 * 1024
+
+"""応答時間の統計に使う直近の要求の数"""
+LATENCY_SAMPLES = 10000
+
+"""応答を書き出す単位 (バイト)"""
+CHUNK_SIZE = 64 * 1024
+
+
+class RequestError(Exception):
+    """要求の誤り. status は応答する HTTP ステータス"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class LatencyRecorder:
+    """直近の要求の応答時間"""
+
+    def __init__(self, size=LATENCY_SAMPLES):
+        self.samples = deque(maxlen=size)
+        self.lock = threading.Lock()
+
+    def add(self, seconds):
+        with self.lock:
+            self.samples.append(seconds)
+
+    def percentile(self, p):
+        """p パーセンタイル (nearest-rank). 要求がなければ None"""
+        with self.lock:
+            samples = sorted(self.samples)
+        if not samples:
+            return None
+        return samples[max(math.ceil(p / 100 * len(samples)) - 1, 0)]
+
+    def summary(self):
+        return {
+            "count": len(self.samples),
+            "p50_ms": _milliseconds(self.percentile(50)),
+            "p99_ms": _milliseconds(self.percentile(99)),
+        }
+
+
+def _milliseconds(seconds):
+    return None if seconds is None else round(seconds * 1000, 3)
+
+
+class PdfCache:
+    """出力した PDF の LRU キャッシュ
+
+    合計の大きさが max_bytes を超えたら最も長く使われていないものから捨てる。
+    """
+
+    def __init__(self, max_bytes=CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.evictions = 0
+
+    def get(self, key):
+        pdf = self.entries.get(key)
+        if pdf is not None:
+            self.entries.move_to_end(key)
+        return pdf
+
+    def put(self, key, pdf):
+        if len(pdf) > self.max_bytes:
+            return
+        if key in self.entries:
+            self.bytes -= len(self.entries.pop(key))
+        self.entries[key] = pdf
+        self.bytes += len(pdf)
+        while self.bytes > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.bytes -= len(evicted)
+            self.evictions += 1
+
+    def summary(self):
+        return {
+            "entries": len(self.entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+        }
+
+
+class RenderService:
+    """予定表を出力するサービス
+
+    暦注は要求された年の分を一度だけ読み込み (または計算し), 年ごとの
+    Almanac として保持する。出力は要求を受けたスレッドで並行に行う。
+    rokuyo, holiday, almanac の意味は batch.run と同じ。
+    """
+
+    def __init__(
+        self,
+        rokuyo=None,
+        holiday=None,
+        almanac=None,
+        cache_bytes=CACHE_BYTES,
+        page_cache=None,
+    ):
+        self.rokuyo = rokuyo
+        self.holiday = holiday
+        self.almanac = almanac
+        self.page_cache = page_cache
+        self.cache = PdfCache(cache_bytes)
+        self.latency = LatencyRecorder()
+        self.statistics = {
+            "requests": 0,
+            "rendered": 0,
+            "cache_hits": 0,
+            "deduplicated": 0,
+            "errors": 0,
+        }
+        self.almanacs = {}
+        self.lock = threading.Lock()
+        self.almanac_lock = threading.Lock()
+        self.pending = {}
+
+        font.register_fonts()
+        self.store = Almanac.open(almanac) if almanac is not None else None
+
+    def load_year(self, year):
+        """年の暦注 (Almanac) を返す. 読み込みは年ごとに一度だけ行う"""
+        with self.almanac_lock:
+            if year in self.almanacs:
+                return self.almanacs[year]
+            if self.store is not None:
+                if not self.store.covers(year):
+                    raise RequestError(
+                        HTTPStatus.NOT_FOUND,
+                        "{}: no data for {}".format(self.almanac, year),
+                    )
+                almanac = self.store
+            else:
+                almanac = Almanac.create(
+                    [year],
+                    years.expand_paths(self.rokuyo, [year]),
+                    years.expand_paths(self.holiday, [year]),
+                )
+            self.almanacs[year] = almanac
+            return almanac
+
+    def render(self, kind, year=None, months=None):
+        """予定表の PDF を返す
+
+        キャッシュにあればそれを返し, 同じ内容を出力中であれば
+        その完了を待って結果を共有する。
+        """
+        if kind not in batch.OUTPUTS:
+            raise RequestError(HTTPStatus.NOT_FOUND, "unknown kind: " + kind)
+        if kind in batch.ALMANAC_KINDS and year is None:
+            raise RequestError(HTTPStatus.BAD_REQUEST, "year is required")
+        if kind != "weekly" and months:
+            raise RequestError(
+                HTTPStatus.BAD_REQUEST, "months is only for weekly"
+            )
+        if kind not in batch.ALMANAC_KINDS:
+            year = None
+        key = (kind, year, tuple(months or ()))
+
+        with self.lock:
+            self.statistics["requests"] += 1
+            pdf = self.cache.get(key)
+            if pdf is not None:
+                self.statistics["cache_hits"] += 1
+                return pdf
+            future = self.pending.get(key)
+            owner = future is None
+            if owner:
+                future = self.pending[key] = Future()
+            else:
+                self.statistics["deduplicated"] += 1
+
+        if not owner:
+            return future.result()
+
+        try:
+            pdf = self.__render(kind, year, months)
+        except BaseException as e:
+            with self.lock:
+                self.statistics["errors"] += 1
+                del self.pending[key]
+            future.set_exception(e)
+            raise
+        with self.lock:
+            self.statistics["rendered"] += 1
+            self.cache.put(key, pdf)
+            del self.pending[key]
+        future.set_result(pdf)
+        return pdf
+
+    def __render(self, kind, year, months):
+        buffer = io.BytesIO()
+        if kind == "yearly":
+            planner.YearlyPlanner(
+                year, self.page_cache, almanac=self.load_year(year)
+            ).print(buffer)
+        elif kind == "weekly":
+            document = planner.WeeklyPlanner(
+                year, self.page_cache, almanac=self.load_year(year)
+            )
+            if months:
+                document.print_months(months, buffer)
+            else:
+                document.print(buffer)
+        else:
+            planner.ToDoList().print(buffer)
+        return buffer.getvalue()
+
+    def summary(self):
+        with self.lock:
+            summary = dict(self.statistics)
+            summary["cache"] = self.cache.summary()
+        summary["latency"] = self.latency.summary()
+        return summary
+
+
+def parse_request(target):
+    """要求のパスとクエリを (種類, 年, 月のリスト) に変換する"""
+    url = urlsplit(target)
+    parts = [part for part in url.path.split("/") if part]
+    if not parts or len(parts) > 2:
+        raise RequestError(HTTPStatus.NOT_FOUND, "not found: " + url.path)
+    kind = parts[0]
+    year = None
+    if len(parts) == 2:
+        try:
+            year = int(parts[1].removesuffix(".pdf"))
+        except ValueError:
+            raise RequestError(
+                HTTPStatus.BAD_REQUEST, "invalid year: " + parts[1]
+            )
+    months = None
+    query = parse_qs(url.query, keep_blank_values=True)
+    if "months" in query:
+        try:
+            months = sorted(
+                {
+                    int(month)
+                    for value in query["months"]
+                    for month in value.split(",")
+                }
+            )
+        except ValueError:
+            months = []
+        if not months or not all(1 <= month <= 12 for month in months):
+            raise RequestError(
+                HTTPStatus.BAD_REQUEST,
+                "invalid months: " + ",".join(query["months"]),
+            )
+    return kind, year, months
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    """予定表の出力サービスの要求を処理する"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        service = self.server.service
+        if urlsplit(self.path).path == "/stats":
+            self.__send(
+                HTTPStatus.OK,
+                "application/json",
+                json.dumps(service.summary()).encode("utf-8"),
+            )
+            return
+
+        start = time.perf_counter()
+        try:
+            pdf = service.render(*parse_request(self.path))
+        except RequestError as e:
+            self.__send(e.status, "text/plain; charset=utf-8", str(e).encode())
+            return
+        except Exception as e:
+            self.__send(
+                HTTPStatus.INTERNAL_SERVER_ERROR,
+                "text/plain; charset=utf-8",
+                "{}: {}".format(type(e).__name__, e).encode(),
+            )
+            return
+        # 応答を受け取ったクライアントの次の要求より先に記録する
+        service.latency.add(time.perf_counter() - start)
+        self.__send(HTTPStatus.OK, "application/pdf", pdf)
+
+    def __send(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        view = memoryview(body)
+        for offset in range(0, len(body), CHUNK_SIZE):
+            self.wfile.write(view[offset : offset + CHUNK_SIZE])
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def create_server(service, host="127.0.0.1", port=8000, verbose=False):
+    """サービスを配信する HTTP サーバーを作る (port が 0 なら空きポート)"""
+    server = ThreadingHTTPServer((host, port), RequestHandler)
+    server.daemon_threads = True
+    server.service = service
+    server.verbose = verbose
+    return server
+
+
+def serve(service, host="127.0.0.1", port=8000, verbose=False):
+    """中断されるまで要求を処理し, 最後に統計を出力する"""
+    server = create_server(service, host, port, verbose)
+    host, port = server.server_address[:2]
+    print("serving on http://{}:{}/".format(host, port), file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(service.summary()), file=sys.stderr)
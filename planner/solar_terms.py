@@ -0,0 +1,132 @@
+"""二十四節気と雑節
+
+二十四節気は太陽の視黄経が 15 度の倍数になる日, 雑節の多くは
+二十四節気からの日数か, 特定の視黄経になる日で決まる。視黄経が
+目的の値を横切る時刻は一年分をまとめて求め, 年ごとにメモ化する。
+"""
+
+from datetime import date
+from functools import lru_cache
+
+from planner import astro
+
+"""二十四節気 (視黄経 0 度の春分から 15 度ごと)"""
+SOLAR_TERMS = (
+    "春分",
+    "清明",
+    "穀雨",
+    "立夏",
+    "小満",
+    "芒種",
+    "夏至",
+    "小暑",
+    "大暑",
+    "立秋",
+    "処暑",
+    "白露",
+    "秋分",
+    "寒露",
+    "霜降",
+    "立冬",
+    "小雪",
+    "大雪",
+    "冬至",
+    "小寒",
+    "大寒",
+    "立春",
+    "雨水",
+    "啓蟄",
+)
+
+"""視黄経で決まる雑節 (名称, 視黄経, 間隔)"""
+LONGITUDE_DAYS = (
+    ("土用入り", 27, 90),
+    ("入梅", 80, 360),
+    ("半夏生", 100, 360),
+)
+
+"""二十四節気からの日数で決まる雑節 (名称, 二十四節気, 日数)"""
+RELATIVE_DAYS = (
+    ("節分", "立春", -1),
+    ("八十八夜", "立春", 87),
+    ("二百十日", "立春", 209),
+    ("二百二十日", "立春", 219),
+    ("彼岸入り", "春分", -3),
+    ("彼岸明け", "春分", 3),
+    ("彼岸入り", "秋分", -3),
+    ("彼岸明け", "秋分", 3),
+)
+
+"""同じ日に重なった名称の区切り"""
+SEPARATOR = "・"
+
+
+def _crossings(start, end, step, offset=0):
+    """序数 start から end の前日までに視黄経が offset + step * n 度に
+    なる日 (日本標準時) の序数と視黄経"""
+    return [
+        (astro.jst_ordinal(jd), round(longitude))
+        for jd, longitude in astro.solar_terms(
+            astro.jd_from_ordinal(start) - astro.JST,
+            astro.jd_from_ordinal(end) - astro.JST,
+            step,
+            offset,
+        )
+    ]
+
+
+@lru_cache(maxsize=None)
+def _solar_terms_of_year(year):
+    start = date(year, 1, 1).toordinal()
+    end = date(year + 1, 1, 1).toordinal()
+    return tuple(
+        (ordinal, SOLAR_TERMS[longitude // 15])
+        for ordinal, longitude in _crossings(start, end, 15)
+    )
+
+
+@lru_cache(maxsize=None)
+def _zassetsu_of_year(year):
+    start = date(year, 1, 1).toordinal()
+    end = date(year + 1, 1, 1).toordinal()
+    days = []
+    for name, longitude, step in LONGITUDE_DAYS:
+        days.extend(
+            (ordinal, name)
+            for ordinal, _ in _crossings(start, end, step, longitude)
+        )
+    # 二十四節気からの日数で決まる雑節は, どれも同じ年に収まる
+    terms = {name: ordinal for ordinal, name in _solar_terms_of_year(year)}
+    for name, term, days_after in RELATIVE_DAYS:
+        days.append((terms[term] + days_after, name))
+    return tuple(sorted(days))
+
+
+def _to_dictionary(days):
+    labels = {}
+    for ordinal, name in days:
+        key = date.fromordinal(ordinal).strftime("%Y%m%d")
+        if key in labels:
+            labels[key] += SEPARATOR + name
+        else:
+            labels[key] = name
+    return labels
+
+
+def solar_terms_of_year(year):
+    """一年分の二十四節気 (YYYYMMDD 形式の辞書)"""
+    return _to_dictionary(_solar_terms_of_year(year))
+
+
+def zassetsu_of_year(year):
+    """一年分の雑節 (YYYYMMDD 形式の辞書)"""
+    return _to_dictionary(_zassetsu_of_year(year))
+
+
+def seasons_of_year(year):
+    """一年分の二十四節気と雑節 (YYYYMMDD 形式の辞書)
+
+    同じ日に重なった場合は二十四節気, 雑節の順に SEPARATOR でつなぐ。
+    計算結果は年ごとにメモ化する。
+    """
+    return _to_dictionary(_solar_terms_of_year(year) + _zassetsu_of_year(year))
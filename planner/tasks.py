@@ -0,0 +1,80 @@
+"""ToDoリストのタスク
+
+    for task in tasks.read_tasks("tasks.csv"):
+        ...
+
+CSV (見出し行つき) または JSON Lines (一行に一つのオブジェクト) の
+ファイルから, タスクを一件ずつ読む。列 (キー) は title (必須),
+due (YYYY-MM-DD, 省略可), priority (省略可)。ファイル全体を読み込まない
+ため, 大きなファイルでもメモリーの使用量はタスクの数によらない。
+"""
+
+import csv
+import json
+import os
+from datetime import date
+from typing import NamedTuple
+
+"""拡張子ごとの形式"""
+FORMATS = {
+    ".csv": "csv",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+}
+
+
+class Task(NamedTuple):
+    """タスク"""
+
+    title: str
+    """期限. なければ None"""
+    due: date = None
+    """優先度 (1, A, 高 など). なければ空文字列"""
+    priority: str = ""
+
+
+def _task(record):
+    title = str(record.get("title") or "").strip()
+    if not title:
+        raise ValueError("title is required")
+    due = str(record.get("due") or "").strip()
+    priority = record.get("priority")
+    return Task(
+        title,
+        date.fromisoformat(due) if due else None,
+        "" if priority is None else str(priority).strip(),
+    )
+
+
+def _records(file, format):
+    """(行番号, 行) を順に返す. CSV の行は辞書, JSON Lines の行は文字列"""
+    if format == "csv":
+        reader = csv.DictReader(file)
+        for record in reader:
+            yield reader.line_num, record
+        return
+    for number, line in enumerate(file, start=1):
+        if line.strip():
+            yield number, line
+
+
+def read_tasks(filename):
+    """ファイルのタスクを順に返す
+
+    形式は拡張子 (FORMATS) で決める。不正な行は
+    「ファイル名:行番号: 理由」の ValueError にする。
+    """
+    format = FORMATS.get(os.path.splitext(filename)[1].lower())
+    if format is None:
+        raise ValueError("{}: unknown task format".format(filename))
+    with open(filename, encoding="utf-8-sig", newline="") as f:
+        for number, record in _records(f, format):
+            try:
+                if format == "jsonl":
+                    record = json.loads(record)
+                task = _task(record)
+            except (ValueError, AttributeError) as e:
+                raise ValueError(
+                    "{}:{}: {}".format(filename, number, e)
+                ) from e
+            yield task
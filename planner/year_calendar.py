@@ -0,0 +1,112 @@
+import calendar
+from array import array
+from datetime import date
+
+from planner import solar_terms
+from planner.almanac import Almanac
+
+
+class YearCalendar:
+    """年間の暦表
+
+    一年分の曜日・表示色・六曜・祝日・二十四節気と雑節を, 元日からの
+    日数で引ける配列にまとめたもの。描画のたびに暦注を計算し直さない
+    ために使う。
+    """
+
+    """表示色の分類"""
+    WEEKDAY, SATURDAY, HOLIDAY = range(3)
+
+    def __init__(self, year, rokuyo=None, holiday=None, season=None):
+        if rokuyo is None:
+            rokuyo = getattr(Almanac, "rokuyo", {})
+        if holiday is None:
+            holiday = getattr(Almanac, "holiday", {})
+        if season is None:
+            season = solar_terms.seasons_of_year(year)
+
+        self.year = year
+        self.start = date(year, 1, 1)
+        self.ordinal = self.start.toordinal()
+        self.days = date(year + 1, 1, 1).toordinal() - self.ordinal
+
+        # 曜日の番号は Almanac.DayOfWeek (Zeller の公式) に合わせる
+        first_day_of_week = (self.start.weekday() + 2) % 7
+        sunday = Almanac.DayOfWeek.Sunday.number
+        saturday = Almanac.DayOfWeek.Saturday.number
+
+        # ラベルの文字列表. ラベル番号 0 は空文字列
+        self.labels = [""]
+        label_ids = {"": 0}
+
+        def intern(label):
+            if label not in label_ids:
+                label_ids[label] = len(self.labels)
+                self.labels.append(label)
+            return label_ids[label]
+
+        self.day_of_month = array("B")
+        self.day_of_week = array("B")
+        self.color = array("B")
+        self.rokuyo = array("H")
+        self.holiday = array("H")
+        self.season = array("H")
+
+        # m 月は month_offsets[m - 1] から month_offsets[m] の手前まで
+        self.month_offsets = array("H", [0])
+
+        index = 0
+        for month in range(1, 12 + 1):
+            days_in_month = calendar.monthrange(year, month)[1]
+            for day in range(1, days_in_month + 1):
+                key = "{:04d}{:02d}{:02d}".format(year, month, day)
+                day_of_week = (first_day_of_week + index) % 7
+                holiday_label = holiday.get(key, "")
+
+                self.day_of_month.append(day)
+                self.day_of_week.append(day_of_week)
+                self.rokuyo.append(intern(rokuyo.get(key, "")))
+                self.holiday.append(intern(holiday_label))
+                self.season.append(intern(season.get(key, "")))
+                if day_of_week == sunday or key in holiday:
+                    self.color.append(YearCalendar.HOLIDAY)
+                elif day_of_week == saturday:
+                    self.color.append(YearCalendar.SATURDAY)
+                else:
+                    self.color.append(YearCalendar.WEEKDAY)
+                index += 1
+            self.month_offsets.append(index)
+
+        self.__days_of_week = {
+            member.number: member for member in Almanac.DayOfWeek
+        }
+
+    def __len__(self):
+        return self.days
+
+    def index(self, day):
+        """日付を元日からの日数に変換する"""
+        return day.toordinal() - self.ordinal
+
+    def date(self, index):
+        return date.fromordinal(self.ordinal + index)
+
+    def month(self, month):
+        """月に含まれる日の範囲"""
+        return range(self.month_offsets[month - 1], self.month_offsets[month])
+
+    def weekday(self, index):
+        return self.__days_of_week[self.day_of_week[index]]
+
+    def rokuyo_label(self, index):
+        return self.labels[self.rokuyo[index]]
+
+    def holiday_label(self, index):
+        return self.labels[self.holiday[index]]
+
+    def season_label(self, index):
+        """二十四節気と雑節"""
+        return self.labels[self.season[index]]
+
+    def is_holiday(self, index):
+        return self.holiday[index] != 0
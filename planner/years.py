@@ -0,0 +1,26 @@
+"""年の指定
+
+コマンドラインの引数の変換にも使うため, 標準ライブラリ以外を読み込まない。
+"""
+
+
+def parse_years(value):
+    """年 (2024) または年の範囲 (2024-2035) を年のリストに変換する"""
+    first, separator, last = value.partition("-")
+    first = int(first)
+    last = int(last) if separator else first
+    if last < first:
+        raise ValueError("invalid year range: {}".format(value))
+    return list(range(first, last + 1))
+
+
+def expand_path(template, year):
+    """ファイル名の {year} を年に置き換える"""
+    return template.format(year=year)
+
+
+def expand_paths(template, years):
+    """年ごとのファイル名の (重複のない) リスト. template が None なら None"""
+    if template is None:
+        return None
+    return list(dict.fromkeys(expand_path(template, year) for year in years))
@@ -0,0 +1,11 @@
+import pytest
+
+
+@pytest.fixture(autouse=True, scope="session")
+def cache_directory(tmp_path_factory):
+    # フォントなどのキャッシュをホームディレクトリに書かない
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv(
+            "PLANNER_CACHE_DIR", str(tmp_path_factory.mktemp("cache"))
+        )
+        yield
@@ -1,6 +1,11 @@
+from importlib.resources import files
+
 import pytest
 
+import planner.data.conf
+from planner import solar_terms
 from planner.almanac import Almanac
+from planner.data.conf.__main__ import SOURCES, compile_source
 
 
 @pytest.mark.parametrize(
@@ -14,8 +19,80 @@ from planner.almanac import Almanac
             {"20230101": "元日"},
             {"20230101": "元日", "20230102": "振替休日"},
         ),
+        (
+            {"20150503": "憲法記念日", "20150504": "みどりの日"},
+            {"20150503": "憲法記念日", "20150504": "みどりの日", "20150505": "振替休日"},
+        ),
     ],
 )
 def test_add_holidays(provided_input, expected_output):
     Almanac.add_holidays(provided_input)
     assert provided_input == expected_output
+
+
+def test_compute_national_holidays():
+    Almanac.load_national_holidays("data/holiday-2023.txt")
+    loaded = Almanac.holiday
+    Almanac.compute_national_holidays(2023)
+    assert Almanac.holiday == loaded
+
+
+def test_days_of_week_compiled():
+    # 実行時に読み込むデータは定義ファイル (YAML) と同じ
+    for source, (module, name) in SOURCES.items():
+        compiled = files(planner.data.conf).joinpath(module)
+        assert compiled.read_text(encoding="utf-8") == compile_source(
+            source, name
+        )
+
+
+def test_instance():
+    almanac = Almanac.compute(2023, 2024)
+    assert almanac.years == {2023, 2024}
+    assert almanac.covers(2024) and not almanac.covers(2025)
+    assert len(almanac.rokuyo) == 365 + 366
+    assert almanac.rokuyo["20240101"] == "赤口"
+    assert almanac.holiday["20240212"] == "振替休日"
+    assert almanac.season["20240204"] == "立春"
+    assert "20250204" not in almanac.season
+
+    with pytest.raises(AttributeError):
+        almanac.rokuyo = {}
+    with pytest.raises(TypeError):
+        almanac.holiday["20240102"] = "元日"
+    with pytest.raises(TypeError):
+        almanac.season["20240204"] = "立春"
+
+
+def test_season_lazy(monkeypatch):
+    computed = []
+    seasons_of_year = solar_terms.seasons_of_year
+
+    def record(year):
+        computed.append(year)
+        return seasons_of_year(year)
+
+    monkeypatch.setattr(solar_terms, "seasons_of_year", record)
+    almanac = Almanac({}, {}, range(1950, 2100))
+    assert computed == []
+    # 引いた年だけを一度計算する
+    assert almanac.season.get("20240204") == "立春"
+    assert almanac.season.get("20240320") == "春分"
+    assert computed == [2024]
+
+
+def test_create():
+    almanac = Almanac.create(
+        [2023], ["data/rokuyo-2023.txt"], ["data/holiday-2023.txt"]
+    )
+    computed = Almanac.compute(2023)
+    assert dict(almanac.rokuyo) == dict(computed.rokuyo)
+    assert dict(almanac.holiday) == dict(computed.holiday)
+
+
+def test_current():
+    Almanac.compute_rokuyo(2023)
+    Almanac.compute_national_holidays(2023)
+    almanac = Almanac.current()
+    assert almanac.years == {2023}
+    assert almanac.holiday["20230102"] == "振替休日"
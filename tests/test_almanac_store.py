@@ -0,0 +1,134 @@
+from datetime import date
+from importlib.resources import files
+
+import pytest
+
+import tests
+from planner import batch, holiday
+from planner.__main__ import main
+from planner.almanac import Almanac
+from planner.almanac_store import AlmanacStore, compile_almanac
+from planner.year_calendar import YearCalendar
+
+
+@pytest.fixture
+def definitions():
+    rokuyo = Almanac.read_definitions(
+        files(tests).joinpath("data/rokuyo-2023.txt"),
+        files(tests).joinpath("data/rokuyo-2024.txt"),
+    )
+    holidays = {}
+    for year in (2023, 2024):
+        holidays.update(holiday.national_holidays(year))
+    return rokuyo, holidays
+
+
+@pytest.fixture
+def store(tmp_path, definitions):
+    filename = tmp_path / "almanac.bin"
+    compile_almanac(filename, *definitions)
+    with AlmanacStore(filename) as store:
+        yield store
+
+
+def test_compile_almanac(store, definitions):
+    rokuyo, holidays = definitions
+    assert (store.first_year, store.last_year) == (2023, 2024)
+    assert len(store.rokuyo) == 365 + 366
+    assert dict(store.rokuyo) == rokuyo
+    assert dict(store.holiday) == holidays
+
+
+@pytest.mark.parametrize(
+    "provided_input, expected_output",
+    [
+        ("20230101", (Almanac.DayOfWeek.Sunday, "先負", "元日")),
+        ("20240212", (Almanac.DayOfWeek.Monday, "先負", "振替休日")),
+        (date(2024, 12, 31), (Almanac.DayOfWeek.Tuesday, "赤口", None)),
+    ],
+)
+def test_lookup(store, provided_input, expected_output):
+    day_of_week, rokuyo, holiday_name = expected_output
+    key = provided_input
+    if isinstance(key, date):
+        key = key.strftime("%Y%m%d")
+    assert store.day_of_week(provided_input) == day_of_week.number
+    assert store.rokuyo[key] == rokuyo
+    assert store.holiday.get(key) == holiday_name
+
+
+@pytest.mark.parametrize("provided_input", ["20221231", "20250101", "2024"])
+def test_lookup_out_of_range(store, provided_input):
+    assert provided_input not in store.rokuyo
+    with pytest.raises(KeyError):
+        store.rokuyo[provided_input]
+
+
+def test_not_an_almanac_file(tmp_path):
+    filename = tmp_path / "almanac.bin"
+    filename.write_text("20240101 元日\n" * 8, encoding="utf-8")
+    with pytest.raises(ValueError):
+        AlmanacStore(filename)
+
+
+def test_year_calendar(store, definitions):
+    rokuyo, holidays = definitions
+    expected = YearCalendar(2024, rokuyo, holidays)
+    actual = YearCalendar(2024, store.rokuyo, store.holiday)
+    for name in ("day_of_week", "color", "rokuyo", "holiday"):
+        assert getattr(actual, name) == getattr(expected, name)
+    assert actual.labels == expected.labels
+
+
+def test_compile_almanac_command(tmp_path):
+    output = tmp_path / "almanac.bin"
+    assert main(["compile-almanac", "data", "-o", str(output)]) == 0
+
+    with AlmanacStore(output) as store:
+        assert (store.first_year, store.last_year) == (2023, 2024)
+        assert store.holiday["20240506"] == "振替休日"
+
+
+def test_compile_almanac_missing_years(tmp_path, definitions):
+    rokuyo, holidays = definitions
+    holidays = dict(holidays, **holiday.national_holidays(2026))
+    filename = tmp_path / "almanac.bin"
+    with pytest.raises(ValueError, match="2025, 2026"):
+        compile_almanac(filename, rokuyo, holidays)
+    assert not filename.exists()
+
+    directory = tmp_path / "data"
+    directory.mkdir()
+    for year in (2023, 2025):
+        name = "rokuyo-{}.txt".format(year)
+        source = files(tests).joinpath("data", "rokuyo-2023.txt")
+        directory.joinpath(name).write_text(
+            source.read_text(encoding="utf-8").replace("2023", str(year)),
+            encoding="utf-8",
+        )
+    output = tmp_path / "almanac.bin"
+    assert main(["compile-almanac", str(directory), "-o", str(output)]) == 1
+    assert not output.exists()
+
+
+def test_run_with_almanac(tmp_path):
+    output = tmp_path / "almanac.bin"
+    main(["compile-almanac", "data", "-o", str(output)])
+
+    jobs = batch.plan_jobs([2024], ["weekly"], tmp_path)
+    results = batch.run(jobs, almanac=str(output))
+    assert [result.ok for result in results] == [True]
+
+    jobs = batch.plan_jobs([2025], ["weekly"], tmp_path)
+    results = batch.run(jobs, almanac=str(output))
+    assert [result.ok for result in results] == [False]
+    assert "no data for 2025" in results[0].error
+
+
+def test_open(tmp_path, definitions):
+    filename = tmp_path / "almanac.bin"
+    compile_almanac(filename, *definitions)
+    almanac = Almanac.open(filename)
+    assert almanac.years == {2023, 2024}
+    assert almanac.rokuyo["20240101"] == "赤口"
+    assert almanac.holiday["20240506"] == "振替休日"
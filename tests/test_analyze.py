@@ -0,0 +1,119 @@
+import json
+
+import pytest
+
+from planner import analyze, planner
+from planner.__main__ import main
+from planner.almanac import Almanac
+
+
+@pytest.fixture(autouse=True)
+def almanac():
+    Almanac.compute_rokuyo(2024)
+    Almanac.compute_national_holidays(2024)
+
+
+@pytest.mark.parametrize(
+    "provided_input, expected_output",
+    [
+        (
+            b"<< /Type /Page /Kids [ 3 0 R 4 0 R ] >>",
+            {
+                "Type": "Page",
+                "Kids": [analyze.Ref(3, 0), analyze.Ref(4, 0)],
+            },
+        ),
+        (
+            b"[ 1 2.5 -3 (a\\)(b)) <4142> true ]",
+            [1, 2.5, -3, b"a\\)(b)", b"AB", "true"],
+        ),
+        (b"/FormXob.separators", "FormXob.separators"),
+    ],
+)
+def test_value(provided_input, expected_output):
+    assert analyze.Lexer(provided_input).value() == expected_output
+
+
+@pytest.mark.parametrize(
+    "provided_input, expected_output",
+    [
+        (
+            b"BT /F1 6 Tf 1 0 0 1 10 20 Tm (a) Tj ET",
+            ["BT", "Tf", "Tm", "Tj", "ET"],
+        ),
+        (b"q [1 2] 0 d 0 0 m 10 0 l S Q", ["q", "d", "m", "l", "S", "Q"]),
+        (b"[(A) -10 (B)] TJ T* (C) '", ["TJ", "T*", "'"]),
+    ],
+)
+def test_operators(provided_input, expected_output):
+    assert list(analyze.operators(provided_input)) == expected_output
+
+
+def test_yearly_planner(tmp_path):
+    filename = tmp_path / "2024.pdf"
+    planner.YearlyPlanner(2024).print(str(filename))
+    report = analyze.analyze(filename)
+
+    assert report["bytes"] == filename.stat().st_size
+    assert report["totals"]["pages"] == 2
+    # reportlab がページの始めに書く既定のフォントと, 6 か月分の見出しと
+    # 日のラベル
+    assert [page["text_objects"] for page in report["pages"]] == [7, 7]
+    assert all(page["xobjects"] for page in report["pages"])
+    assert report["forms"]
+    assert sorted(font["name"].split("+")[1] for font in report["fonts"]) == [
+        "mplus-1m-bold",
+        "mplus-1m-regular",
+    ]
+    totals = report["totals"]
+    assert totals["content_bytes"] < totals["content_decoded_bytes"]
+    assert totals["text_objects"] == totals["operators"]["BT"]
+
+
+def test_modes(tmp_path):
+    filenames = analyze.render_modes(
+        2024, "yearly", str(tmp_path), Almanac.compute(2024)
+    )
+    reports = dict(
+        zip(analyze.MODES, (analyze.analyze(name) for name in filenames))
+    )
+
+    uncompressed = reports["uncompressed"]["totals"]
+    assert uncompressed["content_bytes"] == (
+        uncompressed["content_decoded_bytes"]
+    )
+    assert reports["no-forms"]["forms"] == []
+    for report in reports.values():
+        assert report["totals"]["pages"] == 2
+    assert (
+        reports["compressed"]["bytes"]
+        < reports["uncompressed-no-forms"]["bytes"]
+    )
+
+
+def test_analyze_command(tmp_path, capsys):
+    assert main(["2024", "-t", "-o", str(tmp_path)]) == 0
+    report = tmp_path / "report.json"
+    filename = str(tmp_path / "todo.pdf")
+    assert main(["analyze", filename, "--json", str(report)]) == 0
+    assert filename in capsys.readouterr().out
+
+    result = json.loads(report.read_text(encoding="utf-8"))
+    assert result["format"] == analyze.FORMAT
+    assert [r["totals"]["pages"] for r in result["reports"]] == [2]
+
+    assert main(["analyze", str(tmp_path / "missing.pdf")]) == 1
+
+
+def test_analyze_modes_command(tmp_path, capsys):
+    # --modes の予定表は暦注を含めて, 通常の出力と同じになる
+    assert main(["2024", "-y", "-o", str(tmp_path)]) == 0
+    modes = tmp_path / "modes"
+    modes.mkdir()
+    assert main(["analyze", "--modes", "2024", "-o", str(modes)]) == 0
+    assert (modes / "2024-yearly-compressed.pdf").read_bytes() == (
+        tmp_path / "2024.pdf"
+    ).read_bytes()
+
+    missing = str(tmp_path / "missing.bin")
+    assert main(["analyze", "--modes", "2024", "-A", missing]) == 1
@@ -0,0 +1,64 @@
+from datetime import date
+
+import pytest
+
+from planner import batch
+from planner.batch import Job
+
+
+def test_plan_jobs():
+    jobs = batch.plan_jobs([2024, 2025], ["weekly", "todo"], "out")
+    assert jobs == [
+        Job("weekly", 2024, "out/2024-weekly.pdf"),
+        Job("weekly", 2025, "out/2025-weekly.pdf"),
+        Job("todo", 2024, "out/todo.pdf"),
+    ]
+
+
+def test_plan_jobs_pages():
+    jobs = batch.plan_jobs([2024], ["yearly", "todo"], "out", pages={2})
+    assert [job.filename for job in jobs] == [
+        "out/2024-pages.pdf",
+        "out/todo.pdf",
+    ]
+    assert [job.selects_pages for job in jobs] == [True, False]
+
+
+def test_plan_jobs_dates():
+    jobs = batch.plan_jobs(
+        [2023, 2024, 2025],
+        ["weekly", "todo"],
+        "out",
+        start=date(2024, 7, 15),
+        end=date(2024, 7, 16),
+    )
+    assert [(job.kind, job.year) for job in jobs] == [
+        ("weekly", 2024),
+        ("todo", 2023),
+    ]
+
+
+def test_plan_jobs_tasks():
+    jobs = batch.plan_jobs([2024], ["yearly", "todo"], "out", tasks="t.csv")
+    assert [job.tasks for job in jobs] == [None, "t.csv"]
+
+
+def test_run(tmp_path):
+    jobs = batch.plan_jobs([2024], ["todo"], tmp_path)
+    results = batch.run(jobs)
+    assert [result.ok for result in results] == [True]
+    assert tmp_path.joinpath("todo.pdf").exists()
+
+
+def test_run_output_directory(tmp_path):
+    directory = tmp_path / "out" / "j"
+    jobs = batch.plan_jobs([2024], ["todo"], str(directory))
+    assert [result.ok for result in batch.run(jobs)] == [True]
+    assert directory.joinpath("todo.pdf").exists()
+
+
+def test_run_failure(tmp_path):
+    jobs = batch.plan_jobs([2024], ["weekly"], tmp_path)
+    results = batch.run(jobs, rokuyo=str(tmp_path / "missing-{year}.txt"))
+    assert [result.ok for result in results] == [False]
+    assert "FileNotFoundError" in results[0].error
@@ -0,0 +1,93 @@
+from datetime import date, timedelta
+
+import pytest
+
+from planner.business_day import BusinessCalendar
+
+HOLIDAYS = {
+    "20231231": "大晦日",
+    "20240101": "元日",
+    "20240108": "成人の日",
+    "20240211": "建国記念の日",
+    "20240212": "振替休日",
+}
+
+
+def walk(calendar, day, n):
+    step = 1 if n > 0 else -1
+    if n == 0:
+        while not calendar.is_business_day(day):
+            day += timedelta(days=1)
+        return day
+    while n != 0:
+        day += timedelta(days=step)
+        if calendar.is_business_day(day):
+            n -= step
+    return day
+
+
+@pytest.mark.parametrize(
+    "provided_input, expected_output",
+    [
+        ((date(2023, 12, 29), 1), date(2024, 1, 2)),
+        ((date(2024, 1, 1), 0), date(2024, 1, 2)),
+        ((date(2024, 1, 2), 0), date(2024, 1, 2)),
+        ((date(2024, 1, 1), 1), date(2024, 1, 2)),
+        ((date(2024, 1, 5), 1), date(2024, 1, 9)),
+        ((date(2024, 1, 9), -1), date(2024, 1, 5)),
+        (("20240209", 1), date(2024, 2, 13)),
+    ],
+)
+def test_add(provided_input, expected_output):
+    calendar = BusinessCalendar(HOLIDAYS)
+    assert calendar.add(*provided_input) == expected_output
+
+
+def test_add_matches_walk():
+    calendar = BusinessCalendar(HOLIDAYS)
+    start = date(2023, 12, 20)
+    for delta in range(0, 60):
+        day = start + timedelta(days=delta)
+        for n in (-400, -3, -1, 0, 1, 2, 5, 300):
+            assert calendar.add(day, n) == walk(calendar, day, n)
+
+
+def test_count():
+    calendar = BusinessCalendar(HOLIDAYS)
+    assert calendar.count(date(2024, 1, 1), date(2024, 1, 8)) == 4
+    assert calendar.count(date(2024, 1, 8), date(2024, 1, 1)) == -4
+    assert calendar.count(date(2023, 12, 25), date(2024, 1, 9)) == 9
+    assert calendar.count(date(2000, 1, 1), date(2050, 1, 1)) == sum(
+        1
+        for delta in range(date(2050, 1, 1).toordinal() - 730120)
+        if calendar.is_business_day(date(2000, 1, 1) + timedelta(delta))
+    )
+
+
+def test_company_holidays():
+    calendar = BusinessCalendar(HOLIDAYS)
+    company = calendar.with_holidays([date(2024, 1, 2), "20240103"])
+    assert calendar.next_business_day(date(2024, 1, 1)) == date(2024, 1, 2)
+    assert company.next_business_day(date(2024, 1, 1)) == date(2024, 1, 4)
+    assert company.previous_business_day(date(2024, 1, 4)) == date(
+        2023, 12, 29
+    )
+
+
+def test_batch_queries():
+    calendar = BusinessCalendar(HOLIDAYS)
+    days = [date(2024, 1, 1), date(2024, 1, 5)]
+    assert calendar.add_many(days, 1) == [date(2024, 1, 2), date(2024, 1, 9)]
+    assert calendar.add_many(days, [0, -1]) == [
+        date(2024, 1, 2),
+        date(2024, 1, 4),
+    ]
+    assert calendar.count_many(
+        [(date(2024, 1, 1), date(2024, 1, 8)), ("20240101", "20240101")]
+    ) == [4, 0]
+
+
+def test_statutory_holidays():
+    calendar = BusinessCalendar()
+    assert calendar.add(date(2025, 5, 2), 1) == date(2025, 5, 7)
+    assert calendar.count(date(2025, 1, 1), date(2026, 1, 1)) == 246
@@ -0,0 +1,26 @@
+import threading
+
+from planner import cache
+
+
+def test_write_file(tmp_path):
+    path = tmp_path / "a" / "b.json"
+    cache.write_file(path, b"first")
+    cache.write_file(path, b"second")
+    assert path.read_bytes() == b"second"
+    assert [p.name for p in path.parent.iterdir()] == ["b.json"]
+
+
+def test_write_file_threads(tmp_path):
+    path = tmp_path / "page.json"
+    contents = [bytes([n]) * 100_000 for n in range(8)]
+    threads = [
+        threading.Thread(target=cache.write_file, args=(path, data))
+        for data in contents
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert path.read_bytes() in contents
+    assert [p.name for p in tmp_path.iterdir()] == ["page.json"]
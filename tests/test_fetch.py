@@ -0,0 +1,233 @@
+import asyncio
+import hashlib
+import subprocess
+import sys
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from importlib.resources import files
+
+import pytest
+
+import tests
+from planner import fetch
+from planner.__main__ import main
+
+
+class FixtureHandler(SimpleHTTPRequestHandler):
+    """tests/data を配信し, ETag と一時的な障害を模擬するハンドラー"""
+
+    protocol_version = "HTTP/1.1"
+
+    def send_head(self):
+        server = self.server
+        server.requests.append(self.path)
+        location = server.redirects.get(self.path)
+        if location:
+            self.send_response(301)
+            self.send_header("Location", location)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return None
+        failures = server.failures.get(self.path, 0)
+        if failures:
+            server.failures[self.path] = failures - 1
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return None
+
+        path = self.translate_path(self.path)
+        try:
+            with open(path, "rb") as f:
+                etag = '"{}"'.format(hashlib.sha256(f.read()).hexdigest())
+        except OSError:
+            return super().send_head()
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return None
+        self.etag = etag
+        return super().send_head()
+
+    def end_headers(self):
+        etag = getattr(self, "etag", None)
+        if etag:
+            self.send_header("ETag", etag)
+            self.etag = None
+        super().end_headers()
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", 0),
+        partial(FixtureHandler, directory=str(files(tests).joinpath("data"))),
+    )
+    server.requests = []
+    server.failures = {}
+    server.redirects = {}
+    server.connections = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def sources(server):
+    base = "http://127.0.0.1:{}".format(server.server_address[1])
+    return {
+        "holiday": base + "/{previous_year}0201-rekiyoko.html",
+        "rokuyo": base + "/rokuyo_{year}.html",
+    }
+
+
+def fetch_years(
+    fetcher, server, years, directory, kinds=("holiday", "rokuyo")
+):
+    return asyncio.run(
+        fetch.fetch_years(fetcher, years, directory, kinds, sources(server))
+    )
+
+
+def read(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def test_fetch_years(server, tmp_path):
+    fetcher = fetch.Fetcher(fetch.Cache(tmp_path / "cache"))
+    results = fetch_years(fetcher, server, [2023, 2024], tmp_path)
+
+    assert [result.error for result in results] == [None] * 4
+    for year in (2023, 2024):
+        assert read(tmp_path / "rokuyo-{}.txt".format(year)) == read(
+            files(tests).joinpath("data/rokuyo-{}.txt".format(year))
+        )
+    assert read(tmp_path / "holiday-2024.txt").startswith("20240101 元日\n")
+    assert fetcher.statistics["downloaded"] == 4
+    assert fetcher.statistics["parsed"] == 4
+
+
+def test_fetch_reuses_connections(server, tmp_path):
+    fetcher = fetch.Fetcher(fetch.Cache(tmp_path), connections_per_host=1)
+    fetch_years(fetcher, server, [2023, 2024], tmp_path)
+
+    assert len(server.requests) == 4
+    assert server.connections == 1
+    assert fetcher.pool.opened == 1
+
+
+def test_fetch_revalidates_cache(server, tmp_path):
+    cache = fetch.Cache(tmp_path / "cache")
+    fetch_years(fetch.Fetcher(cache), server, [2024], tmp_path)
+
+    fetcher = fetch.Fetcher(cache)
+    results = fetch_years(fetcher, server, [2024], tmp_path)
+
+    assert [result.error for result in results] == [None, None]
+    assert fetcher.statistics["not_modified"] == 2
+    assert fetcher.statistics["downloaded"] == 0
+    assert fetcher.statistics["parsed"] == 0
+    assert fetcher.statistics["parse_cache_hits"] == 2
+    assert read(tmp_path / "rokuyo-2024.txt") == read(
+        files(tests).joinpath("data/rokuyo-2024.txt")
+    )
+
+
+def test_fetch_retries(server, tmp_path):
+    server.failures["/rokuyo_2024.html"] = 2
+    fetcher = fetch.Fetcher(retries=3, backoff=0)
+    results = fetch_years(fetcher, server, [2024], tmp_path, ["rokuyo"])
+
+    assert results[0].error is None
+    assert fetcher.statistics["retries"] == 2
+    assert server.requests.count("/rokuyo_2024.html") == 3
+
+
+def test_fetch_gives_up(server, tmp_path):
+    server.failures["/rokuyo_2024.html"] = 5
+    fetcher = fetch.Fetcher(retries=1, backoff=0)
+    results = fetch_years(fetcher, server, [2024], tmp_path, ["rokuyo"])
+
+    assert "HTTP 503" in results[0].error
+    assert not (tmp_path / "rokuyo-2024.txt").exists()
+
+
+def test_fetch_not_found(server, tmp_path):
+    fetcher = fetch.Fetcher(backoff=0)
+    results = fetch_years(fetcher, server, [2030], tmp_path, ["rokuyo"])
+
+    assert "HTTP 404" in results[0].error
+    assert fetcher.statistics["retries"] == 0
+
+
+def test_fetch_redirect_cache(server, tmp_path):
+    server.redirects["/rokuyo_2024.html"] = "/rokuyo_2024.html?moved"
+    cache = fetch.Cache(tmp_path / "cache")
+    fetch_years(fetch.Fetcher(cache), server, [2024], tmp_path, ["rokuyo"])
+
+    # リダイレクトされたページも要求した URL でキャッシュを引く
+    fetcher = fetch.Fetcher(cache)
+    results = fetch_years(fetcher, server, [2024], tmp_path, ["rokuyo"])
+    assert results[0].error is None
+    assert fetcher.statistics["not_modified"] == 1
+    assert fetcher.statistics["downloaded"] == 0
+
+
+def test_fetch_isolates_failures(server, tmp_path, monkeypatch):
+    parse_page = fetch.parse_page
+
+    def broken(kind, year, body):
+        if year == 2023:
+            raise RuntimeError("broken page")
+        return parse_page(kind, year, body)
+
+    monkeypatch.setattr(fetch, "parse_page", broken)
+    # 書き出す先がディレクトリで書けない
+    (tmp_path / "holiday-2024.txt").mkdir()
+    results = fetch_years(fetch.Fetcher(), server, [2023, 2024], tmp_path)
+
+    errors = {(r.kind, r.year): r.error for r in results}
+    assert "RuntimeError('broken page')" in errors[("rokuyo", 2023)]
+    assert "IsADirectoryError" in errors[("holiday", 2024)]
+    assert errors[("rokuyo", 2024)] is None
+    assert (tmp_path / "rokuyo-2024.txt").exists()
+
+
+def test_main_fetch(server, tmp_path, monkeypatch):
+    monkeypatch.setattr(fetch, "SOURCES", sources(server))
+    argv = ["fetch", "2024", "-k", "rokuyo", "-o", str(tmp_path)]
+    argv += ["--cache", str(tmp_path / "cache")]
+
+    assert main(argv) == 0
+    assert (tmp_path / "rokuyo-2024.txt").exists()
+
+
+def test_fetch_imports():
+    # 取得にはフォントと reportlab を読み込まない
+    code = "\n".join(
+        [
+            "import sys",
+            "import planner.fetch",
+            "heavy = ('reportlab', 'planner.font')",
+            "print(' '.join(m for m in heavy if m in sys.modules))",
+        ]
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    assert result.stdout.strip() == ""
@@ -0,0 +1,58 @@
+from importlib.resources import files
+
+from reportlab.pdfgen.canvas import Canvas
+
+import planner.data.font
+from planner import font
+from planner.font import CachedTTFont, CachedTTFontFace, FontCache
+
+FONT_FILE = files(planner.data.font).joinpath("mplus-1m-regular.ttf")
+
+
+def test_font_cache(tmp_path):
+    cache = FontCache(tmp_path)
+    parsed = cache.load_face(FONT_FILE)
+    cached = cache.load_face(FONT_FILE)
+    assert (cache.misses, cache.hits) == (1, 1)
+    assert not isinstance(parsed, CachedTTFontFace)
+    assert isinstance(cached, CachedTTFontFace)
+    assert cached.charWidths == parsed.charWidths
+    subset = [ord(c) for c in "2024年1月(月) 大安 元日"]
+    assert cached.makeSubset(subset) == parsed.makeSubset(subset)
+
+
+def test_font_cache_corrupted(tmp_path):
+    cache = FontCache(tmp_path)
+    cache.load_face(FONT_FILE)
+    for path in tmp_path.iterdir():
+        path.write_bytes(b"broken")
+    cache.load_face(FONT_FILE)
+    assert (cache.misses, cache.hits) == (2, 0)
+
+
+def test_cached_font_string_width(tmp_path):
+    face = FontCache(tmp_path).load_face(FONT_FILE)
+    cached_font = CachedTTFont("mplus-test", face)
+    assert cached_font.stringWidth("大安", 6) == 12
+    assert cached_font.stringWidth("10", 6) == 6
+
+
+def embedded_glyphs(tmp_path, text):
+    font.register_fonts()
+    canvas = Canvas(str(tmp_path.joinpath("glyphs.pdf")))
+    canvas.setFont("mplus-r", 6)
+    canvas.drawString(0, 0, text)
+    return font.embedded_glyphs(canvas)
+
+
+def test_embedded_glyphs(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        font, "registry", font.FontRegistry(cache=FontCache(tmp_path))
+    )
+    ascii_only = embedded_glyphs(tmp_path, "2024")
+    with_kanji = embedded_glyphs(tmp_path, "2024 先勝 先勝")
+    assert list(with_kanji) == ["mplus-r"]
+    assert with_kanji["mplus-r"]["subsets"] == 1
+    assert (
+        with_kanji["mplus-r"]["glyphs"] - ascii_only["mplus-r"]["glyphs"] == 2
+    )
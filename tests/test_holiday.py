@@ -0,0 +1,120 @@
+import csv
+from datetime import date, datetime
+from importlib.resources import files
+
+import pytest
+
+import tests
+from planner import astro, holiday
+from planner.scrape import NationalHolidayNaojParser, parse_national_holidays
+
+# 内閣府の CSV では振替休日・国民の休日・一部の儀式の名称が異なる
+CAO_NAMES = {
+    "振替休日": "休日",
+    "国民の休日": "休日",
+    "皇太子明仁親王の結婚の儀": "結婚の儀",
+    "皇太子徳仁親王の結婚の儀": "結婚の儀",
+    "昭和天皇の大喪の礼": "大喪の礼",
+}
+
+
+def read_cao_csv():
+    expected_output = {}
+    file = files(tests).joinpath("data/syukujitsu.csv")
+    with open(file, "r", encoding="cp932") as f:
+        for col1, col2 in csv.reader(f):
+            if col1 != "国民の祝日・休日月日":
+                day = datetime.strptime(col1, "%Y/%m/%d")
+                expected_output.setdefault(day.year, {})[
+                    day.strftime("%Y%m%d")
+                ] = col2
+    return expected_output
+
+
+@pytest.mark.parametrize("year, expected_output", read_cao_csv().items())
+def test_national_holidays_csv(year, expected_output):
+    actual_output = {
+        day: CAO_NAMES.get(name, name)
+        for day, name in holiday.national_holidays(year).items()
+    }
+    if year == 2019:
+        actual_output["20190501"] = "休日（祝日扱い）"
+        actual_output["20191014"] = "体育の日（スポーツの日）"
+        actual_output["20191022"] = "休日（祝日扱い）"
+    assert actual_output == expected_output
+
+
+@pytest.mark.parametrize(
+    "year, provided_input_file",
+    [
+        (2023, files(tests).joinpath("data/20220201-rekiyoko.html")),
+        (2024, files(tests).joinpath("data/20230201-rekiyoko.html")),
+    ],
+)
+def test_statutory_holidays_naoj(year, provided_input_file):
+    with open(provided_input_file, "r", encoding="utf-8") as f:
+        data = f.read()
+    expected_output = parse_national_holidays(
+        NationalHolidayNaojParser(), year, data
+    )
+    actual_output = {
+        day.strftime("%Y%m%d"): name
+        for day, name in holiday.statutory_holidays(year)
+    }
+    assert actual_output == expected_output
+
+
+@pytest.mark.parametrize(
+    "provided_input, expected_output",
+    [
+        (
+            [
+                (date(1992, 5, 3), "憲法記念日"),
+                (date(1992, 5, 5), "こどもの日"),
+            ],
+            [(date(1992, 5, 4), "振替休日")],
+        ),
+        (
+            [
+                (date(1980, 5, 3), "憲法記念日"),
+                (date(1980, 5, 5), "こどもの日"),
+            ],
+            [],
+        ),
+        (
+            [
+                (date(2015, 5, 3), "憲法記念日"),
+                (date(2015, 5, 4), "みどりの日"),
+                (date(2015, 5, 5), "こどもの日"),
+            ],
+            [(date(2015, 5, 6), "振替休日")],
+        ),
+        (
+            [
+                (date(1972, 4, 29), "天皇誕生日"),
+                (date(1973, 4, 29), "天皇誕生日"),
+            ],
+            [(date(1973, 4, 30), "振替休日")],
+        ),
+    ],
+)
+def test_derive_holidays(provided_input, expected_output):
+    assert holiday.derive_holidays(provided_input) == expected_output
+
+
+@pytest.mark.parametrize(
+    "year, month, expected_output",
+    [(2024, 3, 20), (2024, 9, 22), (1960, 3, 20), (1960, 9, 23)],
+)
+def test_equinox_day(year, month, expected_output):
+    assert holiday.equinox_day(year, month) == expected_output
+
+
+def test_equinox_day_solar_longitude():
+    for year in range(1948, 2100):
+        for month, longitude in ((3, 0), (9, 180)):
+            guess = astro.jd_from_ordinal(date(year, month, 21).toordinal())
+            equinox = astro.jst_ordinal(astro.solar_term(longitude, guess))
+            assert date.fromordinal(equinox) == date(
+                year, month, holiday.equinox_day(year, month)
+            )
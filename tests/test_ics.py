@@ -0,0 +1,333 @@
+import io
+from datetime import date, datetime, timedelta, timezone
+from importlib.resources import files
+from zoneinfo import ZoneInfo
+
+import pytest
+
+import tests
+from planner import ics
+from planner.ics import Occurrence, Rule
+
+TOKYO = ZoneInfo("Asia/Tokyo")
+
+
+def events_file():
+    return str(files(tests).joinpath("data", "events.ics"))
+
+
+@pytest.mark.parametrize(
+    "provided_input, expected_output",
+    [
+        (({"VALUE": "DATE"}, "20240715"), date(2024, 7, 15)),
+        (({}, "20240715T090000"), datetime(2024, 7, 15, 9)),
+        (
+            ({}, "20240715T090000Z"),
+            datetime(2024, 7, 15, 9, tzinfo=timezone.utc),
+        ),
+        (
+            ({"TZID": "Asia/Tokyo"}, "20240715T090000"),
+            datetime(2024, 7, 15, 9, tzinfo=TOKYO),
+        ),
+        (
+            ({"TZID": "Tokyo Standard Time"}, "20240715T090000"),
+            datetime(2024, 7, 15, 9),
+        ),
+    ],
+)
+def test_parse_time(provided_input, expected_output):
+    assert ics.parse_time(*provided_input) == expected_output
+
+
+@pytest.mark.parametrize(
+    "provided_input, expected_output",
+    [
+        ("PT1H30M", timedelta(hours=1, minutes=30)),
+        ("P1W", timedelta(weeks=1)),
+        ("P2DT3H", timedelta(days=2, hours=3)),
+        ("-PT15M", timedelta(minutes=-15)),
+    ],
+)
+def test_parse_duration(provided_input, expected_output):
+    assert ics.parse_duration(provided_input) == expected_output
+
+
+def test_parse_rule():
+    assert ics.parse_rule(
+        "FREQ=MONTHLY;INTERVAL=2;BYDAY=-1FR,MO;UNTIL=20241231"
+    ) == Rule(
+        "MONTHLY",
+        interval=2,
+        until=date(2024, 12, 31),
+        byday=((-1, 4), (None, 0)),
+    )
+
+
+@pytest.mark.parametrize(
+    "provided_input",
+    ["FREQ=HOURLY;COUNT=3", "FREQ=MINUTELY", "FREQ=SECONDLY", "COUNT=3"],
+)
+def test_parse_rule_unsupported(provided_input):
+    with pytest.raises(ValueError):
+        ics.parse_rule(provided_input)
+
+
+def test_expand_unsupported():
+    with pytest.raises(ValueError):
+        list(
+            ics.expand(
+                Rule("HOURLY"),
+                date(2024, 7, 1),
+                date(2024, 7, 1),
+                date(2024, 7, 31),
+            )
+        )
+
+
+def test_read_events():
+    lines = io.StringIO(
+        "\r\n".join(
+            [
+                "BEGIN:VCALENDAR",
+                "BEGIN:VEVENT",
+                "UID:1",
+                "DTSTART;VALUE=DATE:20240715",
+                'SUMMARY;LANGUAGE="ja":海の日\\, 休み',
+                " です",
+                "DESCRIPTION:読み飛ばす",
+                "BEGIN:VALARM",
+                "SUMMARY:通知",
+                "END:VALARM",
+                "END:VEVENT",
+                "BEGIN:VEVENT",
+                "UID:2",
+                "DTSTART:20240716T090000",
+                "STATUS:CANCELLED",
+                "END:VEVENT",
+                "END:VCALENDAR",
+            ]
+        )
+    )
+    assert list(ics.read_events(lines)) == [
+        ics.Event(
+            "1",
+            "海の日, 休みです",
+            date(2024, 7, 15),
+            date(2024, 7, 16),
+        )
+    ]
+
+
+@pytest.mark.parametrize(
+    "provided_input, expected_output",
+    [
+        (
+            ("FREQ=DAILY;INTERVAL=10", date(2024, 1, 1)),
+            [date(2024, 7, 9), date(2024, 7, 19), date(2024, 7, 29)],
+        ),
+        (
+            ("FREQ=WEEKLY;BYDAY=MO,TH;COUNT=4", date(2024, 7, 1)),
+            [
+                date(2024, 7, 1),
+                date(2024, 7, 4),
+                date(2024, 7, 8),
+                date(2024, 7, 11),
+            ],
+        ),
+        (
+            ("FREQ=MONTHLY;BYMONTHDAY=-1", date(2024, 5, 31)),
+            [date(2024, 7, 31)],
+        ),
+        (
+            ("FREQ=MONTHLY;BYDAY=MO,TU,WE,TH,FR;BYSETPOS=1", date(2024, 1, 1)),
+            [date(2024, 7, 1)],
+        ),
+        (
+            ("FREQ=YEARLY;BYMONTH=7;BYDAY=3MO", date(2000, 7, 17)),
+            [date(2024, 7, 15)],
+        ),
+        (("FREQ=YEARLY;COUNT=2", date(2022, 7, 20)), []),
+        (
+            ("FREQ=WEEKLY;UNTIL=20240715", date(2024, 7, 1)),
+            [date(2024, 7, 1), date(2024, 7, 8), date(2024, 7, 15)],
+        ),
+    ],
+)
+def test_expand(provided_input, expected_output):
+    rule, start = provided_input
+    assert (
+        list(
+            ics.expand(
+                ics.parse_rule(rule),
+                start,
+                date(2024, 7, 1),
+                date(2024, 7, 31),
+            )
+        )
+        == expected_output
+    )
+
+
+def test_expand_time():
+    assert list(
+        ics.expand(
+            ics.parse_rule("FREQ=DAILY;UNTIL=20240702T000000"),
+            datetime(2024, 6, 30, 9),
+            date(2024, 7, 1),
+            date(2024, 7, 31),
+        )
+    ) == [datetime(2024, 7, 1, 9)]
+
+
+def test_event_index():
+    index = ics.load([events_file()], [2024])[2024]
+
+    def day(year, month, day):
+        return index.day(index_of(date(year, month, day)))
+
+    def index_of(day):
+        return day.toordinal() - date(2024, 1, 1).toordinal()
+
+    # 繰り返しの一回を変更した予定と EXDATE
+    assert day(2024, 1, 1) == [Occurrence("09:00", "定例, 朝会")]
+    assert day(2024, 1, 3) == []
+    assert day(2024, 1, 8) == [Occurrence("13:00", "定例 (午後)")]
+    # UNTIL の後は繰り返さない
+    assert day(2024, 2, 5) == []
+    # 終日の予定と開始時刻の順
+    assert day(2024, 1, 31) == [
+        Occurrence("09:00", "定例, 朝会"),
+        Occurrence("10:00", "月末締め"),
+    ]
+    assert day(2024, 5, 12) == [Occurrence("", "母の日")]
+    # 複数日の予定は日ごとに入れる
+    assert [day(2024, 8, d) for d in (12, 13, 14, 15)] == [
+        [Occurrence("", "夏休み")]
+    ] * 3 + [[]]
+    # UTC の予定は日本時間の日付に入れる
+    assert day(2024, 12, 31) == []
+
+
+def test_override_before_master():
+    events = list(ics.read_events(open(events_file(), encoding="utf-8")))
+    master, override = events[:2]
+    index = ics.EventIndex(2024)
+    index.add(override)
+    index.add(master)
+    index.add(master)
+    assert index.day(7) == [Occurrence("13:00", "定例 (午後)")]
+    assert index.day(0) == [Occurrence("09:00", "定例, 朝会")]
+
+
+def test_event_index_all_day_and_timed():
+    index = ics.EventIndex(2024)
+    index.add(
+        ics.Event(
+            "", "会議", datetime(2024, 7, 14, 22), datetime(2024, 7, 15, 2)
+        )
+    )
+    index.add(ics.Event("", "会議", date(2024, 7, 15), date(2024, 7, 16)))
+    day = date(2024, 7, 15).toordinal() - date(2024, 1, 1).toordinal()
+    assert index.day(day) == [Occurrence("", "会議")] * 2
+
+
+def test_event_index_without_uid():
+    index = ics.EventIndex(2024)
+    for summary in ("会議A", "会議B"):
+        index.add(
+            ics.Event(
+                "",
+                summary,
+                datetime(2024, 7, 15, 10),
+                datetime(2024, 7, 15, 11),
+            )
+        )
+    day = date(2024, 7, 15).toordinal() - date(2024, 1, 1).toordinal()
+    assert index.day(day) == [
+        Occurrence("10:00", "会議A"),
+        Occurrence("10:00", "会議B"),
+    ]
+    assert len(index) == 2
+
+
+def test_load_years():
+    indexes = ics.load([events_file()], [2024, 2025])
+    assert sorted(indexes) == [2024, 2025]
+    index = indexes[2025]
+    assert index.day(0) == [Occurrence("08:00", "LongLine")]
+    assert index.day(date(2025, 5, 11).timetuple().tm_yday - 1) == [
+        Occurrence("", "母の日")
+    ]
+
+
+@pytest.mark.parametrize(
+    "provided_input, expected_output",
+    [
+        ({"DTSTART": ({}, "20100101T090000")}, True),
+        ({"DTSTART": ({}, "20231231T230000")}, False),
+        (
+            {
+                "DTSTART": ({}, "20100101T090000"),
+                "RRULE": ({}, "FREQ=YEARLY"),
+            },
+            False,
+        ),
+        (
+            {
+                "DTSTART": ({}, "20100101"),
+                "DTEND": ({}, "20300101"),
+            },
+            False,
+        ),
+        ({"DTSTART": ({}, "20100101"), "DURATION": ({}, "PT1H")}, True),
+        ({"DTSTART": ({}, "20221231"), "DURATION": ({}, "P400D")}, False),
+    ],
+)
+def test_outside(provided_input, expected_output):
+    assert ics._outside(provided_input, [2024]) == expected_output
+
+
+def test_read_events_invalid():
+    def event(uid, *properties):
+        return ["BEGIN:VEVENT", "UID:" + uid, *properties, "END:VEVENT"]
+
+    lines = [
+        "BEGIN:VCALENDAR",
+        *event("a", "SUMMARY:前", "DTSTART;VALUE=DATE:20240715"),
+        *event("b", "DTSTART:20240716T090000", "RRULE:COUNT=3"),
+        *event("c", "DTSTART:20240716T090000", "RRULE:FREQ=HOURLY"),
+        *event("d", "DTSTART:20240716T090000", "DURATION:1H"),
+        *event("e", "DTSTART:20240716T090000", "RRULE:FREQ=WEEKLY;BYDAY=XX"),
+        *event("f", "DTSTART:2024-07-16"),
+        *event("g", "SUMMARY:後", "DTSTART;VALUE=DATE:20240717"),
+        "END:VCALENDAR",
+    ]
+    errors = []
+    events = list(ics.read_events(lines, [2024], errors))
+    assert [event.summary for event in events] == ["前", "後"]
+    assert [error.partition(":")[0] for error in errors] == list("bcdef")
+
+
+def test_load_invalid(tmp_path):
+    path = tmp_path / "events.ics"
+    path.write_text(
+        "\r\n".join(
+            [
+                "BEGIN:VCALENDAR",
+                "BEGIN:VEVENT",
+                "DTSTART:20240716T090000",
+                "RRULE:FREQ=SECONDLY",
+                "END:VEVENT",
+                "BEGIN:VEVENT",
+                "SUMMARY:会議",
+                "DTSTART;VALUE=DATE:20240715",
+                "END:VEVENT",
+                "END:VCALENDAR",
+            ]
+        ),
+        encoding="utf-8",
+    )
+    with pytest.warns(UserWarning, match="skipped 1 invalid events"):
+        index = ics.load([str(path)], [2024])[2024]
+    day = date(2024, 7, 15).toordinal() - date(2024, 1, 1).toordinal()
+    assert index.day(day) == [Occurrence("", "会議")]
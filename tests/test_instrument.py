@@ -0,0 +1,111 @@
+import io
+import json
+import pstats
+
+import pytest
+
+from planner import instrument, planner
+from planner.__main__ import main
+from planner.almanac import Almanac
+
+
+@pytest.fixture(autouse=True)
+def almanac():
+    Almanac.compute_rokuyo(2024)
+    Almanac.compute_national_holidays(2024)
+
+
+def test_disabled():
+    assert not instrument.enabled()
+    with instrument.span("noop") as record:
+        assert record is None
+    instrument.count("pages")
+    instrument.count_code(["BT", "0 0 m 1 1 l S"])
+
+
+def test_span():
+    with instrument.Profiler() as profiler:
+        assert instrument.enabled()
+        with instrument.span("outer"):
+            with instrument.span("inner"):
+                instrument.count("items", 3)
+    assert not instrument.enabled()
+    assert [(s["name"], s["depth"]) for s in profiler.spans] == [
+        ("outer", 0),
+        ("inner", 1),
+    ]
+    assert profiler.spans[0]["elapsed"] >= profiler.spans[1]["elapsed"]
+    assert profiler.counters == {"items": 3}
+
+
+def test_nested_profiler():
+    with instrument.Profiler():
+        with pytest.raises(RuntimeError):
+            with instrument.Profiler():
+                pass
+
+
+@pytest.mark.parametrize(
+    "provided_input, expected_output",
+    [
+        (
+            ["BT /F1 6 Tf", "0 0 m 10 0 l S", "ET", "BT /F1 6 Tf"],
+            {"text_objects": 2, "lines": 1},
+        ),
+        (["q", "Q"], {}),
+    ],
+)
+def test_count_code(provided_input, expected_output):
+    with instrument.Profiler() as profiler:
+        instrument.count_code(provided_input)
+    assert profiler.counters == expected_output
+
+
+def test_yearly_planner():
+    output = io.BytesIO()
+    with instrument.Profiler(memory=True) as profiler:
+        planner.YearlyPlanner(2024).print(output)
+    totals = profiler.totals()
+    for month in range(1, 12 + 1):
+        assert totals["month {:02d}".format(month)]["count"] == 1
+    for name in ("layout", "calendar", "create_canvas", "save"):
+        assert totals[name]["count"] == 1
+
+    counters = profiler.counters
+    assert counters["pages"] == 2
+    assert counters["text_objects"] == 12
+    assert counters["lines"] > 0
+    assert counters["output_bytes"] == len(output.getvalue())
+
+    report = profiler.report()
+    assert report["memory"]["peak"] > 0
+    assert report["memory"]["top"]
+    assert all("memory" in record for record in report["spans"])
+
+
+def test_profile_option(tmp_path):
+    report = tmp_path / "profile.json"
+    stats = tmp_path / "profile.pstats"
+    assert (
+        main(
+            [
+                "2024",
+                "-y",
+                "-t",
+                "-o",
+                str(tmp_path),
+                "--profile",
+                str(report),
+                "--profile-stats",
+                str(stats),
+            ]
+        )
+        == 0
+    )
+    profile = json.loads(report.read_text(encoding="utf-8"))
+    assert {"yearly 2024", "todo 2024", "save"} <= set(profile["totals"])
+    assert profile["counters"]["output_bytes"] == sum(
+        (tmp_path / name).stat().st_size for name in ("2024.pdf", "todo.pdf")
+    )
+    assert "memory" not in profile
+    assert pstats.Stats(str(stats)).total_calls > 0
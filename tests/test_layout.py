@@ -0,0 +1,96 @@
+import re
+
+import pytest
+from reportlab.lib.pagesizes import A3, A4, landscape
+from reportlab.lib.units import mm
+
+from planner import planner
+from planner.__main__ import main
+from planner.almanac import Almanac
+from planner.layout import GridSpec, grid_layout
+
+
+@pytest.fixture(autouse=True)
+def almanac():
+    Almanac.compute_rokuyo(2024)
+    Almanac.compute_national_holidays(2024)
+
+
+def media_boxes(data):
+    return {
+        tuple(float(value) for value in box.split())
+        for box in re.findall(rb"/MediaBox \[ ([\d. ]+) \]", data)
+    }
+
+
+def test_grid_layout():
+    layout = grid_layout(GridSpec(rows=31, cells_in_column=2))
+    width, height = landscape(A4)
+    assert (layout.width, layout.height) == pytest.approx((width, height))
+    assert list(layout.separators) == pytest.approx([width / 3, width * 2 / 3])
+
+    assert layout.cells_in_page == 6
+    assert len(layout.cell_x) == 6
+    assert layout.cell_x[0] == pytest.approx(5 * mm)
+    assert layout.cell_x[2] == pytest.approx(width / 3 + 5 * mm)
+    assert layout.cell_width == pytest.approx((width - 30 * mm) / 6)
+
+    assert layout.header_y == pytest.approx(height - 11 * mm)
+    assert len(layout.rule_y) == len(layout.label_y) == 31
+    row_height = (height - 16 * mm) / 31
+    assert layout.label_y[0] == pytest.approx(height - 8 * mm - row_height)
+    assert layout.label_y[-1] == pytest.approx(8 * mm)
+    assert layout.rule_y[-1] == pytest.approx(7 * mm)
+
+
+def test_grid_layout_rows_top():
+    layout = grid_layout(GridSpec(rows=7, rows_top=3, label_offset=22))
+    height = landscape(A4)[1]
+    row_height = (height - 19 * mm) / 7
+    assert layout.label_y[0] == pytest.approx(
+        height - 11 * mm - row_height + 22 * mm
+    )
+    assert layout.rule_y[0] == pytest.approx(
+        height - 11 * mm - row_height - 1 * mm
+    )
+
+
+def test_grid_layout_cached():
+    assert grid_layout(GridSpec(rows=7)) is grid_layout(GridSpec(rows=7))
+
+
+@pytest.mark.parametrize(
+    "provided_input, expected_output",
+    [
+        (0, (0, 0)),
+        (5, (0, 5)),
+        (6, (1, 0)),
+    ],
+)
+def test_page_and_cell(provided_input, expected_output):
+    layout = grid_layout(GridSpec(rows=31, cells_in_column=2))
+    assert layout.page_and_cell(provided_input) == expected_output
+
+
+@pytest.mark.parametrize(
+    "create",
+    [
+        lambda paper: planner.YearlyPlanner(2024, paper=paper),
+        lambda paper: planner.WeeklyPlanner(2024, paper=paper),
+        lambda paper: planner.ToDoList(paper),
+    ],
+)
+def test_paper(tmp_path, create):
+    filename = tmp_path / "planner.pdf"
+    create("A3").print(str(filename))
+    assert list(media_boxes(filename.read_bytes())) == [
+        pytest.approx((0, 0) + landscape(A3), abs=0.01)
+    ]
+
+
+def test_paper_option(tmp_path):
+    assert main(["2024", "-y", "-P", "A3", "-o", str(tmp_path)]) == 0
+    data = (tmp_path / "2024.pdf").read_bytes()
+    assert list(media_boxes(data)) == [
+        pytest.approx((0, 0) + landscape(A3), abs=0.01)
+    ]
@@ -0,0 +1,60 @@
+from datetime import date
+from importlib.resources import files
+
+import pytest
+
+import tests
+from planner import lunisolar
+from planner.almanac import Almanac
+from planner.lunisolar import LunarDate
+from planner.scrape import parse_rokuyo
+
+
+@pytest.mark.parametrize(
+    "provided_input, expected_output",
+    [
+        (date(2023, 1, 22), LunarDate(1, 1, False)),
+        (date(2023, 3, 22), LunarDate(2, 1, True)),
+        (date(2023, 4, 20), LunarDate(3, 1, False)),
+        (date(2024, 2, 10), LunarDate(1, 1, False)),
+        (date(2024, 12, 31), LunarDate(12, 1, False)),
+    ],
+)
+def test_lunar_date(provided_input, expected_output):
+    assert lunisolar.lunar_date(provided_input) == expected_output
+
+
+@pytest.mark.parametrize(
+    "year, expected_output_file",
+    [
+        (2023, files(tests).joinpath("data/rokuyo-2023.txt")),
+        (2024, files(tests).joinpath("data/rokuyo-2024.txt")),
+    ],
+)
+def test_rokuyo_of_year(year, expected_output_file):
+    expected_output = Almanac.read_definitions(expected_output_file)
+    assert lunisolar.rokuyo_of_year(year) == expected_output
+
+
+@pytest.mark.parametrize(
+    "year, provided_input_file",
+    [
+        (2023, files(tests).joinpath("data/rokuyo_2023.html")),
+        (2024, files(tests).joinpath("data/rokuyo_2024.html")),
+    ],
+)
+def test_rokuyo_of_year_html(year, provided_input_file):
+    with open(provided_input_file, "r", encoding="utf-8") as f:
+        expected_output = parse_rokuyo(f.read())
+    assert lunisolar.rokuyo_of_year(year) == expected_output
+
+
+def test_rokuyo_range():
+    rokuyo = lunisolar.rokuyo_range(date(2023, 12, 30), date(2024, 1, 3))
+    assert rokuyo == ["仏滅", "大安", "赤口", "先勝"]
+
+
+def test_compute_rokuyo():
+    Almanac.compute_rokuyo(2023, 2024)
+    assert len(Almanac.rokuyo) == 365 + 366
+    assert Almanac.rokuyo["20240101"] == "赤口"
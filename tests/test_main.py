@@ -0,0 +1,125 @@
+import subprocess
+import sys
+import tomllib
+from importlib.resources import files
+
+import pytest
+
+import planner
+import tests
+from planner.__main__ import main
+
+
+def test_version(capsys):
+    with open("pyproject.toml", mode="rb") as f:
+        version = tomllib.load(f)["tool"]["poetry"]["version"]
+    assert planner.__version__ == version
+
+    with pytest.raises(SystemExit):
+        main(["--version"])
+    assert capsys.readouterr().out == "planner {}\n".format(version)
+
+
+def assert_lazy(lines):
+    code = "\n".join(
+        [
+            "import sys",
+            *lines,
+            "heavy = ('reportlab', 'bs4', 'yaml', 'asyncio', 'planner.font',",
+            "         'planner.layout', 'typing')",
+            "print(' '.join(sorted(m for m in heavy if m in sys.modules)))",
+        ]
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    assert result.stdout.splitlines()[-1] == ""
+
+
+@pytest.mark.parametrize(
+    "provided_input",
+    [
+        ["--version"],
+        ["--help"],
+        ["fetch", "--help"],
+        ["compile-almanac", "--help"],
+        ["serve", "--help"],
+        ["analyze", "--help"],
+    ],
+)
+def test_lazy_imports(provided_input):
+    # --help や --version では重いモジュールを読み込まない
+    assert_lazy(
+        [
+            "from planner.__main__ import main",
+            "try:",
+            "    main({!r})".format(provided_input),
+            "except SystemExit:",
+            "    pass",
+        ]
+    )
+
+
+def test_lazy_imports_years():
+    # 年の引数の変換では出力のためのモジュールを読み込まない
+    assert_lazy(
+        [
+            "from planner.__main__ import create_fetch_parser",
+            "create_fetch_parser().parse_args(['2020-2021'])",
+        ]
+    )
+
+
+def test_month_jobs_option(tmp_path):
+    outputs = []
+    for month_jobs in ("1", "4"):
+        directory = tmp_path / month_jobs
+        assert (
+            main(["2024", "-y", "-J", month_jobs, "-o", str(directory)]) == 0
+        )
+        outputs.append((directory / "2024.pdf").read_bytes())
+    assert outputs[0] == outputs[1]
+
+
+@pytest.mark.parametrize(
+    "provided_input",
+    [
+        ["--pages", "13"],
+        ["--from", "2024-07-15", "--to", "2024-07-21"],
+    ],
+)
+def test_pages_option(tmp_path, provided_input):
+    assert main(["2024", "-w", "-o", str(tmp_path)] + provided_input) == 0
+    data = (tmp_path / "2024-weekly-pages.pdf").read_bytes()
+    assert data.count(b"/Type /Page\n") == 1
+    assert not (tmp_path / "2024-weekly.pdf").exists()
+
+
+def test_dates_option_years(tmp_path):
+    dates = ["--from", "2024-07-15", "--to", "2024-07-16"]
+    assert main(["2024-2025", "-w", "-o", str(tmp_path)] + dates) == 0
+    assert (tmp_path / "2024-weekly-pages.pdf").exists()
+    assert not (tmp_path / "2025-weekly-pages.pdf").exists()
+    with pytest.raises(SystemExit):
+        main(["2025", "-w", "-o", str(tmp_path)] + dates)
+
+
+def test_events_option(tmp_path):
+    events = str(files(tests).joinpath("data", "events.ics"))
+    assert main(["2024", "-y", "-o", str(tmp_path)]) == 0
+    without_events = (tmp_path / "2024.pdf").read_bytes()
+    assert main(["2024", "-y", "-e", events, "-o", str(tmp_path)]) == 0
+    assert (tmp_path / "2024.pdf").read_bytes() != without_events
+    assert main(["2024", "-y", "-e", "missing.ics", "-o", str(tmp_path)]) == 1
+
+
+def test_tasks_option(tmp_path):
+    tasks = str(files(tests).joinpath("data", "tasks.csv"))
+    assert main(["2024", "-t", "-o", str(tmp_path)]) == 0
+    blank = (tmp_path / "todo.pdf").read_bytes()
+    assert main(["2024", "-T", tasks, "-o", str(tmp_path)]) == 0
+    assert (tmp_path / "todo.pdf").read_bytes() != blank
+    assert main(["2024", "-T", "missing.csv", "-o", str(tmp_path)]) == 1
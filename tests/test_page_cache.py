@@ -0,0 +1,102 @@
+from datetime import date
+
+import pytest
+
+from planner import ics, planner
+from planner.__main__ import main
+from planner.almanac import Almanac
+from planner.page_cache import PageCache
+
+
+@pytest.fixture(autouse=True)
+def almanac():
+    Almanac.compute_rokuyo(2024)
+    Almanac.compute_national_holidays(2024)
+
+
+def build(create, filename, cache=None):
+    create(2024, cache).print(str(filename))
+    return filename.read_bytes()
+
+
+@pytest.mark.parametrize(
+    "create", [planner.YearlyPlanner, planner.WeeklyPlanner]
+)
+def test_deterministic(tmp_path, create):
+    filename = tmp_path / "planner.pdf"
+    assert build(create, filename) == build(create, filename)
+
+
+@pytest.mark.parametrize(
+    "create", [planner.YearlyPlanner, planner.WeeklyPlanner]
+)
+def test_assemble_from_cache(tmp_path, create):
+    filename = tmp_path / "planner.pdf"
+    expected = build(create, filename)
+
+    cache = PageCache(tmp_path / "pages")
+    assert build(create, filename, cache) == expected
+    assert (cache.hits, cache.misses) == (0, 12)
+
+    assert build(create, filename, cache) == expected
+    assert (cache.hits, cache.misses) == (12, 12)
+
+
+@pytest.mark.parametrize(
+    "create", [planner.YearlyPlanner, planner.WeeklyPlanner]
+)
+def test_rebuild_changed_month(tmp_path, monkeypatch, create):
+    filename = tmp_path / "planner.pdf"
+    cache = PageCache(tmp_path / "pages")
+    build(create, filename, cache)
+
+    monkeypatch.setitem(Almanac.holiday, "20240605", "元日")
+    expected = build(create, filename)
+
+    cache.hits = cache.misses = 0
+    assert build(create, filename, cache) == expected
+    assert (cache.hits, cache.misses) == (11, 1)
+
+
+@pytest.mark.parametrize(
+    "create", [planner.YearlyPlanner, planner.WeeklyPlanner]
+)
+def test_rebuild_month_with_new_glyphs(tmp_path, create):
+    def build_with_events(summaries, cache=None):
+        events = ics.EventIndex(2024)
+        for uid, (day, summary) in enumerate(summaries):
+            events.add(ics.Event(str(uid), summary, day, day))
+        create(2024, cache, events=events).print(str(filename))
+        return filename.read_bytes()
+
+    filename = tmp_path / "planner.pdf"
+    cache = PageCache(tmp_path / "pages")
+    summaries = [(date(2024, 1, 10), "会議"), (date(2024, 12, 10), "会議")]
+    build_with_events(summaries, cache)
+
+    # 6 月の予定にだけ新しい文字が増えても, ほかの月は描き直さない
+    summaries.append((date(2024, 6, 10), "鯨"))
+    expected = build_with_events(summaries)
+    cache.hits = cache.misses = 0
+    assert build_with_events(summaries, cache) == expected
+    assert (cache.hits, cache.misses) == (11, 1)
+
+
+def test_broken_cache(tmp_path):
+    filename = tmp_path / "planner.pdf"
+    expected = build(planner.YearlyPlanner, filename)
+
+    cache = PageCache(tmp_path / "pages")
+    build(planner.YearlyPlanner, filename, cache)
+    for path in cache.directory.iterdir():
+        path.write_text("{", encoding="utf-8")
+
+    assert build(planner.YearlyPlanner, filename, cache) == expected
+    assert cache.misses == 24
+
+
+def test_incremental_option(tmp_path, monkeypatch):
+    monkeypatch.setenv("PLANNER_CACHE_DIR", str(tmp_path / "cache"))
+    assert main(["2024", "-y", "-i", "-o", str(tmp_path)]) == 0
+    assert (tmp_path / "2024.pdf").exists()
+    assert len(list((tmp_path / "cache" / "pages").iterdir())) == 12
@@ -0,0 +1,92 @@
+from datetime import date
+
+import pytest
+
+from planner import page_plan
+from planner.layout import GridSpec, grid_layout
+from planner.year_calendar import YearCalendar
+
+
+@pytest.fixture
+def calendar():
+    return YearCalendar(2024, {}, {}, {})
+
+
+def test_weekly_pages(calendar):
+    layout = grid_layout(GridSpec(rows=7))
+    pages = list(page_plan.weekly_pages(calendar, layout, 7))
+
+    # どの月も 5 週, 一ページに 3 週なので, 月ごとに 2 ページ
+    assert len(pages) == 24
+    assert [page.number for page in pages] == list(range(1, 24 + 1))
+    assert [len(page.cells) for page in pages[:2]] == [3, 2]
+    assert pages[0].cells[0] == page_plan.Cell(0, 1, range(0, 7))
+    assert pages[1].cells[-1] == page_plan.Cell(1, 1, range(28, 31))
+    assert [day for page in pages for day in page.days] == list(
+        range(len(calendar))
+    )
+
+
+def test_yearly_pages(calendar):
+    layout = grid_layout(GridSpec(rows=31, cells_in_column=2))
+    pages = list(page_plan.yearly_pages(calendar, layout))
+
+    assert [page.number for page in pages] == [1, 2]
+    assert [cell.month for cell in pages[1].cells] == list(range(7, 12 + 1))
+    assert pages[1].days == range(calendar.index(date(2024, 7, 1)), 366)
+
+
+@pytest.mark.parametrize(
+    "provided_input, expected_output",
+    [
+        ({"numbers": {13}}, [13]),
+        ({"numbers": {2, 5}}, [2, 5]),
+        ({"start": date(2024, 7, 15), "end": date(2024, 7, 15)}, [13]),
+        ({"start": date(2024, 7, 20), "end": date(2024, 8, 1)}, [13, 14, 15]),
+        ({"numbers": {13, 14}, "start": date(2024, 7, 22)}, [14]),
+        ({"numbers": {99}}, []),
+    ],
+)
+def test_select(calendar, provided_input, expected_output):
+    layout = grid_layout(GridSpec(rows=7))
+    start = provided_input.get("start")
+    end = provided_input.get("end")
+    pages = page_plan.select(
+        page_plan.weekly_pages(calendar, layout, 7),
+        provided_input.get("numbers"),
+        None if start is None else calendar.index(start),
+        None if end is None else calendar.index(end),
+    )
+    assert [page.number for page in pages] == expected_output
+
+
+def test_select_is_lazy(calendar):
+    layout = grid_layout(GridSpec(rows=7))
+    planned = []
+
+    def pages():
+        for page in page_plan.weekly_pages(calendar, layout, 7):
+            planned.append(page.number)
+            yield page
+
+    assert [page.number for page in page_plan.select(pages(), {3})] == [3]
+    # 選んだページの次のページまでしか割り付けない
+    assert planned == [1, 2, 3, 4]
+
+
+@pytest.mark.parametrize(
+    "provided_input, expected_output",
+    [
+        ("3", {3}),
+        ("10-12", {10, 11, 12}),
+        ("1,5-6", {1, 5, 6}),
+    ],
+)
+def test_parse_pages(provided_input, expected_output):
+    assert page_plan.parse_pages(provided_input) == expected_output
+
+
+@pytest.mark.parametrize("provided_input", ["0", "3-2", "a", ""])
+def test_parse_pages_invalid(provided_input):
+    with pytest.raises(ValueError):
+        page_plan.parse_pages(provided_input)
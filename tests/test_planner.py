@@ -0,0 +1,304 @@
+import io
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from importlib.resources import files
+
+import pytest
+
+import tests
+from planner import ics, planner
+from planner.almanac import Almanac
+from planner.page_cache import PageCache
+from planner.tasks import Task
+
+
+@pytest.fixture(autouse=True)
+def almanac():
+    Almanac.compute_rokuyo(2024)
+    Almanac.compute_national_holidays(2024)
+
+
+@pytest.mark.parametrize(
+    "create, forms",
+    [
+        (planner.ToDoList, {"todo-page"}),
+        (
+            lambda: planner.YearlyPlanner(2024),
+            {
+                "separators",
+                "yearly-rules-29",
+                "yearly-rules-30",
+                "yearly-rules-31",
+            },
+        ),
+        (
+            lambda: planner.WeeklyPlanner(2024),
+            {"separators"}
+            | {"weekly-rules-{}".format(rows) for rows in (1, 2, 3, 7)},
+        ),
+    ],
+)
+def test_static_forms(tmp_path, create, forms):
+    filename = tmp_path / "planner.pdf"
+    create().print(str(filename))
+    data = filename.read_bytes()
+
+    defined = set(re.findall(rb"/FormXob\.([\w-]+) \d+ 0 R", data))
+    assert defined == {form.encode() for form in forms}
+    assert data.count(b"/Subtype /Form") == len(forms)
+
+
+def test_static_forms_disabled(tmp_path, monkeypatch):
+    monkeypatch.setattr(planner.Planner, "USE_FORMS", False)
+    filename = tmp_path / "todo.pdf"
+    planner.ToDoList().print(str(filename))
+    assert b"/Subtype /Form" not in filename.read_bytes()
+
+
+@pytest.mark.parametrize(
+    "create", [planner.YearlyPlanner, planner.WeeklyPlanner]
+)
+def test_month_workers(tmp_path, create):
+    filename = tmp_path / "planner.pdf"
+    create(2024).print(str(filename))
+    expected = filename.read_bytes()
+
+    for workers in (2, 5):
+        create(2024, workers=workers).print(str(filename))
+        data = filename.read_bytes()
+        assert data == expected
+        # フォントのサブセットとフォームは一度だけ埋め込む
+        assert data.count(b"/FontFile2") == 2
+        assert data.count(b"/Subtype /Form") == len(
+            set(re.findall(rb"/FormXob\.([\w-]+) \d+ 0 R", data))
+        )
+
+
+def test_month_workers_with_cache(tmp_path):
+    filename = tmp_path / "planner.pdf"
+    planner.WeeklyPlanner(2024).print(str(filename))
+    expected = filename.read_bytes()
+
+    cache = PageCache(tmp_path / "pages")
+    planner.WeeklyPlanner(2024, cache, workers=3).print(str(filename))
+    assert (cache.hits, cache.misses) == (0, 12)
+    assert filename.read_bytes() == expected
+
+    planner.WeeklyPlanner(2024, cache, workers=3).print(str(filename))
+    assert (cache.hits, cache.misses) == (12, 12)
+    assert filename.read_bytes() == expected
+
+
+@pytest.mark.parametrize(
+    "create", [planner.YearlyPlanner, planner.WeeklyPlanner]
+)
+def test_print_pages(tmp_path, create):
+    filename = tmp_path / "planner.pdf"
+    document = create(2024)
+    document.print(str(filename))
+    expected = filename.read_bytes()
+
+    # すべてのページを選べば, 月ごとに描いた場合と同じになる
+    document.print_pages(list(document.pages()), str(filename))
+    assert filename.read_bytes() == expected
+
+    pages = document.select_pages(
+        start=date(2024, 7, 15), end=date(2024, 7, 15)
+    )
+    assert len(pages) == 1
+    document.print_pages(pages, str(filename))
+    data = filename.read_bytes()
+    assert data.count(b"/Type /Page\n") == 1
+    assert len(data) < len(expected)
+
+
+@pytest.mark.parametrize(
+    "provided_input, expected_output",
+    [(0, 1), (1, 1), (93, 1), (94, 2), (200, 3)],
+)
+def test_todo_tasks_pages(provided_input, expected_output):
+    read = []
+
+    def source():
+        for number in range(provided_input):
+            read.append(number)
+            yield Task("task {}".format(number))
+
+    output = io.BytesIO()
+    planner.ToDoList(tasks=source()).print(output)
+    assert output.getvalue().count(b"/Type /Page\n") == expected_output
+    assert len(read) == provided_input
+
+
+def test_todo_tasks_stream():
+    document = planner.ToDoList()
+    per_page = len(document.layout.label_y) * document.layout.cells_in_page
+    pages = []
+
+    def source():
+        # タスクは一ページ分ずつ読む
+        for number in range(per_page * 3):
+            if number % per_page == 0:
+                pages.append(number)
+            yield Task("task {}".format(number))
+
+    planner.ToDoList(tasks=source()).print(io.BytesIO())
+    assert pages == [0, per_page, per_page * 2]
+
+
+def test_calendar_planner():
+    with pytest.raises(TypeError):
+        planner.CalendarPlanner(2024)
+    assert not hasattr(planner.ToDoList(), "select_pages")
+
+
+def test_task_rows():
+    document = planner.ToDoList()
+    layout = document.layout
+    rows = document._task_rows(
+        [
+            Task("short", date(2024, 7, 15), "1"),
+            Task("長い" * 100),
+        ]
+        + [Task("task")] * 29
+        + [Task("next cell")]
+    )
+    right = layout.cell_x[0] + layout.cell_width
+    assert rows[0] == (layout.cell_x[0], layout.label_y[0], "1")
+    assert rows[1][1:] == (layout.label_y[0], "7/15")
+    assert rows[1][0] < right
+    assert rows[2][1:] == (layout.label_y[0], "short")
+    title = rows[3][2]
+    assert title.endswith("…") and len(title) < 200
+    # 31 行を超えたタスクは次の欄に書く
+    offset = rows[3][0] - layout.cell_x[0]
+    assert rows[-1][1:] == (layout.label_y[0], "next cell")
+    assert rows[-1][0] == pytest.approx(layout.cell_x[1] + offset)
+
+
+def test_almanac_instance(tmp_path):
+    filename = tmp_path / "planner.pdf"
+    planner.YearlyPlanner(2024).print(str(filename))
+    expected = filename.read_bytes()
+
+    # クラスに読み込んだ暦注によらない
+    Almanac.compute_rokuyo(2030)
+    Almanac.compute_national_holidays(2030)
+    almanac = Almanac.compute(2024)
+    planner.YearlyPlanner(2024, almanac=almanac).print(str(filename))
+    assert filename.read_bytes() == expected
+
+    with pytest.raises(ValueError):
+        planner.YearlyPlanner(2025, almanac=almanac)
+
+
+@pytest.mark.parametrize(
+    "create", [planner.YearlyPlanner, planner.WeeklyPlanner]
+)
+def test_events(tmp_path, create):
+    events = ics.load(
+        [str(files(tests).joinpath("data", "events.ics"))], [2024]
+    )
+    filename = tmp_path / "planner.pdf"
+    create(2024).print(str(filename))
+    without_events = filename.read_bytes()
+
+    document = create(2024, events=events[2024])
+    document.print(str(filename))
+    expected = filename.read_bytes()
+    assert expected != without_events
+    index = document.calendar.index(date(2024, 1, 31))
+    assert document._event_lines(index)[0][2].startswith("09:00 定例, 朝会")
+
+    # 予定の文字の符号も固定するため, 月を並列に描いても同じになる
+    create(2024, workers=3, events=events[2024]).print(str(filename))
+    assert filename.read_bytes() == expected
+
+    with pytest.raises(ValueError):
+        create(2025, events=events[2024])
+
+
+@pytest.mark.parametrize(
+    "provided_input, expected_output",
+    [
+        (2, [(0, -6, "09:00 a"), (0, -12, "10:00 b")]),
+        (
+            12,
+            [(0, -6, "09:00 a")]
+            + [(0, -6 * (n + 1), "10:00 b") for n in range(1, 9)]
+            + [(0, -60, "+3")],
+        ),
+    ],
+)
+def test_event_lines(provided_input, expected_output):
+    events = ics.EventIndex(2024)
+    for n in range(provided_input):
+        events.add(
+            ics.Event(
+                str(n),
+                "a" if n == 0 else "b",
+                datetime(2024, 7, 15, 9 if n == 0 else 10),
+                datetime(2024, 7, 15, 11),
+            )
+        )
+    document = planner.WeeklyPlanner(2024, events=events)
+    lines = document._event_lines(document.calendar.index(date(2024, 7, 15)))
+    assert lines == expected_output
+
+
+def test_render_in_threads():
+    almanac = Almanac.compute(2024, 2025)
+
+    def render(task):
+        create, year = task
+        output = io.BytesIO()
+        create(year, almanac=almanac).print(output)
+        return output.getvalue()
+
+    tasks = [
+        (create, year)
+        for create in (planner.YearlyPlanner, planner.WeeklyPlanner)
+        for year in (2024, 2025)
+    ]
+    expected = [render(task) for task in tasks]
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        assert list(executor.map(render, tasks * 3)) == expected * 3
+
+
+@pytest.mark.parametrize(
+    "provided_input, expected_output",
+    [
+        (1, (" 8(月) 先勝 スポーツの日", 6)),
+        (2, (" 8(月) 先勝 スポーツの日スポーツの日", 4.5)),
+        (4, (" 8(月) 先勝 スポーツの日スポーツの日スポ…", 4)),
+    ],
+)
+def test_fitted_label(monkeypatch, provided_input, expected_output):
+    document = planner.YearlyPlanner(2024, paper="A5")
+    label = " 8(月) 先勝 " + "スポーツの日" * provided_input
+    monkeypatch.setattr(document, "_day_label", lambda calendar, index: label)
+    monkeypatch.setattr(planner.Planner, "PAGE_COMPRESSION", 0)
+    output = io.BytesIO()
+    document.print(output)
+    assert document._fitted_label(0) == expected_output
+    size = "{:g}".format(expected_output[1]).encode()
+    assert b" " + size + b" Tf" in output.getvalue()
+
+
+@pytest.mark.parametrize(
+    "provided_input, expected_output",
+    [
+        (date(2024, 2, 3), " 3(土) 大安 節分"),
+        (date(2024, 2, 4), " 4(日) 赤口 立春"),
+        (date(2024, 3, 20), "20(水) 赤口 春分の日"),
+        (date(2024, 5, 2), " 2(木) 友引 "),
+    ],
+)
+def test_day_label(provided_input, expected_output):
+    document = planner.YearlyPlanner(2024, almanac=Almanac.compute(2024))
+    calendar = document.calendar
+    assert (
+        document._day_label(calendar, calendar.index(provided_input))
+        == expected_output
+    )
@@ -0,0 +1,63 @@
+import pytest
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+from planner import font, render
+
+
+@pytest.fixture(autouse=True)
+def fonts():
+    font.register_fonts()
+
+
+@pytest.mark.parametrize(
+    "provided_input, expected_output",
+    [
+        (("予定", 20), "予定"),
+        (("長い予定の名前", 20), "長い予…"),
+        (("長い予定の名前", 2), ""),
+    ],
+)
+def test_truncate(provided_input, expected_output):
+    text, width = provided_input
+    assert render.truncate(text, width, "mplus-r", 5) == expected_output
+
+
+@pytest.mark.parametrize(
+    "provided_input, expected_output",
+    [
+        ((["09:00 会議", "昼食"], 100), "09:00 会議  昼食"),
+        ((["09:00 会議", "10:00 打ち合わせ", "昼食"], 60), "09:00 会議  +2"),
+        ((["長い予定の名前", "昼食"], 30), "長い予…  +1"),
+    ],
+)
+def test_join_fitting(provided_input, expected_output):
+    items, width = provided_input
+    text = render.join_fitting(items, width, "mplus-r", 5)
+    assert text == expected_output
+    assert stringWidth(text, "mplus-r", 5) <= width
+
+
+def test_text_width_cached():
+    render.text_width.cache_clear()
+    for _ in range(3):
+        width = render.text_width("振替休日", "mplus-r", 6)
+    assert width == stringWidth("振替休日", "mplus-r", 6)
+    info = render.text_width.cache_info()
+    assert (info.hits, info.misses) == (2, 1)
+
+
+@pytest.mark.parametrize(
+    "provided_input, expected_output",
+    [
+        (60, ("スポーツの日", 6)),
+        (36, ("スポーツの日", 6)),
+        (30, ("スポーツの日", 5)),
+        (28, ("スポーツの日", 4.5)),
+        (27, ("スポーツの日", 4)),
+        (20, ("スポーツ…", 4)),
+    ],
+)
+def test_fit(provided_input, expected_output):
+    text, size = render.fit("スポーツの日", provided_input, "mplus-r", 6, 4)
+    assert (text, size) == expected_output
+    assert stringWidth(text, "mplus-r", size) <= provided_input
@@ -6,8 +6,11 @@ import tests
 from planner.scrape import (
     NationalHolidayCaoParser,
     NationalHolidayNaojParser,
+    extract_national_holidays,
+    extract_rokuyo,
     parse_national_holidays,
     parse_rokuyo,
+    parse_rokuyo_soup,
 )
 
 
@@ -60,6 +63,62 @@ def test_parse_rokuyo_html(provided_input_file, expected_output_file):
     assert actual_output == expected_output
 
 
+@pytest.mark.parametrize(
+    "provided_input_file",
+    [
+        files(tests).joinpath("data/rokuyo_2023.html"),
+        files(tests).joinpath("data/rokuyo_2024.html"),
+    ],
+)
+def test_extract_rokuyo_html(provided_input_file):
+    with open(provided_input_file, "r", encoding="utf-8") as f:
+        provided_input = f.read()
+
+    actual_output = extract_rokuyo(provided_input)
+    assert actual_output is not None
+    assert actual_output == parse_rokuyo_soup(provided_input)
+
+
+@pytest.mark.parametrize(
+    "provided_input, expected_output",
+    [
+        (
+            # 入れ子のタグ
+            """
+            <div class="clearfix grpelem" data-sizePolicy="fixed">
+                <p><span>2023年1月1日(日)</span></p>
+            </div>
+            <div class="clearfix grpelem" data-sizePolicy="fixed">
+                <p><span>先負</span></p>
+            </div>""",
+            {"20230101": "先負"},
+        ),
+        (
+            # 入れ子の div
+            """
+            <div class="clearfix grpelem" data-sizePolicy="fixed">
+                <div class="row"><p>2023年1月1日(日)</p></div>
+            </div>
+            <div class="clearfix grpelem" data-sizePolicy="fixed">
+                <p>先負</p>
+            </div>""",
+            {"20230101": "先負"},
+        ),
+        (
+            # 対象の div が 1 つしかない
+            """
+            <div class="clearfix grpelem" data-sizePolicy="fixed">
+                <p>2023年1月1日(日)</p>
+            </div>""",
+            None,
+        ),
+    ],
+)
+def test_parse_rokuyo_fallback(provided_input, expected_output):
+    assert extract_rokuyo(provided_input) is None
+    assert parse_rokuyo(provided_input) == expected_output
+
+
 @pytest.mark.parametrize(
     "provided_input, expected_output",
     [
@@ -88,6 +147,53 @@ def test_parse_national_holidays(provided_input, expected_output):
     assert actual_output == expected_output
 
 
+@pytest.mark.parametrize(
+    "provided_input, expected_output",
+    [
+        (
+            # 入れ子のタグ
+            (
+                2009,
+                """
+                <table class="table--default">
+                <tr><td><a href="#">敬老の日</a></td><td>9月21日</td></tr>
+                </table>""",
+            ),
+            {"20090921": "敬老の日"},
+        ),
+        (
+            # セルの中の改行
+            (
+                2009,
+                """
+                <table class="table--default">
+                <tr><td>敬老の日</td><td>9月<br>21日</td></tr>
+                </table>""",
+            ),
+            {"20090921": "敬老の日"},
+        ),
+        (
+            # tbody の中の行は対象外
+            (
+                2009,
+                """
+                <table class="table--default"><tbody>
+                <tr><td>敬老の日</td><td>9月21日</td></tr>
+                </tbody></table>""",
+            ),
+            None,
+        ),
+    ],
+)
+def test_parse_national_holidays_fallback(provided_input, expected_output):
+    year = provided_input[0]
+    data = provided_input[1]
+    assert extract_national_holidays(year, data) is None
+    parser = NationalHolidayNaojParser()
+    actual_output = parse_national_holidays(parser, year, data)
+    assert actual_output == expected_output
+
+
 @pytest.mark.parametrize(
     "provided_input, expected_output",
     [
@@ -143,6 +249,8 @@ def test_parse_national_holidays_html(provided_input, expected_output):
     parser = NationalHolidayNaojParser()
     actual_output = parse_national_holidays(parser, year, data)
     assert actual_output == expected_output
+    assert extract_national_holidays(year, data) == expected_output
+    assert parser.parse_soup(year, data) == expected_output
 
 
 @pytest.mark.parametrize(
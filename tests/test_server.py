@@ -0,0 +1,163 @@
+import http.client
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from planner import planner, server
+from planner.almanac import Almanac
+
+
+@pytest.fixture
+def service():
+    return server.RenderService()
+
+
+@pytest.fixture
+def address(service):
+    httpd = server.create_server(service, port=0)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd.server_address[:2]
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def get(address, path):
+    connection = http.client.HTTPConnection(*address, timeout=30)
+    try:
+        connection.request("GET", path)
+        response = connection.getresponse()
+        body = response.read()
+        return response.status, response.getheader("Content-Type"), body
+    finally:
+        connection.close()
+
+
+@pytest.mark.parametrize(
+    "provided_input, expected_output",
+    [
+        ("/yearly/2024", ("yearly", 2024, None)),
+        ("/weekly/2024.pdf?months=3,1", ("weekly", 2024, [1, 3])),
+        ("/weekly/2024?months=2&months=2", ("weekly", 2024, [2])),
+        ("/todo", ("todo", None, None)),
+    ],
+)
+def test_parse_request(provided_input, expected_output):
+    assert server.parse_request(provided_input) == expected_output
+
+
+@pytest.mark.parametrize(
+    "provided_input, expected_output",
+    [
+        ("/", 404),
+        ("/yearly/2024/1", 404),
+        ("/yearly/next", 400),
+        ("/weekly/2024?months=13", 400),
+        ("/weekly/2024?months=", 400),
+    ],
+)
+def test_parse_request_error(provided_input, expected_output):
+    with pytest.raises(server.RequestError) as e:
+        server.parse_request(provided_input)
+    assert e.value.status == expected_output
+
+
+def test_pdf_cache():
+    cache = server.PdfCache(max_bytes=10)
+    cache.put("a", b"1234")
+    cache.put("b", b"1234")
+    assert cache.get("a") == b"1234"
+    cache.put("c", b"1234")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1234"
+    assert cache.summary() == {
+        "entries": 2,
+        "bytes": 8,
+        "max_bytes": 10,
+        "evictions": 1,
+    }
+
+    cache.put("d", b"12345678901")
+    assert cache.get("d") is None
+
+
+def test_latency_recorder():
+    latency = server.LatencyRecorder()
+    assert latency.summary() == {"count": 0, "p50_ms": None, "p99_ms": None}
+    for milliseconds in range(1, 101):
+        latency.add(milliseconds / 1000)
+    assert latency.summary() == {"count": 100, "p50_ms": 50, "p99_ms": 99}
+
+
+def test_render(address, service):
+    status, content_type, body = get(address, "/weekly/2024?months=1")
+    assert (status, content_type) == (200, "application/pdf")
+    assert body.startswith(b"%PDF-")
+
+    assert get(address, "/weekly/2024?months=1")[2] == body
+    assert get(address, "/weekly/2024?months=2")[2] != body
+
+    status, content_type, body = get(address, "/stats")
+    assert (status, content_type) == (200, "application/json")
+    summary = json.loads(body)
+    assert summary["requests"] == 3
+    assert summary["rendered"] == 2
+    assert summary["cache_hits"] == 1
+    assert summary["cache"]["entries"] == 2
+    assert summary["latency"]["count"] == 3
+    assert summary["latency"]["p50_ms"] <= summary["latency"]["p99_ms"]
+
+
+def test_render_same_as_print(tmp_path, service):
+    pdf = service.render("yearly", 2024)
+    filename = tmp_path / "2024.pdf"
+    planner.YearlyPlanner(2024, almanac=Almanac.compute(2024)).print(
+        str(filename)
+    )
+    assert pdf == filename.read_bytes()
+
+
+def test_deduplicate(service, monkeypatch):
+    print_months = planner.WeeklyPlanner.print_months
+
+    def slow_print_months(self, months, filename):
+        time.sleep(0.2)
+        print_months(self, months, filename)
+
+    monkeypatch.setattr(
+        planner.WeeklyPlanner, "print_months", slow_print_months
+    )
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        pdfs = list(
+            executor.map(
+                lambda _: service.render("weekly", 2024, [1]), range(4)
+            )
+        )
+    assert all(pdf == pdfs[0] for pdf in pdfs)
+    assert service.statistics["rendered"] == 1
+    assert service.statistics["deduplicated"] == 3
+
+
+@pytest.mark.parametrize(
+    "provided_input, expected_output",
+    [
+        ("/monthly/2024", 404),
+        ("/yearly", 400),
+        ("/todo?months=1", 400),
+    ],
+)
+def test_request_error(address, provided_input, expected_output):
+    status, content_type, _ = get(address, provided_input)
+    assert status == expected_output
+    assert content_type == "text/plain; charset=utf-8"
+
+
+def test_render_error(tmp_path):
+    service = server.RenderService(rokuyo=str(tmp_path / "missing-{year}.txt"))
+    with pytest.raises(FileNotFoundError):
+        service.render("yearly", 2024)
+    assert service.statistics["errors"] == 1
+    assert service.summary()["cache"]["entries"] == 0
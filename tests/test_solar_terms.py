@@ -0,0 +1,61 @@
+import time
+
+import pytest
+
+from planner import solar_terms
+
+
+@pytest.mark.parametrize(
+    "provided_input, expected_output",
+    [
+        # 国立天文台 令和6年 (2024) 暦要項
+        ("20240106", "小寒"),
+        ("20240204", "立春"),
+        ("20240320", "春分"),
+        ("20240505", "立夏"),
+        ("20240621", "夏至"),
+        ("20240807", "立秋"),
+        ("20240922", "秋分"),
+        ("20241107", "立冬"),
+        ("20241221", "冬至"),
+    ],
+)
+def test_solar_terms_of_year(provided_input, expected_output):
+    terms = solar_terms.solar_terms_of_year(2024)
+    assert len(terms) == 24
+    assert terms[provided_input] == expected_output
+
+
+def test_zassetsu_of_year():
+    assert solar_terms.zassetsu_of_year(2024) == {
+        "20240118": "土用入り",
+        "20240203": "節分",
+        "20240317": "彼岸入り",
+        "20240323": "彼岸明け",
+        "20240416": "土用入り",
+        "20240501": "八十八夜",
+        "20240610": "入梅",
+        "20240701": "半夏生",
+        "20240719": "土用入り",
+        "20240831": "二百十日",
+        "20240910": "二百二十日",
+        "20240919": "彼岸入り",
+        "20240925": "彼岸明け",
+        "20241020": "土用入り",
+    }
+
+
+def test_seasons_of_year():
+    seasons = solar_terms.seasons_of_year(2024)
+    assert len(seasons) == 24 + 14
+    assert seasons["20240203"] == "節分"
+    assert seasons["20240204"] == "立春"
+
+
+def test_seasons_of_century():
+    solar_terms._solar_terms_of_year.cache_clear()
+    solar_terms._zassetsu_of_year.cache_clear()
+    start = time.perf_counter()
+    for year in range(2000, 2100):
+        solar_terms.seasons_of_year(year)
+    assert time.perf_counter() - start < 1
@@ -0,0 +1,52 @@
+from datetime import date
+from importlib.resources import files
+
+import pytest
+
+import tests
+from planner import tasks
+from planner.tasks import Task
+
+
+def test_read_csv():
+    filename = str(files(tests).joinpath("data", "tasks.csv"))
+    assert list(tasks.read_tasks(filename)) == [
+        Task("請求書を送る", date(2024, 7, 15), "1"),
+        Task("会議の資料を作る", None, "A"),
+        Task("本を返す", date(2024, 8, 1), ""),
+    ]
+
+
+def test_read_jsonl(tmp_path):
+    filename = tmp_path / "tasks.jsonl"
+    filename.write_text(
+        '{"title": "a", "due": "2024-07-15", "priority": 2}\n'
+        "\n"
+        '{"title": "b"}\n',
+        encoding="utf-8",
+    )
+    assert list(tasks.read_tasks(str(filename))) == [
+        Task("a", date(2024, 7, 15), "2"),
+        Task("b"),
+    ]
+
+
+@pytest.mark.parametrize(
+    "provided_input, expected_output",
+    [
+        ('{"title": "a"}\n{"due": "2024-07-15"}\n', "tasks.jsonl:2:"),
+        ('{"title": "a", "due": "7/15"}\n', "tasks.jsonl:1:"),
+        ('{"title": "a"}\n[1]\n', "tasks.jsonl:2:"),
+        ("{\n", "tasks.jsonl:1:"),
+    ],
+)
+def test_read_invalid(tmp_path, provided_input, expected_output):
+    filename = tmp_path / "tasks.jsonl"
+    filename.write_text(provided_input, encoding="utf-8")
+    with pytest.raises(ValueError, match=expected_output):
+        list(tasks.read_tasks(str(filename)))
+
+
+def test_read_unknown_format():
+    with pytest.raises(ValueError, match="unknown task format"):
+        list(tasks.read_tasks("tasks.txt"))
@@ -0,0 +1,54 @@
+from datetime import date
+
+import pytest
+
+from planner.almanac import Almanac
+from planner.year_calendar import YearCalendar
+
+
+@pytest.mark.parametrize("year", [2023, 2024, 2100])
+def test_day_of_week(year):
+    calendar = YearCalendar(year, {}, {})
+    for index in range(len(calendar)):
+        day = calendar.date(index)
+        assert calendar.weekday(index) == Almanac.day_of_week(
+            day.strftime("%Y%m%d")
+        )
+
+
+def test_month_offsets():
+    calendar = YearCalendar(2024, {}, {})
+    assert len(calendar) == 366
+    assert calendar.month(2) == range(31, 31 + 29)
+    assert calendar.month(12)[-1] == 365
+    assert calendar.index(date(2024, 3, 1)) == 31 + 29
+
+
+def test_labels_and_colors():
+    calendar = YearCalendar(
+        2024,
+        {"20240101": "赤口", "20240102": "先勝", "20240106": "赤口"},
+        {"20240101": "元日"},
+    )
+    assert calendar.rokuyo_label(0) == "赤口"
+    assert calendar.rokuyo_label(1) == "先勝"
+    assert calendar.rokuyo_label(2) == ""
+    assert calendar.rokuyo[0] == calendar.rokuyo[5]
+    assert calendar.holiday_label(0) == "元日"
+    assert calendar.is_holiday(0)
+    assert not calendar.is_holiday(1)
+    assert calendar.color[0] == YearCalendar.HOLIDAY
+    assert calendar.color[1] == YearCalendar.WEEKDAY
+    assert calendar.color[5] == YearCalendar.SATURDAY
+    assert calendar.color[6] == YearCalendar.HOLIDAY
+
+
+def test_season_labels():
+    calendar = YearCalendar(2024, {}, {})
+    assert calendar.season_label(calendar.index(date(2024, 2, 3))) == "節分"
+    assert calendar.season_label(calendar.index(date(2024, 2, 4))) == "立春"
+    assert calendar.season_label(calendar.index(date(2024, 2, 5))) == ""
+
+    calendar = YearCalendar(2024, {}, {}, {"20240101": "元日"})
+    assert calendar.season_label(0) == "元日"
+    assert calendar.season_label(calendar.index(date(2024, 2, 4))) == ""
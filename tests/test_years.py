@@ -0,0 +1,28 @@
+import pytest
+
+from planner import years
+
+
+@pytest.mark.parametrize(
+    "provided_input, expected_output",
+    [
+        ("2024", [2024]),
+        ("2024-2026", [2024, 2025, 2026]),
+    ],
+)
+def test_parse_years(provided_input, expected_output):
+    assert years.parse_years(provided_input) == expected_output
+
+
+def test_parse_years_reversed():
+    with pytest.raises(ValueError):
+        years.parse_years("2026-2024")
+
+
+def test_expand_paths():
+    assert years.expand_paths("data/rokuyo-{year}.txt", [2024, 2025]) == [
+        "data/rokuyo-2024.txt",
+        "data/rokuyo-2025.txt",
+    ]
+    assert years.expand_paths("holiday.txt", [2024, 2025]) == ["holiday.txt"]
+    assert years.expand_paths(None, [2024]) is None